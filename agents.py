@@ -2,9 +2,14 @@
 Agent Definitions
 Defines all CrewAI agents for the healthcare provider validation workflow.
 """
+from typing import NamedTuple
+
 from crewai import Agent, LLM
+from crewai.llms.base_llm import BaseLLM
 
 from config import Config
+from llm_replay import ReplayLLM, replay_store
+from llm_router import RoutingLLM
 from npi_tool import NPISearchTool
 from nabp_tool import NABPValidationTool
 # from propelus_tool import PropelusLicenseVerificationTool
@@ -12,112 +17,150 @@ from utils import get_logger
 
 logger = get_logger(__name__)
 
-# Initialize LLMs
-llm_gemini = LLM(
-    model=Config.GEMINI_MODEL,
-    temperature=Config.GEMINI_TEMPERATURE,
-    api_key=Config.GEMINI_API_KEY
-)
-
-ollama_llm = LLM(
-    model="ollama/mistral:latest ",
-    base_url="http://localhost:11434",
-    temperature=0.7
-)
-
-# Initialize tools
-npi_tool = NPISearchTool()
-nabp_tool = NABPValidationTool()
-# propelus_tool = PropelusLicenseVerificationTool()
-
-logger.info("Initializing agents...")
-
-# Validation Agent - Primary data verification
-validation_agent = Agent(
-    role="Healthcare Provider Data Validator",
-    goal=(
-        "Perform comprehensive verification of healthcare provider credentials "
-        "by cross-referencing NPI registry, NABP pharmacy licenses, and Propelus "
-        "primary source verification data. Identify and flag any discrepancies. "
-        "Provide final results even when some data sources are unavailable."
-    ),
-    backstory=(
-        "You are a meticulous healthcare credentialing specialist with years of "
-        "experience verifying provider data. You understand the critical importance "
-        "of accurate provider information for patient safety and regulatory compliance. "
-        "You systematically check multiple authoritative sources and know when to "
-        "stop trying a failing tool and document the limitation instead of looping endlessly."
-    ),
-    tools=[npi_tool, nabp_tool],
-    llm=llm_gemini,
-    verbose=True,
-    max_rpm=Config.AGENT_MAX_RPM,
-    allow_delegation=True,
-
-)
-
-# Enrichment Agent - Data quality enhancement
-enrichment_agent = Agent(
-    role="Provider Data Enrichment Specialist",
-    goal=(
-        "Analyze validated provider data to identify gaps, inconsistencies, or "
-        "missing information. Enhance data quality by requesting additional "
-        "verification when needed."
-    ),
-    backstory=(
-        "You are a data quality expert who specializes in healthcare provider "
-        "information. You have an exceptional ability to spot incomplete or "
-        "inconsistent data patterns. You understand what constitutes a complete "
-        "provider profile and can identify when additional verification is needed. "
-        "Your work ensures that every provider record meets the highest quality standards."
-    ),
-    tools=[],
-    llm=llm_gemini,
-    verbose=True,
-    allow_delegation=True
-)
-
-# Quality Assurance Agent - Final validation
-quality_assurance_agent = Agent(
-    role="Quality Assurance & Compliance Reviewer",
-    goal=(
-        "Conduct thorough quality review of all provider validation findings. "
-        "Ensure data accuracy, completeness, and compliance with healthcare "
-        "credentialing standards. Flag any concerns for further investigation."
-    ),
-    backstory=(
-        "You are a seasoned quality assurance professional with deep expertise in "
-        "healthcare compliance and credentialing standards. You've reviewed thousands "
-        "of provider files and have an uncanny ability to spot errors that others miss. "
-        "You understand CMS requirements, NCQA standards, and state-specific regulations. "
-        "Your rigorous reviews ensure that every provider record is audit-ready."
-    ),
-    tools=[],
-    llm=llm_gemini,
-    verbose=True,
-    allow_delegation=True
-)
-
-# Report Generation Agent
-report_maker_agent = Agent(
-    role="Healthcare Validation Report Generator",
-    goal=(
-        "Synthesize all validation findings into comprehensive, professional reports "
-        "that clearly communicate verification results, data quality assessments, "
-        "and actionable recommendations."
-    ),
-    backstory=(
-        "You are a skilled technical writer who specializes in healthcare credentialing "
-        "documentation. You excel at transforming complex validation data into clear, "
-        "actionable reports that stakeholders can easily understand. Your reports are "
-        "well-organized, professionally formatted, and provide exactly the level of "
-        "detail needed for decision-making. Compliance officers and credentialing "
-        "committees rely on your reports to make critical provider enrollment decisions."
-    ),
-    tools=[],
-    llm=llm_gemini,
-    verbose=True,
-    allow_delegation=False
-)
-
-logger.info("All agents initialized successfully")
+# Agents cannot run without the LLM settings; registry-only code imports config without this check
+Config.validate()
+
+
+def create_gemini_llm() -> LLM:
+    """Create a Gemini LLM client configured from Config."""
+    return LLM(
+        model=Config.GEMINI_MODEL,
+        temperature=Config.GEMINI_TEMPERATURE,
+        api_key=Config.GEMINI_API_KEY,
+        stream=Config.LLM_STREAM
+    )
+
+
+def create_ollama_llm() -> LLM:
+    """Create a client for the local Ollama model."""
+    return LLM(
+        model=Config.OLLAMA_MODEL,
+        base_url=Config.OLLAMA_BASE_URL,
+        temperature=0.7
+    )
+
+
+def create_llm() -> BaseLLM:
+    """
+    Create the LLM used by the agents.
+
+    Gemini, or with LLM_ROUTER_ENABLED a router that keeps calls on Gemini
+    while it is healthy and sends overflow or degraded traffic to Ollama.
+    Unless LLM_REPLAY_MODE is "passthrough", either is wrapped so its
+    completions are recorded or replayed.
+    """
+    if not Config.LLM_ROUTER_ENABLED:
+        llm = create_gemini_llm()
+    else:
+        llm = RoutingLLM(
+            primary=create_gemini_llm(),
+            fallback=create_ollama_llm(),
+            max_in_flight=Config.LLM_ROUTER_MAX_IN_FLIGHT,
+            max_error_rate=Config.LLM_ROUTER_MAX_ERROR_RATE,
+            max_latency_seconds=Config.LLM_ROUTER_MAX_LATENCY_SECONDS
+        )
+    if Config.LLM_REPLAY_MODE == "passthrough":
+        return llm
+    return ReplayLLM(inner=llm, store=replay_store(), mode=Config.LLM_REPLAY_MODE)
+
+
+class ProviderAgents(NamedTuple):
+    """The agents of one provider validation crew."""
+    validation: Agent
+    enrichment: Agent
+    quality_assurance: Agent
+
+
+def create_agents(llm: BaseLLM = None) -> ProviderAgents:
+    """
+    Build a fresh set of agents, with their own tools and LLM client.
+
+    Every validation run gets its own agents so concurrent runs never
+    share agent state.
+    
+    Args:
+        llm: LLM to use for all agents (defaults to a new create_llm() client)
+        
+    Returns:
+        ProviderAgents for one crew
+    """
+    llm = llm or create_llm()
+    logger.debug("Initializing agents...")
+
+    # Initialize tools
+    npi_tool = NPISearchTool()
+    nabp_tool = NABPValidationTool()
+    # propelus_tool = PropelusLicenseVerificationTool()
+
+    # Validation Agent - Primary data verification
+    validation_agent = Agent(
+        role="Healthcare Provider Data Validator",
+        goal=(
+            "Perform comprehensive verification of healthcare provider credentials "
+            "by cross-referencing NPI registry, NABP pharmacy licenses, and Propelus "
+            "primary source verification data. Identify and flag any discrepancies. "
+            "Provide final results even when some data sources are unavailable."
+        ),
+        backstory=(
+            "You are a meticulous healthcare credentialing specialist with years of "
+            "experience verifying provider data. You understand the critical importance "
+            "of accurate provider information for patient safety and regulatory compliance. "
+            "You systematically check multiple authoritative sources and know when to "
+            "stop trying a failing tool and document the limitation instead of looping endlessly."
+        ),
+        tools=[npi_tool, nabp_tool],
+        llm=llm,
+        verbose=True,
+        max_rpm=Config.AGENT_MAX_RPM,
+        allow_delegation=True,
+
+    )
+
+    # Enrichment Agent - Data quality enhancement
+    enrichment_agent = Agent(
+        role="Provider Data Enrichment Specialist",
+        goal=(
+            "Analyze validated provider data to identify gaps, inconsistencies, or "
+            "missing information. Enhance data quality by requesting additional "
+            "verification when needed."
+        ),
+        backstory=(
+            "You are a data quality expert who specializes in healthcare provider "
+            "information. You have an exceptional ability to spot incomplete or "
+            "inconsistent data patterns. You understand what constitutes a complete "
+            "provider profile and can identify when additional verification is needed. "
+            "Your work ensures that every provider record meets the highest quality standards."
+        ),
+        tools=[],
+        llm=llm,
+        verbose=True,
+        allow_delegation=True
+    )
+
+    # Quality Assurance Agent - Final validation
+    quality_assurance_agent = Agent(
+        role="Quality Assurance & Compliance Reviewer",
+        goal=(
+            "Conduct thorough quality review of all provider validation findings. "
+            "Ensure data accuracy, completeness, and compliance with healthcare "
+            "credentialing standards. Flag any concerns for further investigation."
+        ),
+        backstory=(
+            "You are a seasoned quality assurance professional with deep expertise in "
+            "healthcare compliance and credentialing standards. You've reviewed thousands "
+            "of provider files and have an uncanny ability to spot errors that others miss. "
+            "You understand CMS requirements, NCQA standards, and state-specific regulations. "
+            "Your rigorous reviews ensure that every provider record is audit-ready."
+        ),
+        tools=[],
+        llm=llm,
+        verbose=True,
+        allow_delegation=True
+    )
+
+    logger.debug("All agents initialized successfully")
+    return ProviderAgents(
+        validation=validation_agent,
+        enrichment=enrichment_agent,
+        quality_assurance=quality_assurance_agent
+    )
@@ -0,0 +1,94 @@
+"""
+AI Result Cache
+Content-addressed cache of crew validation results.
+"""
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import Config
+from registry_lookup import fingerprint_snapshot
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def normalize_provider_key(provider_name: str, state: str) -> str:
+    """
+    Normalize a (name, state) pair so trivially different queries share a key.
+
+    Args:
+        provider_name: Provider name as entered
+        state: State code as entered
+
+    Returns:
+        Normalized "name|STATE" string
+    """
+    name = re.sub(r'[^a-z0-9 ]', '', provider_name.lower())
+    name = ' '.join(name.split())
+    return f"{name}|{state.strip().upper()}"
+
+
+class CrewResultCache:
+    """
+    File-backed cache of crew results.
+
+    Entries are keyed by the normalized provider and a fingerprint of the
+    registry data fetched for it, so a change in NPPES data produces a new
+    key and the stale entry is simply never read again.
+    """
+
+    def __init__(self, cache_dir: Path, max_age_hours: float = 720):
+        self.cache_dir = Path(cache_dir)
+        self.max_age_seconds = max_age_hours * 3600
+
+    def make_key(self, provider_name: str, state: str, snapshot: Optional[dict]) -> Optional[str]:
+        """
+        Build the cache key for a provider and its source snapshot.
+
+        Returns:
+            Hex key, or None when no snapshot is available (result not cacheable)
+        """
+        if snapshot is None:
+            return None
+        material = f"{normalize_provider_key(provider_name, state)}|{fingerprint_snapshot(snapshot)}"
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: Optional[str]) -> Optional[dict]:
+        """Return the cached result for a key, or None on a miss."""
+        if not key:
+            return None
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.max_age_seconds:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable AI cache entry {path}: {e}")
+            return None
+
+    def put(self, key: Optional[str], result: dict) -> None:
+        """Store a crew result under a key (no-op when the key is None)."""
+        if not key:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{time.time_ns()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f)
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Could not write AI cache entry {path}: {e}")
+
+
+crew_result_cache = CrewResultCache(Config.AI_CACHE_DIR, Config.AI_CACHE_MAX_AGE_HOURS)
@@ -0,0 +1,482 @@
+"""
+AI Validation Jobs
+Runs AI validations on a dedicated worker pool so web requests return immediately.
+"""
+import contextvars
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Hashable, Iterator, Optional
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Job states, in lifecycle order; a job cancelled before it started ends as 'cancelled'
+JOB_STATES = ('queued', 'running', 'done', 'error', 'cancelled')
+
+# Progress events kept per job; further non-terminal events are dropped
+MAX_EVENTS_PER_JOB = 2000
+
+# Seconds between checks of the store for cancellations and for events published by other processes
+POLL_SECONDS = 0.25
+
+_SCHEMA = (
+    # data holds the job snapshot; status, key and flags are columns so they can be queried
+    "CREATE TABLE IF NOT EXISTS jobs ("
+    "id TEXT PRIMARY KEY, status TEXT NOT NULL, data TEXT NOT NULL, key TEXT, "
+    "inflight INTEGER NOT NULL DEFAULT 0, cancelled INTEGER NOT NULL DEFAULT 0, owner_pid INTEGER NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, inflight)",
+    "CREATE TABLE IF NOT EXISTS events ("
+    "job_id TEXT NOT NULL, seq INTEGER NOT NULL, type TEXT NOT NULL, time REAL NOT NULL, data TEXT NOT NULL, "
+    "PRIMARY KEY (job_id, seq)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS leases (job_id TEXT NOT NULL, lease TEXT NOT NULL, PRIMARY KEY (job_id, lease))",
+    "CREATE TABLE IF NOT EXISTS watchers ("
+    "job_id TEXT NOT NULL, lease TEXT NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (job_id, lease))",
+)
+
+# (manager, job_id) of the job running in the current context
+_current_job = contextvars.ContextVar('ai_job', default=None)
+
+
+def report_progress(event_type: str, **data):
+    """
+    Publish a progress event for the job running in the current context.
+
+    Does nothing outside a job, so instrumented code can call it freely.
+    Context variables follow copy_context(), so this also works from the
+    crew's stage threads and CrewAI event handlers.
+    """
+    current = _current_job.get()
+    if current is not None:
+        manager, job_id = current
+        manager.publish(job_id, event_type, data)
+
+
+def current_cancel_event() -> Optional[threading.Event]:
+    """
+    Cancellation flag of the job running in the current context.
+
+    Returns:
+        Event set once the job is cancelled, or None outside a job
+    """
+    current = _current_job.get()
+    if current is None:
+        return None
+    manager, job_id = current
+    return manager.cancel_event(job_id)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class AIJobManager:
+    """
+    Background execution of AI validations.
+
+    Jobs run on their own thread pool, separate from the web server's
+    request threads. Submitting a job with the same ``key`` as one still
+    queued or running returns that job instead of starting another. Only
+    the most recent ``max_jobs`` jobs are kept.
+
+    Each job also keeps an ordered log of progress events (see
+    report_progress) that subscribers can follow with wait_events.
+
+    cancel() asks a job to stop: a queued job never starts, a running one
+    sees its flag through current_cancel_event() and is expected to wind
+    down and return what it has.
+
+    Every submit, including one answered with an existing job, hands out a
+    lease naming that requester. A requester gives up its interest with
+    release(), or by closing its last event stream for longer than the
+    grace period (see unwatch); the job is cancelled only once no lease is
+    left, so identical requests do not cancel each other's work.
+
+    Job state, events, leases and cancel flags are kept in a SQLite file,
+    so every process opening it can deduplicate, follow, and cancel any
+    job; path "memory" keeps them in this process only. A job runs in the
+    process that submitted it, which picks up cancellations from other
+    processes within POLL_SECONDS. Jobs whose process exited are marked
+    failed.
+    """
+
+    def __init__(self, path: str = 'memory', max_workers: int = 2, max_jobs: int = 200):
+        self.path = path
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ai-job')
+        self._local = threading.local()
+        # An in-memory database lives in one connection, which the threads take turns on
+        self._memory = None
+        self._memory_lock = threading.Lock()
+        if path == 'memory':
+            self._memory = sqlite3.connect(':memory:', isolation_level=None, check_same_thread=False)
+        with self._connection() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+        # Cancel flags of the jobs this process runs, kept in step with the store by _poll_cancels
+        self._cancel_events = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._poller = None
+        self._closed = threading.Event()
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        if self._memory is not None:
+            with self._memory_lock:
+                yield self._memory
+            return
+        conn = getattr(self._local, 'conn', None)
+        # A connection inherited from a parent process (fork) must not be reused
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        yield conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connection() as conn:
+            # IMMEDIATE takes the write lock up front, serializing read-modify-write across processes
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _reap(self):
+        # Pending jobs of a process that exited will never finish: fail them for their followers
+        with self._connection() as conn:
+            orphans = [
+                job_id for job_id, owner_pid in conn.execute(
+                    "SELECT id, owner_pid FROM jobs WHERE status IN ('queued', 'running') AND owner_pid != ?",
+                    (os.getpid(),)
+                ).fetchall()
+                if not _process_alive(owner_pid)
+            ]
+        for job_id in orphans:
+            with self._transaction() as conn:
+                row = conn.execute(
+                    "SELECT data, owner_pid FROM jobs WHERE id = ? AND status IN ('queued', 'running')", (job_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                error = f"The process running this job ({row[1]}) exited"
+                job = {**json.loads(row[0]), 'status': 'error', 'error': error, 'finished_at': datetime.now().isoformat()}
+                conn.execute("UPDATE jobs SET status = 'error', data = ?, inflight = 0 WHERE id = ?",
+                             (json.dumps(job, default=str), job_id))
+                seq = conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM events WHERE job_id = ?", (job_id,)).fetchone()[0]
+                conn.execute("INSERT INTO events (job_id, seq, type, time, data) VALUES (?, ?, 'error', ?, ?)",
+                             (job_id, seq, time.time(), json.dumps({'error': error})))
+            logger.warning(f"AI job {job_id}: {error}")
+
+    def submit(self, fn: Callable, *args, key: Hashable = None, **meta) -> dict:
+        """
+        Queue ``fn(*args)`` as a job.
+
+        Args:
+            fn: Function producing the job result
+            *args: Arguments for fn
+            key: Deduplication key; a queued or running job with the same key is reused
+            **meta: Extra fields stored on the job (e.g. provider_name, state)
+
+        Returns:
+            Snapshot of the (new or existing) job, with the requester's 'lease'
+        """
+        lease = uuid.uuid4().hex
+        stored_key = json.dumps(key, default=str) if key is not None else None
+        self._reap()
+        with self._transaction() as conn:
+            if stored_key is not None:
+                row = conn.execute("SELECT id, data FROM jobs WHERE key = ? AND inflight = 1", (stored_key,)).fetchone()
+                if row is not None:
+                    conn.execute("INSERT INTO leases (job_id, lease) VALUES (?, ?)", (row[0], lease))
+                    return {**json.loads(row[1]), 'lease': lease}
+
+            job_id = uuid.uuid4().hex
+            job = {
+                **meta,
+                'id': job_id,
+                'status': 'queued',
+                'submitted_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None,
+            }
+            conn.execute(
+                "INSERT INTO jobs (id, status, data, key, inflight, owner_pid) VALUES (?, 'queued', ?, ?, ?, ?)",
+                (job_id, json.dumps(job, default=str), stored_key, int(stored_key is not None), os.getpid())
+            )
+            conn.execute("INSERT INTO leases (job_id, lease) VALUES (?, ?)", (job_id, lease))
+            self._evict(conn)
+
+        with self._lock:
+            self._cancel_events[job_id] = threading.Event()
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll_cancels, name='ai-job-cancels', daemon=True)
+                self._poller.start()
+        self._executor.submit(self._run, job_id, fn, args)
+        return {**job, 'lease': lease}
+
+    def _evict(self, conn: sqlite3.Connection):
+        # Drop the oldest finished jobs beyond max_jobs; never drop pending ones
+        excess = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] - self.max_jobs
+        if excess <= 0:
+            return
+        for (job_id,) in conn.execute(
+            "SELECT id FROM jobs WHERE status IN ('done', 'error', 'cancelled') ORDER BY rowid LIMIT ?", (excess,)
+        ).fetchall():
+            for table, column in (('events', 'job_id'), ('leases', 'job_id'), ('watchers', 'job_id'), ('jobs', 'id')):
+                conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (job_id,))
+
+    def _update(self, job_id: str, **fields):
+        with self._transaction() as conn:
+            row = conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is not None:
+                job = {**json.loads(row[0]), **fields}
+                conn.execute("UPDATE jobs SET status = ?, data = ? WHERE id = ?",
+                             (job['status'], json.dumps(job, default=str), job_id))
+
+    def _run(self, job_id: str, fn: Callable, args: tuple):
+        try:
+            if self._cancelled(job_id):
+                self._update(job_id, status='cancelled', finished_at=datetime.now().isoformat())
+                self.publish(job_id, 'error', {'error': 'Cancelled'})
+                return
+            self._update(job_id, status='running', started_at=datetime.now().isoformat())
+            self.publish(job_id, 'running', {})
+            token = _current_job.set((self, job_id))
+            try:
+                result = fn(*args)
+                self._update(job_id, status='done', result=result, finished_at=datetime.now().isoformat())
+                self.publish(job_id, 'done', {'result': result})
+            except Exception as e:
+                logger.exception(f"AI job {job_id} failed")
+                self._update(job_id, status='error', error=str(e), finished_at=datetime.now().isoformat())
+                self.publish(job_id, 'error', {'error': str(e)})
+            finally:
+                _current_job.reset(token)
+        finally:
+            self._release(job_id)
+
+    def _release(self, job_id: str):
+        with self._lock:
+            self._cancel_events.pop(job_id, None)
+        with self._transaction() as conn:
+            conn.execute("UPDATE jobs SET inflight = 0 WHERE id = ?", (job_id,))
+
+    def _cancelled(self, job_id: str) -> bool:
+        with self._connection() as conn:
+            row = conn.execute("SELECT cancelled FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def _poll_cancels(self):
+        # Carry cancellations made by other processes over to this process's job flags
+        while not self._closed.wait(POLL_SECONDS):
+            with self._lock:
+                pending = [job_id for job_id, event in self._cancel_events.items() if not event.is_set()]
+            if not pending:
+                continue
+            try:
+                with self._connection() as conn:
+                    cancelled = [row[0] for row in conn.execute(
+                        f"SELECT id FROM jobs WHERE cancelled = 1 AND id IN ({','.join('?' * len(pending))})",
+                        pending
+                    )]
+            except sqlite3.Error as e:
+                logger.warning(f"Could not check AI jobs for cancellation: {e}")
+                continue
+            with self._lock:
+                for job_id in cancelled:
+                    event = self._cancel_events.get(job_id)
+                    if event is not None:
+                        event.set()
+
+    def cancel_event(self, job_id: str) -> threading.Event:
+        """Cancellation flag of a job (a fresh, unset one if the job is unknown)."""
+        with self._lock:
+            event = self._cancel_events.get(job_id)
+        if event is None:
+            event = threading.Event()
+            if self._cancelled(job_id):
+                event.set()
+        return event
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Ask a queued or running job to stop.
+
+        Returns:
+            True if the job was still pending and is now flagged
+        """
+        with self._transaction() as conn:
+            # A cancelled job must not be handed to new identical requests
+            flagged = conn.execute(
+                "UPDATE jobs SET cancelled = 1, inflight = 0 "
+                "WHERE id = ? AND status IN ('queued', 'running') AND cancelled = 0",
+                (job_id,)
+            ).rowcount
+        if not flagged:
+            return False
+        with self._lock:
+            event = self._cancel_events.get(job_id)
+            if event is not None:
+                event.set()
+        logger.info(f"AI job {job_id} cancelled")
+        self.publish(job_id, 'stage', {'message': 'Cancelling'})
+        return True
+
+    def requesters(self, job_id: str) -> int:
+        """Number of requesters still holding a lease on a job."""
+        with self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM leases WHERE job_id = ?", (job_id,)).fetchone()[0]
+
+    def release(self, job_id: str, lease: str) -> bool:
+        """
+        Give up one requester's interest in a job; the last one cancels it.
+
+        Returns:
+            True if this release cancelled the job
+        """
+        with self._transaction() as conn:
+            if not conn.execute("DELETE FROM leases WHERE job_id = ? AND lease = ?", (job_id, lease)).rowcount:
+                return False
+            if conn.execute("SELECT COUNT(*) FROM leases WHERE job_id = ?", (job_id,)).fetchone()[0]:
+                return False
+        return self.cancel(job_id)
+
+    def watch(self, job_id: str, lease: Optional[str] = None):
+        """Register a live subscriber (e.g. an open event stream) of a job on behalf of a lease."""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO watchers (job_id, lease, count) VALUES (?, ?, 1) "
+                "ON CONFLICT(job_id, lease) DO UPDATE SET count = count + 1",
+                (job_id, lease or '')
+            )
+
+    def unwatch(self, job_id: str, lease: Optional[str] = None, release_after: Optional[float] = None) -> int:
+        """
+        Unregister a subscriber.
+
+        Args:
+            job_id: Job the subscriber followed
+            lease: Lease the subscriber followed it for
+            release_after: If given and this was the lease's last subscriber,
+                release the lease unless a subscriber (e.g. a reconnecting
+                EventSource, possibly served by another process) comes back
+                within this many seconds
+
+        Returns:
+            Subscribers left for the lease
+        """
+        with self._transaction() as conn:
+            conn.execute("UPDATE watchers SET count = MAX(count - 1, 0) WHERE job_id = ? AND lease = ?",
+                         (job_id, lease or ''))
+            remaining = self._watchers(conn, job_id, lease)
+        if remaining == 0 and lease is not None and release_after is not None:
+            timer = threading.Timer(release_after, self._release_if_unwatched, (job_id, lease))
+            timer.daemon = True
+            timer.start()
+        return remaining
+
+    @staticmethod
+    def _watchers(conn: sqlite3.Connection, job_id: str, lease: Optional[str]) -> int:
+        row = conn.execute("SELECT count FROM watchers WHERE job_id = ? AND lease = ?", (job_id, lease or '')).fetchone()
+        return row[0] if row else 0
+
+    def _release_if_unwatched(self, job_id: str, lease: str):
+        with self._connection() as conn:
+            if self._watchers(conn, job_id, lease):
+                return
+        if self.release(job_id, lease):
+            logger.info(f"AI job {job_id} cancelled: its last requester went away")
+
+    def publish(self, job_id: str, event_type: str, data: dict):
+        """Append a progress event to a job and wake its subscribers."""
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)).fetchone() is None:
+                return
+            seq = conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM events WHERE job_id = ?", (job_id,)).fetchone()[0]
+            if seq > MAX_EVENTS_PER_JOB and event_type not in ('done', 'error'):
+                return
+            conn.execute("INSERT INTO events (job_id, seq, type, time, data) VALUES (?, ?, ?, ?, ?)",
+                         (job_id, seq, event_type, time.time(), json.dumps(data, default=str)))
+        with self._changed:
+            self._changed.notify_all()
+
+    def _events_after(self, job_id: str, after: int) -> Optional[list]:
+        with self._connection() as conn:
+            if conn.execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)).fetchone() is None:
+                return None
+            return [
+                {'seq': seq, 'type': event_type, 'time': event_time, 'data': json.loads(data)}
+                for seq, event_type, event_time, data in conn.execute(
+                    "SELECT seq, type, time, data FROM events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                    (job_id, after)
+                )
+            ]
+
+    def wait_events(self, job_id: str, after: int = 0, timeout: float = 15.0) -> Optional[list]:
+        """
+        Return the events of a job with a sequence number above ``after``.
+
+        Blocks up to ``timeout`` seconds while there are none. Events
+        published in this process wake the wait at once; those of other
+        processes are seen within POLL_SECONDS.
+
+        Returns:
+            List of events (empty on timeout), or None if the job is unknown
+        """
+        deadline = time.monotonic() + timeout
+        reaped = False
+        while True:
+            events = self._events_after(job_id, after)
+            if events is None or events:
+                return events
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if not reaped:
+                    # A job whose process died publishes nothing more; end it once per wait
+                    reaped = True
+                    self._reap()
+                    continue
+                return []
+            with self._changed:
+                self._changed.wait(min(remaining, POLL_SECONDS))
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a snapshot of a job, or None if unknown or evicted."""
+        self._reap()
+        with self._connection() as conn:
+            row = conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def stats(self) -> dict:
+        """Number of jobs in each state."""
+        counts = {state: 0 for state in JOB_STATES}
+        with self._connection() as conn:
+            for status, count in conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+                counts[status] = count
+        return {'workers': self.max_workers, **counts}
+
+    def shutdown(self):
+        """Stop accepting jobs and cancel those not yet started."""
+        self._closed.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,296 @@
+"""
+AI Validation
+Single-provider AI validation shared by the web app and the CLI, with registry-only and mock fallbacks.
+"""
+import datetime
+import os
+import random
+import re
+import time
+from pathlib import Path
+
+from ai_jobs import current_cancel_event, report_progress
+from crew_pool import CrewPool
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Crews built ahead of the first AI request; 0 only warms up the imports (the web app starts the warm-up)
+AI_CREW_POOL_SIZE = int(os.getenv('AI_CREW_POOL_SIZE', '2'))
+# Time an AI validation may take (from submission) before it returns what it has; requests may ask for less
+AI_DEADLINE_SECONDS = int(os.getenv('AI_DEADLINE_SECONDS', '240'))
+
+
+def _prepare_ai():
+    # The modules validate_provider_with_ai imports lazily
+    import ai_cache, crew, registry_lookup  # noqa: F401
+
+
+def _build_crew():
+    from crew import create_provider_validation_crew
+    return create_provider_validation_crew()
+
+
+crew_pool = CrewPool(_build_crew, size=AI_CREW_POOL_SIZE, prepare=_prepare_ai)
+
+# ==========================================
+# Real AI Validation Function (Using CrewAI)
+# ==========================================
+
+def ai_deadline(requested_seconds=None):
+    """
+    Monotonic deadline of an AI validation starting now.
+
+    Clients may ask for a shorter deadline than AI_DEADLINE_SECONDS, never a longer one.
+    """
+    seconds = AI_DEADLINE_SECONDS
+    try:
+        if requested_seconds is not None:
+            seconds = min(seconds, max(float(requested_seconds), 1.0))
+    except (TypeError, ValueError):
+        pass
+    return time.monotonic() + seconds
+
+def ai_validation_response(verdict, report_content, report_filename, state, ai_model_used=True):
+    """Shape a ProviderValidationResult and its rendered report for the API."""
+    findings = verdict.validation
+    return {
+        'status': 'success',
+        'result': report_content,
+        'report_path': report_filename,
+        'valid': verdict.valid,
+        'has_issues': verdict.has_issues,
+        'is_sanctioned': verdict.is_sanctioned,
+        'provider_found': verdict.provider_found,
+        'compliance_status': verdict.qa.compliance_status if verdict.qa else None,
+        'mock_npi': findings.npi or '',
+        'specialty': findings.specialty or '',
+        'location': findings.practice_address or state,
+        'report_content': report_content[:1000] + "..." if len(report_content) > 1000 else report_content,
+        'ai_model_used': ai_model_used,
+        'partial': verdict.partial,
+        'partial_reason': verdict.partial_reason,
+        'validation_time': datetime.datetime.now().isoformat()
+    }
+
+def registry_only_validation(provider_name, state, snapshot, reason):
+    """
+    Report built from the registry snapshot alone, for runs the crew could not finish.
+    """
+    from registry_lookup import snapshot_findings
+    from report_renderer import render_report
+    from utils import make_report_path
+    from validation_models import ProviderValidationResult
+    
+    verdict = ProviderValidationResult(
+        provider_name=provider_name,
+        state=state,
+        validation=snapshot_findings(snapshot),
+        partial=True,
+        partial_reason=reason
+    )
+    report_content = render_report(verdict)
+    report_filename = make_report_path(Path('ai_reports'), provider_name, state)
+    report_filename.parent.mkdir(parents=True, exist_ok=True)
+    report_filename.write_text(report_content, encoding='utf-8')
+    return {**ai_validation_response(verdict, report_content, report_filename.as_posix(), state, ai_model_used=False),
+            'cached': False}
+
+def validate_provider_with_ai(provider_name, state, deadline=None):
+    """
+    Real AI validation using CrewAI multi-agent system.
+    
+    The crew is stopped at ``deadline`` (a time.monotonic() value, see
+    ai_deadline) or when the current AI job is cancelled, and then returns
+    a partial report from what it had gathered.
+    """
+    if deadline is None:
+        deadline = ai_deadline()
+    snapshot = None
+    try:
+        from config import Config
+        from ai_cache import crew_result_cache
+        from registry_lookup import fetch_source_snapshot, provider_not_found
+        from utils import make_report_path
+        
+        # Also the fallback when the crew cannot finish in time
+        report_progress('stage', message='Checking NPI and NABP registries')
+        snapshot = fetch_source_snapshot(provider_name, state)
+        
+        # No registry knows this provider: answer without starting the crew
+        if Config.PRECHECK_ENABLED and provider_not_found(snapshot):
+            logger.info(f"Registry pre-check: no match for {provider_name} ({state}), skipping crew")
+            report_progress('stage', message='Provider not found in any registry')
+            return {
+                'status': 'success',
+                'result': f"NO_USER_FOUND: Provider '{provider_name}' not found in {state} verification systems.",
+                'report_path': '',
+                'valid': False,
+                'ai_model_used': False,
+                'precheck': True,
+                'validation_time': datetime.datetime.now().isoformat()
+            }
+        
+        # Without the AI settings the crew cannot run; the registry data is all there is
+        missing = Config.missing_ai_settings()
+        if missing:
+            logger.warning(f"AI validation not configured (missing {', '.join(missing)}); returning registry data only")
+            return registry_only_validation(provider_name, state, snapshot, f"AI not configured (missing {', '.join(missing)})")
+        
+        # Serve a previous run if the provider's registry data is unchanged
+        cache_key = None
+        if Config.AI_CACHE_ENABLED:
+            cache_key = crew_result_cache.make_key(provider_name, state, snapshot)
+            cached = crew_result_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"AI validation cache hit for {provider_name} ({state})")
+                report_progress('stage', message='Registry data unchanged, using previous AI validation')
+                return {**cached, 'cached': True}
+        
+        # Every run writes its report to its own path, so concurrent runs never collide
+        report_filename = make_report_path(Path('ai_reports'), provider_name, state).as_posix()
+        
+        logger.info(f"AI validation started: {provider_name} ({state})")
+        
+        report_progress('stage', message='Starting AI agents')
+        
+        # Run the AI validation on a crew of its own, built ahead of time when the pool has one
+        crew = crew_pool.acquire()
+        crew.report_path = Path(report_filename)
+        result = crew.kickoff(
+            inputs={
+                'provider_name': provider_name,
+                'state': state
+            },
+            timeout=max(deadline - time.monotonic(), 0.0),
+            cancel_event=current_cancel_event(),
+            snapshot=snapshot
+        )
+        
+        # The crew renders the report from its structured findings and writes it to report_filename
+        verdict = result.pydantic
+        
+        logger.info(
+            f"AI validation {'stopped (' + verdict.partial_reason + ')' if verdict.partial else 'completed'}: "
+            f"{provider_name} ({state}) {'VALID' if verdict.valid else 'NEEDS REVIEW'}, report saved to {report_filename}"
+        )
+        
+        validation = ai_validation_response(verdict, result.raw, report_filename, state)
+        # A partial result must not stand in for a complete one later
+        if not verdict.partial:
+            crew_result_cache.put(cache_key, validation)
+        # Metrics describe this run only, so they are not cached with the result
+        return {**validation, 'cached': False, 'metrics': crew.metrics.to_dict()}
+            
+    except Exception as e:
+        logger.exception(f"AI validation of {provider_name} ({state}) failed")
+        
+        # Registry data already fetched beats made-up data; mock only when there is none
+        if snapshot is not None:
+            return registry_only_validation(provider_name, state, snapshot, f"AI validation failed: {e}")
+        return mock_validate_provider(provider_name, state)
+
+# ==========================================
+# Mock AI Validation Function (Fallback)
+# ==========================================
+
+def mock_validate_provider(provider_name, state):
+    """
+    Mock AI validation for development - used as fallback
+    """
+    import hashlib
+    
+    input_str = f"{provider_name.lower()}_{state.lower()}"
+    hash_val = int(hashlib.md5(input_str.encode()).hexdigest(), 16)
+    
+    is_valid = (hash_val % 10) > 2
+    is_sanctioned = (hash_val % 20) == 0
+    has_discrepancies = (hash_val % 4) == 0
+    mock_npi = str(1000000000 + (hash_val % 9000000000))
+    
+    specialties = [
+        "Family Medicine", "Internal Medicine", "Pediatrics", "Cardiology",
+        "Dermatology", "Psychiatry", "General Surgery", "Orthopedic Surgery",
+        "Radiology", "Anesthesiology", "Emergency Medicine", "Obstetrics & Gynecology"
+    ]
+    specialty = specialties[hash_val % len(specialties)]
+    
+    cities_by_state = {
+        'CA': ['Los Angeles', 'San Francisco', 'San Diego', 'Sacramento', 'San Jose'],
+        'NY': ['New York', 'Buffalo', 'Rochester', 'Albany', 'Syracuse'],
+        'TX': ['Houston', 'Dallas', 'Austin', 'San Antonio', 'Fort Worth'],
+        'FL': ['Miami', 'Orlando', 'Tampa', 'Jacksonville', 'Tallahassee'],
+        'IL': ['Chicago', 'Springfield', 'Peoria', 'Naperville', 'Rockford']
+    }
+    city = random.choice(cities_by_state.get(state, ['Unknown City']))
+    
+    if not is_valid:
+        return {
+            'status': 'success',
+            'result': f"NO_USER_FOUND: Provider '{provider_name}' not found in {state} verification systems.",
+            'report_path': '',
+            'valid': False,
+            'ai_model_used': False,
+            'is_mock': True
+        }
+    
+    # Create mock report
+    report_content = f"""# Healthcare Provider Validation Report (MOCK)
+
+## Provider Information
+- **Name**: {provider_name}
+- **State**: {state}
+- **NPI**: {mock_npi}
+- **Validation Date**: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+## AI Validation Summary
+{"✅ VALID" if is_valid else "⚠️ NEEDS REVIEW"}
+
+## Quick Results
+- **NPI Check**: {"✅ Active" if is_valid else "❌ Inactive"}
+- **License Status**: {"✅ Active" if is_valid else "❌ Inactive"}
+- **Sanctions**: {"✅ Clear" if not is_sanctioned else "❌ Flagged"}
+- **Discrepancies**: {"None" if not has_discrepancies else "Found"}
+
+## Generated by MediverifyAI Mock System
+*Note: This is mock data. Enable real AI for actual validation.*
+"""
+    
+    safe_name = re.sub(r'[^\w\-_]', '', provider_name.replace(' ', '_'))
+    Path('ai_reports').mkdir(exist_ok=True)
+    report_filename = f"ai_reports/MOCK_{safe_name}_{state}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
+    
+    with open(report_filename, 'w', encoding='utf-8') as f:
+        f.write(report_content)
+    
+    ai_result_str = f"""
+AI VALIDATION COMPLETE for {provider_name} in {state}
+
+OVERALL STATUS: {"VALID" if is_valid else "NEEDS REVIEW"}
+
+KEY FINDINGS:
+- NPI: {mock_npi} ({"Active" if is_valid else "Inactive"})
+- State License: {state} ({"Active" if is_valid else "Inactive"})
+- Sanctions Check: {"CLEAR" if not is_sanctioned else "FLAGGED"}
+- Specialty: {specialty}
+- Location: {city}, {state}
+
+{"⚠️ NOTE: This is MOCK data. Real AI validation not configured."}
+
+"""
+    
+    return {
+        'status': 'success',
+        'result': ai_result_str,
+        'report_path': report_filename,
+        'valid': is_valid,
+        'has_issues': has_discrepancies,
+        'is_sanctioned': is_sanctioned,
+        'mock_npi': mock_npi,
+        'specialty': specialty,
+        'location': f"{city}, {state}",
+        'report_content': report_content,
+        'ai_model_used': False,
+        'is_mock': True,
+        'validation_time': datetime.datetime.now().isoformat()
+    }
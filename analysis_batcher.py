@@ -0,0 +1,151 @@
+"""
+Analysis Batcher
+Combines the enrichment and QA stages of concurrent validation runs into shared LLM calls.
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+
+# How often a waiting run checks its cancel flag, in seconds
+WAIT_POLL_SECONDS = 0.5
+
+
+class _Request:
+    def __init__(self, key: str, payload, deadline: Optional[float], cancelled: Optional[threading.Event]):
+        self.key = key
+        self.payload = payload
+        self.deadline = deadline
+        self.cancelled = cancelled
+        self.abandoned = False
+        self.result = None
+        self.done = threading.Event()
+
+    def gave_up(self) -> bool:
+        return (
+            self.abandoned
+            or (self.cancelled is not None and self.cancelled.is_set())
+            or (self.deadline is not None and time.monotonic() >= self.deadline)
+        )
+
+
+class BatchCancelled:
+    """Cancel flag of a batch: set once every run in it has given up on its result."""
+
+    def __init__(self, requests: List[_Request]):
+        self._requests = requests
+
+    def is_set(self) -> bool:
+        return all(request.gave_up() for request in self._requests)
+
+
+class AnalysisBatcher:
+    """
+    Micro-batcher for the per-provider analysis stages.
+
+    Runs that reach the analysis stage at about the same time submit their
+    validation findings; once ``max_batch_size`` requests are waiting, or
+    the oldest has waited ``max_wait_seconds``, one caller runs the whole
+    batch through ``run_batch`` and every caller gets its own slice back.
+
+    ``run_batch`` receives {key: payload} and a BatchCancelled flag, and
+    returns {key: result}; keys it leaves out get None, and the caller
+    falls back to its own analysis. A run waits for its result until its
+    deadline or cancel flag, and the batch is stopped only once all of its
+    runs have given up, since a run that leaves may be running it for others.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[Dict[str, object], BatchCancelled], Dict[str, object]],
+        max_batch_size: int = 5,
+        max_wait_seconds: float = 2.0
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: List[_Request] = []
+        self._lock = threading.Lock()
+        self._counter = 0
+        self.batches_run = 0
+
+    def submit(self, payload, deadline: Optional[float] = None, cancelled: Optional[threading.Event] = None) -> object:
+        """
+        Add one run's analysis to the next batch and wait for its result.
+
+        Args:
+            payload: What run_batch needs for this provider
+            deadline: time.monotonic() value after which the run stops waiting
+            cancelled: Event that stops the wait when set (e.g. the run's cancel flag)
+
+        Returns:
+            This provider's result, or None if the batch did not produce one
+            or the run gave up waiting for it
+        """
+        with self._lock:
+            self._counter += 1
+            request = _Request(f"p{self._counter}", payload, deadline, cancelled)
+            self._pending.append(request)
+            batch = self._take_batch() if len(self._pending) >= self.max_batch_size else None
+
+        if batch is None:
+            fill_deadline = time.monotonic() + self.max_wait_seconds
+            while not request.done.wait(self._wait_seconds(request, fill_deadline)):
+                with self._lock:
+                    if request.gave_up():
+                        return self._abandon(request)
+                    # Nobody filled the batch in time: run whatever is waiting
+                    if request in self._pending and time.monotonic() >= fill_deadline:
+                        batch = self._take_batch()
+                        break
+                if time.monotonic() >= fill_deadline:
+                    fill_deadline = time.monotonic() + self.max_wait_seconds
+
+        if batch is not None:
+            self._run(batch)
+        while not request.done.wait(self._wait_seconds(request)):
+            if request.gave_up():
+                with self._lock:
+                    return self._abandon(request)
+        return request.result
+
+    @staticmethod
+    def _wait_seconds(request: _Request, until: Optional[float] = None) -> float:
+        now = time.monotonic()
+        seconds = WAIT_POLL_SECONDS if until is None else min(until - now, WAIT_POLL_SECONDS)
+        if request.deadline is not None:
+            seconds = min(seconds, request.deadline - now)
+        return max(seconds, 0)
+
+    def _abandon(self, request: _Request) -> None:
+        # Called with the lock held; a request still pending leaves its batch
+        request.abandoned = True
+        if request in self._pending:
+            self._pending.remove(request)
+        logger.info(f"Run gave up waiting for its batched analysis ({request.key})")
+        return None
+
+    def _take_batch(self) -> List[_Request]:
+        batch = self._pending[:self.max_batch_size]
+        del self._pending[:self.max_batch_size]
+        return batch
+
+    def _run(self, batch: List[_Request]):
+        logger.info(f"Running batched analysis for {len(batch)} provider(s)")
+        cancelled = BatchCancelled(batch)
+        try:
+            results = self.run_batch({request.key: request.payload for request in batch}, cancelled)
+        except Exception:
+            if cancelled.is_set():
+                logger.info("Batched analysis stopped: every run in it gave up")
+            else:
+                logger.exception("Batched analysis failed; runs fall back to their own analysis")
+            results = {}
+        self.batches_run += 1
+        for request in batch:
+            request.result = results.get(request.key)
+            request.done.set()
@@ -0,0 +1,4 @@
+"""
+Benchmarks
+Offline, repeatable benchmarks of the lookup, bulk and AI paths (run with ``python -m benchmarks.run``).
+"""
@@ -0,0 +1,99 @@
+"""
+Bulk Benchmark
+Throughput of the /validator CSV upload and time and memory of the /download_report export.
+"""
+import io
+import tracemalloc
+
+from benchmarks.common import npi_range, synthetic_upstream, timed
+
+# Offset of this benchmark's NPIs, disjoint from bench_lookup's
+NPI_OFFSET = 100_000_000
+
+
+def roster_csv(npis: list) -> bytes:
+    lines = ['NPI,Name'] + [f'{npi},Provider {npi}' for npi in npis]
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def run_validator(sizes=(1000, 10000, 100000), latency: str = 'none') -> dict:
+    """
+    Upload rosters of each size to /validator, every NPI a cache miss.
+
+    Returns:
+        Per size: seconds, rows per second and upstream calls
+    """
+    import finalapp
+
+    client = finalapp.app.test_client()
+    results = {}
+    offset = NPI_OFFSET
+    with synthetic_upstream(latency) as upstream:
+        for size in sizes:
+            body = roster_csv(npi_range(offset, size))
+            offset += size
+            calls_before = upstream.cassette.hits
+            response, seconds = timed(
+                client.post, '/validator',
+                data={'csv_file': (io.BytesIO(body), 'roster.csv')},
+                content_type='multipart/form-data'
+            )
+            if response.status_code != 200:
+                raise RuntimeError(f"/validator returned {response.status_code} for {size} rows")
+            results[str(size)] = {
+                'seconds': round(seconds, 3),
+                'rows_per_second': round(size / seconds, 1),
+                'upstream_calls': upstream.cassette.hits - calls_before,
+            }
+    return results
+
+
+def _report_rows(size: int) -> list:
+    return [
+        {
+            'npi': npi,
+            'name': f'PROVIDER {npi}',
+            'valid': i % 10 != 0,
+            'taxonomy': 'Family Medicine',
+            'location': 'LOS ANGELES, CA',
+        }
+        for i, npi in enumerate(npi_range(NPI_OFFSET, size))
+    ]
+
+
+def run_download(sizes=(1000, 10000, 100000)) -> dict:
+    """
+    Export stored results of each size through /download_report.
+
+    Time is measured without tracing; peak memory in a second, traced request.
+
+    Returns:
+        Per size: seconds, peak traced memory in MiB and response size in bytes
+    """
+    import finalapp
+
+    client = finalapp.app.test_client()
+    results = {}
+    for size in sizes:
+        session_id = finalapp.result_store.create(_report_rows(size))
+        with client.session_transaction() as session:
+            session['session_id'] = session_id
+        url = f'/download_report?session_id={session_id}'
+
+        response, seconds = timed(client.get, url)
+        if response.status_code != 200:
+            raise RuntimeError(f"/download_report returned {response.status_code} for {size} rows")
+        size_bytes = len(response.data)
+
+        tracemalloc.start()
+        try:
+            client.get(url).data
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        results[str(size)] = {
+            'seconds': round(seconds, 3),
+            'peak_memory_mib': round(peak / 2**20, 2),
+            'response_bytes': size_bytes,
+        }
+    return results
@@ -0,0 +1,31 @@
+"""
+Lookup Benchmark
+Single-call latency of validate_npi_real, cold (registry lookup) and warm (verification cache).
+"""
+from benchmarks.common import npi_range, summarize, synthetic_upstream, timed
+
+# Offset of this benchmark's NPIs, disjoint from the others' so its cold calls really miss the cache
+NPI_OFFSET = 0
+
+
+def run(lookups: int = 1000, latency: str = 'none') -> dict:
+    """
+    Args:
+        lookups: Distinct NPIs looked up, each once cold and once warm
+        latency: Upstream latency spec (see http_replay.LatencyModel)
+
+    Returns:
+        Latency statistics of the cold and warm calls
+    """
+    import finalapp
+
+    npis = npi_range(NPI_OFFSET, lookups)
+    with synthetic_upstream(latency) as upstream:
+        cold = [timed(finalapp.validate_npi_real, npi)[1] for npi in npis]
+        warm = [timed(finalapp.validate_npi_real, npi)[1] for npi in npis]
+        upstream_calls = upstream.cassette.hits
+    return {
+        'cold': summarize(cold),
+        'warm': summarize(warm),
+        'upstream_calls': upstream_calls,
+    }
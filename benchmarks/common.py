@@ -0,0 +1,138 @@
+"""
+Benchmark Helpers
+Environment, synthetic upstreams, timing statistics and result files shared by the benchmarks.
+"""
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Settings the benchmarked modules read at import: no live LLM key, no warm-up
+# threads, no provider rate limits and no cross-process limiter, result or AI job store
+for _name, _value in {
+    'GEMINI_API_KEY': 'benchmark',
+    'AI_WARMUP_ENABLED': 'false',
+    'RATE_LIMIT_DB': 'memory',
+    'RESULTS_DB': 'memory',
+    'AI_JOBS_DB': 'memory',
+    'NPPES_RPM_LIMIT': '0',
+    'AGENT_MAX_RPM': '1000000',
+    'CREW_MAX_RPM': '1000000',
+    'LLM_RPM_LIMIT': '0',
+    'PRECHECK_ENABLED': 'false',
+    'AI_CACHE_ENABLED': 'false',
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from http_replay import HTTPCassette, HTTPReplay  # noqa: E402
+from standins.registries import FIRST_NPI, synthetic_npi_record  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+
+class SyntheticNPPESCassette(HTTPCassette):
+    """
+    Cassette answering any NPPES number lookup from synthetic_npi_record.
+
+    NPIs with n % 20 == 2 are not found and those with n % 20 == 1 are
+    deactivated; every other NPI is active. Nothing is held in memory, so
+    rosters of any size can be replayed.
+    """
+
+    def __init__(self, recorded_latency: float = 0.0):
+        self.path = Path('<synthetic NPPES>')
+        self.hits = 0
+        self.misses = 0
+        self.recorded_latency = recorded_latency
+
+    def __len__(self) -> int:
+        return 0
+
+    def next(self, key: str):
+        match = re.search(r'[?&]number=(\d+)', key)
+        if 'version=2.1' not in key or not match:
+            self.misses += 1
+            return None
+        self.hits += 1
+        number = int(match.group(1))
+        results = [] if number % 20 == 2 else [synthetic_npi_record(number)]
+        return {
+            'status': 200,
+            'reason': 'OK',
+            'headers': {'Content-Type': 'application/json'},
+            'body': {'text': json.dumps({'result_count': len(results), 'results': results})},
+            'elapsed': self.recorded_latency,
+        }
+
+
+def synthetic_upstream(latency: str = 'none', seed: int = 0) -> HTTPReplay:
+    """HTTP replay harness serving the synthetic NPPES dataset (install it, or use it as a context manager)."""
+    return HTTPReplay(SyntheticNPPESCassette(), mode='replay', latency=latency, seed=seed)
+
+
+def npi_range(start: int, count: int) -> list:
+    """``count`` synthetic NPIs starting at offset ``start``."""
+    return [str(FIRST_NPI + start + i) for i in range(count)]
+
+
+def summarize(samples: list) -> dict:
+    """Latency statistics of a list of durations, in milliseconds."""
+    ordered = sorted(samples)
+    percentiles = statistics.quantiles(ordered, n=100) if len(ordered) > 1 else ordered * 99
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 3),
+        'p50_ms': round(percentiles[49] * 1000, 3),
+        'p95_ms': round(percentiles[94] * 1000, 3),
+        'p99_ms': round(percentiles[98] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def timed(fn, *args, **kwargs):
+    """Call fn and return (result, seconds)."""
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def write_results(results: dict, params: dict, output: Path = None) -> Path:
+    """
+    Write benchmark results with the metadata needed to compare runs.
+
+    Returns:
+        Path of the JSON file (defaults to results/<timestamp>-<commit>.json)
+    """
+    commit = git_commit()
+    started = datetime.now()
+    if output is None:
+        output = RESULTS_DIR / f"{started.strftime('%Y%m%d-%H%M%S')}-{commit}.json"
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        'commit': commit,
+        'timestamp': started.isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'params': params,
+        'results': results,
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+    return output
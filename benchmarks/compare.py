@@ -0,0 +1,47 @@
+"""
+Benchmark Comparison
+Prints the change of every metric between two benchmark result files.
+
+    python -m benchmarks.compare results/BASELINE.json results/CANDIDATE.json
+"""
+import json
+import sys
+
+
+def flatten(results: dict, prefix: str = '') -> dict:
+    """Numeric leaves of a results tree, keyed by dotted path."""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print(__doc__.strip().splitlines()[-1].strip(), file=sys.stderr)
+        sys.exit(2)
+    documents = []
+    for path in argv:
+        with open(path, 'r', encoding='utf-8') as f:
+            documents.append(json.load(f))
+    baseline, candidate = (flatten(document['results']) for document in documents)
+
+    print(f"{'metric':<45} {documents[0]['commit']:>12} {documents[1]['commit']:>12} {'change':>9}")
+    for metric in sorted(baseline.keys() | candidate.keys()):
+        before, after = baseline.get(metric), candidate.get(metric)
+        if before is None or after is None:
+            change = 'n/a'
+        elif before == 0:
+            change = '0.0%' if after == 0 else 'new'
+        else:
+            change = f"{(after - before) / before * 100:+.1f}%"
+        print(f"{metric:<45} {before if before is not None else '-':>12} {after if after is not None else '-':>12} {change:>9}")
+
+
+if __name__ == '__main__':
+    main()
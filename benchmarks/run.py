@@ -0,0 +1,63 @@
+"""
+Benchmark Runner
+Runs the benchmark suite offline and writes the results as JSON.
+
+    python -m benchmarks.run [--only lookup,validator,download,crew] [--sizes 1000,10000,100000]
+"""
+import argparse
+import sys
+
+from benchmarks.common import write_results
+
+BENCHMARKS = ('lookup', 'validator', 'download', 'crew')
+
+
+def _csv(value: str) -> list:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--only', type=_csv, default=list(BENCHMARKS), help='Comma-separated benchmarks to run')
+    parser.add_argument('--sizes', type=lambda v: [int(s) for s in _csv(v)], default=[1000, 10000, 100000],
+                        help='Roster sizes of the validator and download benchmarks')
+    parser.add_argument('--lookups', type=int, default=1000, help='NPIs of the lookup benchmark')
+    parser.add_argument('--crew-runs', type=int, default=5, help='Crew runs per execution mode')
+    parser.add_argument('--llm-delay', type=float, default=0.0, help='Seconds per stubbed LLM call')
+    parser.add_argument('--latency', default='none',
+                        help='Upstream latency: none, fixed:S, uniform:A,B or lognormal:MEDIAN,SIGMA')
+    parser.add_argument('--output', help='Result file (defaults to benchmarks/results/<timestamp>-<commit>.json)')
+    args = parser.parse_args(argv)
+    unknown = set(args.only) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = {}
+    for name in BENCHMARKS:
+        if name not in args.only:
+            continue
+        print(f"Running {name} benchmark...", file=sys.stderr)
+        if name == 'lookup':
+            from benchmarks import bench_lookup
+            results[name] = bench_lookup.run(args.lookups, args.latency)
+        elif name == 'validator':
+            from benchmarks import bench_bulk
+            results[name] = bench_bulk.run_validator(args.sizes, args.latency)
+        elif name == 'download':
+            from benchmarks import bench_bulk
+            results[name] = bench_bulk.run_download(args.sizes)
+        elif name == 'crew':
+            from benchmarks import bench_crew
+            results[name] = bench_crew.run(args.crew_runs, args.llm_delay)
+
+    params = {key: value for key, value in vars(args).items() if key != 'output'}
+    path = write_results(results, params, args.output)
+    print(f"Results written to {path}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
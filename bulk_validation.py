@@ -0,0 +1,241 @@
+"""
+Bulk AI Validation
+Runs the AI validation pipeline over a roster with bounded LLM concurrency.
+"""
+import contextvars
+import csv
+import io
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from ai_cache import normalize_provider_key
+from config import Config
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Accepted roster column names, in order of preference
+NAME_COLUMNS = ('provider_name', 'name', 'full_name')
+STATE_COLUMNS = ('state', 'provider_state')
+
+# Outcome of one validation, as shown in the summary
+OUTCOMES = ('valid', 'needs_review', 'not_found', 'error', 'cancelled')
+
+
+def parse_roster(csv_text: str, default_state: str = 'CA') -> List[dict]:
+    """
+    Parse a roster CSV into (name, state) rows.
+
+    Args:
+        csv_text: CSV with a provider name column and an optional state column
+        default_state: State used for rows without one
+
+    Returns:
+        List of {'name', 'state'} dictionaries in file order
+
+    Raises:
+        ValueError: If no provider name column is present
+    """
+    reader = csv.DictReader(io.StringIO(csv_text))
+    fields = {f.strip().lower(): f for f in reader.fieldnames or []}
+    name_col = next((fields[c] for c in NAME_COLUMNS if c in fields), None)
+    state_col = next((fields[c] for c in STATE_COLUMNS if c in fields), None)
+    if name_col is None:
+        raise ValueError(f"Roster needs one of the columns: {', '.join(NAME_COLUMNS)}")
+
+    rows = []
+    for record in reader:
+        name = (record.get(name_col) or '').strip()
+        if not name:
+            continue
+        state = ((record.get(state_col) if state_col else '') or default_state).strip().upper()
+        rows.append({'name': name, 'state': state})
+    return rows
+
+
+def bulk_concurrency(
+    llm_rpm_limit: int = None,
+    rpm_per_run: int = None,
+    max_concurrency: int = None
+) -> int:
+    """
+    Number of crews to run at once without exceeding the LLM rate limit.
+
+    Args:
+        llm_rpm_limit: Requests per minute allowed by the LLM provider
+        rpm_per_run: Requests per minute one crew run issues at most
+        max_concurrency: Explicit upper bound (0 for none)
+
+    Returns:
+        Concurrency of at least 1
+    """
+    llm_rpm_limit = Config.LLM_RPM_LIMIT if llm_rpm_limit is None else llm_rpm_limit
+    rpm_per_run = Config.BULK_AI_RPM_PER_RUN if rpm_per_run is None else rpm_per_run
+    max_concurrency = Config.BULK_AI_MAX_CONCURRENCY if max_concurrency is None else max_concurrency
+
+    concurrency = max(1, llm_rpm_limit // max(rpm_per_run, 1))
+    if max_concurrency:
+        concurrency = min(concurrency, max_concurrency)
+    return concurrency
+
+
+def _outcome(result: dict) -> str:
+    if result.get('status') != 'success':
+        return 'error'
+    if result.get('provider_found') is False or 'NO_USER_FOUND' in str(result.get('result', '')):
+        return 'not_found'
+    return 'valid' if result.get('valid') else 'needs_review'
+
+
+def run_bulk_validation(
+    rows: List[dict],
+    validate_fn: Callable[[str, str], dict],
+    concurrency: int = None,
+    summary_dir: Path = None,
+    on_result: Optional[Callable[[dict, int, int], None]] = None,
+    cancel_event: Optional[threading.Event] = None
+) -> dict:
+    """
+    Validate every provider of a roster.
+
+    Identical providers (same normalized name and state) are validated once.
+    At most ``concurrency`` validations run at the same time, each in a copy
+    of the caller's context (so they report progress to, and see the
+    cancellation of, the caller's job). Once ``cancel_event`` is set no
+    further provider is started; those left are recorded as cancelled.
+    When the batch finishes, a markdown summary table is written next to
+    the reports.
+
+    Args:
+        rows: Roster rows from parse_roster
+        validate_fn: Single-provider validation, e.g. ai_validation.validate_provider_with_ai
+        concurrency: Parallel validations (defaults to bulk_concurrency())
+        summary_dir: Directory of the summary file (defaults to Config.REPORTS_DIR)
+        on_result: Called with (entry, done, total) as each provider finishes
+        cancel_event: Stops the batch when set (e.g. ai_jobs.current_cancel_event())
+
+    Returns:
+        Summary dictionary with per-provider entries and outcome counts
+    """
+    concurrency = concurrency or bulk_concurrency()
+    summary_dir = Path(summary_dir or Config.REPORTS_DIR)
+
+    unique = {}
+    for index, row in enumerate(rows):
+        key = normalize_provider_key(row['name'], row['state'])
+        if key in unique:
+            unique[key]['rows'].append(index)
+        else:
+            unique[key] = {'name': row['name'], 'state': row['state'], 'rows': [index]}
+
+    logger.info(f"Bulk AI validation: {len(rows)} rows, {len(unique)} unique providers, concurrency {concurrency}")
+    started = time.perf_counter()
+    entries = []
+
+    def entry_of(provider: dict, result: dict, outcome: str, provider_started: float) -> dict:
+        return {
+            'name': provider['name'],
+            'state': provider['state'],
+            'rows': provider['rows'],
+            'outcome': outcome,
+            'valid': bool(result.get('valid')),
+            'has_issues': bool(result.get('has_issues')),
+            'is_sanctioned': bool(result.get('is_sanctioned')),
+            'npi': result.get('mock_npi', ''),
+            'cached': bool(result.get('cached')),
+            'precheck': bool(result.get('precheck')),
+            'mock': bool(result.get('is_mock')),
+            'report_path': result.get('report_path', ''),
+            'error': result.get('error'),
+            'seconds': round(time.perf_counter() - provider_started, 2),
+        }
+
+    def validate(provider: dict) -> dict:
+        provider_started = time.perf_counter()
+        try:
+            result = validate_fn(provider['name'], provider['state'])
+        except Exception as e:
+            logger.exception(f"Bulk validation failed for {provider['name']} ({provider['state']})")
+            result = {'status': 'error', 'error': str(e)}
+        return entry_of(provider, result, _outcome(result), provider_started)
+
+    def cancelled() -> bool:
+        return cancel_event is not None and cancel_event.is_set()
+
+    def finished(entry: dict):
+        entries.append(entry)
+        if on_result:
+            on_result(entry, len(entries), len(unique))
+
+    # Providers are handed to the pool only as workers free up, so a
+    # cancellation leaves nothing queued behind the running ones
+    queued = deque(unique.values())
+    running = set()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bulk-ai') as pool:
+        while queued or running:
+            while queued and len(running) < concurrency and not cancelled():
+                running.add(pool.submit(contextvars.copy_context().run, validate, queued.popleft()))
+            if cancelled():
+                while queued:
+                    finished(entry_of(queued.popleft(), {'error': 'Cancelled'}, 'cancelled', time.perf_counter()))
+            if running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finished(future.result())
+
+    entries.sort(key=lambda e: e['rows'][0])
+    elapsed = time.perf_counter() - started
+    summary = {
+        'batch_id': uuid.uuid4().hex[:12],
+        'finished_at': datetime.now().isoformat(),
+        'rows_total': len(rows),
+        'providers': len(unique),
+        'duplicates': len(rows) - len(unique),
+        'concurrency': concurrency,
+        'cancelled': cancelled(),
+        'duration_seconds': round(elapsed, 2),
+        'providers_per_minute': round(len(unique) / elapsed * 60, 2) if elapsed else None,
+        'counts': {outcome: sum(1 for e in entries if e['outcome'] == outcome) for outcome in OUTCOMES},
+        'entries': entries,
+    }
+
+    summary_dir.mkdir(parents=True, exist_ok=True)
+    summary_path = summary_dir / f"bulk_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{summary['batch_id']}.md"
+    summary_path.write_text(render_summary_table(summary), encoding='utf-8')
+    summary['summary_path'] = summary_path.as_posix()
+    logger.info(f"Bulk AI validation finished in {elapsed:.1f}s, summary at {summary_path}")
+    return summary
+
+
+def render_summary_table(summary: dict) -> str:
+    """Render a bulk validation summary as a markdown table."""
+    counts = summary['counts']
+    lines = [
+        "# Bulk Provider Validation Summary",
+        "",
+        f"- **Rows**: {summary['rows_total']} ({summary['providers']} unique providers, {summary['duplicates']} duplicates)",
+        f"- **Valid**: {counts['valid']} | **Needs review**: {counts['needs_review']} | "
+        f"**Not found**: {counts['not_found']} | **Errors**: {counts['error']}"
+        + (f" | **Cancelled**: {counts['cancelled']}" if summary.get('cancelled') else ""),
+        f"- **Duration**: {summary['duration_seconds']}s at concurrency {summary['concurrency']}",
+        "",
+        "| # | Provider | State | Result | Issues | Sanctioned | Source | Report |",
+        "| - | -------- | ----- | ------ | ------ | ---------- | ------ | ------ |",
+    ]
+    for number, entry in enumerate(summary['entries'], 1):
+        source = 'pre-check' if entry['precheck'] else 'cache' if entry['cached'] else 'mock' if entry['mock'] else 'crew'
+        result = entry['outcome'].replace('_', ' ').upper()
+        if entry['error']:
+            result += f" ({entry['error']})"
+        lines.append(
+            f"| {number} | {entry['name']} | {entry['state']} | {result} | "
+            f"{'Yes' if entry['has_issues'] else 'No'} | {'Yes' if entry['is_sanctioned'] else 'No'} | "
+            f"{source} | {entry['report_path'] or '-'} |"
+        )
+    return "\n".join(lines) + "\n"
@@ -20,6 +20,10 @@ class Config:
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini/gemini-2.5-flash-exp")
     GEMINI_TEMPERATURE = float(os.getenv("GEMINI_TEMPERATURE", "0.1"))
+
+    # Local Ollama model (fallback of the LLM router)
+    OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "ollama/mistral:latest")
+    OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
     
     # Propelus API Configuration
     PROPELUS_API_KEY = os.getenv("PROPELUS_API_KEY")
@@ -28,13 +32,68 @@ class Config:
     # NABP API Configuration
     NABP_API_KEY = os.getenv("NABP_API_KEY")
     NABP_BASE_URL = os.getenv("NABP_BASE_URL", "https://api.nabp.pharmacy/v2/Individual/eprofile/validate")
+    # NABP requests share one pooled session: read timeout (seconds), and retries of
+    # connection failures, timeouts and 429/502/503/504 answers
+    NABP_TIMEOUT = float(os.getenv("NABP_TIMEOUT", "25"))
+    NABP_MAX_RETRIES = int(os.getenv("NABP_MAX_RETRIES", "2"))
+    # NABP answers are cached until the license's expiration date, kept at least
+    # NABP_CACHE_MIN_SECONDS (also the TTL of unverified results) and at most NABP_CACHE_MAX_SECONDS
+    NABP_CACHE_MIN_SECONDS = float(os.getenv("NABP_CACHE_MIN_SECONDS", "3600"))
+    NABP_CACHE_MAX_SECONDS = float(os.getenv("NABP_CACHE_MAX_SECONDS", "604800"))
     
     # NPI Registry Configuration
-    NPI_BASE_URL = "https://npiregistry.cms.hhs.gov/api/"
+    NPI_BASE_URL = os.getenv("NPI_BASE_URL", "https://npiregistry.cms.hhs.gov/api/")
+
+    # Requests per minute per registry host, across all worker processes (0 = unlimited)
+    NPPES_RPM_LIMIT = int(os.getenv("NPPES_RPM_LIMIT", "0"))
+    NABP_RPM_LIMIT = int(os.getenv("NABP_RPM_LIMIT", "0"))
+    PROPELUS_RPM_LIMIT = int(os.getenv("PROPELUS_RPM_LIMIT", "0"))
+
+    # Web app NPI verification cache, and the roster re-verification scheduler: rosters
+    # are re-checked once their results are older than REVERIFY_MAX_AGE_HOURS, at
+    # SCHEDULER_PEAK_RPM NPPES requests per minute, or SCHEDULER_OFFPEAK_RPM within
+    # SCHEDULER_OFFPEAK_HOURS (local "start-end" hours); the scheduler only runs
+    # in the background when SCHEDULER_AUTOSTART is set
+    NPI_CACHE_TTL_SECONDS = int(os.getenv("NPI_CACHE_TTL_SECONDS", "86400"))
+    ROSTERS_DIR = Path(os.getenv("ROSTERS_DIR", "./rosters"))
+    REVERIFY_MAX_AGE_HOURS = float(os.getenv("REVERIFY_MAX_AGE_HOURS", "168"))
+    SCHEDULER_PEAK_RPM = int(os.getenv("SCHEDULER_PEAK_RPM", "30"))
+    SCHEDULER_OFFPEAK_RPM = int(os.getenv("SCHEDULER_OFFPEAK_RPM", "240"))
+    SCHEDULER_OFFPEAK_HOURS = os.getenv("SCHEDULER_OFFPEAK_HOURS", "22-6")
+    SCHEDULER_AUTOSTART = os.getenv("SCHEDULER_AUTOSTART", "false").lower() == "true"
     
     # CrewAI Configuration
     AGENT_MAX_RPM = int(os.getenv("AGENT_MAX_RPM", "10"))
     CREW_MAX_RPM = int(os.getenv("CREW_MAX_RPM", "50"))
+    # "dag" runs enrichment and QA concurrently after validation; "sequential" runs tasks in order
+    CREW_EXECUTION_MODE = os.getenv("CREW_EXECUTION_MODE", "dag").lower()
+    # Stream LLM tokens (forwarded to the search page as they arrive)
+    LLM_STREAM = os.getenv("LLM_STREAM", "false").lower() == "true"
+    # Route LLM calls between Gemini and the local Ollama model: overflow beyond
+    # LLM_ROUTER_MAX_IN_FLIGHT concurrent Gemini calls, or Gemini error rate /
+    # median latency above the limits, goes to Ollama
+    LLM_ROUTER_ENABLED = os.getenv("LLM_ROUTER_ENABLED", "false").lower() == "true"
+    LLM_ROUTER_MAX_IN_FLIGHT = int(os.getenv("LLM_ROUTER_MAX_IN_FLIGHT", "4"))
+    LLM_ROUTER_MAX_ERROR_RATE = float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.5"))
+    LLM_ROUTER_MAX_LATENCY_SECONDS = float(os.getenv("LLM_ROUTER_MAX_LATENCY_SECONDS", "30"))
+    # Requests and tokens per minute allowed by the LLM provider account, enforced across
+    # all crews and worker processes through the shared rate limiter (0 = unlimited)
+    LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "60"))
+    LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "0"))
+    # Record/replay of LLM completions and tool results at the agents' LLM boundary:
+    # "passthrough" (off), "record" (store every call) or "replay" (offline; an
+    # unrecorded call fails), with recordings under LLM_REPLAY_DIR
+    LLM_REPLAY_MODE = os.getenv("LLM_REPLAY_MODE", "passthrough").lower()
+    LLM_REPLAY_DIR = Path(os.getenv("LLM_REPLAY_DIR", "./llm_recordings"))
+    # Bulk AI validation: expected requests per minute of one crew run, and an optional hard cap (0 = none)
+    BULK_AI_RPM_PER_RUN = int(os.getenv("BULK_AI_RPM_PER_RUN", "10"))
+    BULK_AI_MAX_CONCURRENCY = int(os.getenv("BULK_AI_MAX_CONCURRENCY", "0"))
+    # Token budget for upstream task outputs injected into a task's prompt (0 disables compaction)
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+    # Providers whose enrichment and QA share one LLM call per stage (1 disables batching),
+    # and how long a run waits for others to fill its batch
+    ANALYSIS_BATCH_SIZE = int(os.getenv("ANALYSIS_BATCH_SIZE", "1"))
+    ANALYSIS_BATCH_WAIT_SECONDS = float(os.getenv("ANALYSIS_BATCH_WAIT_SECONDS", "2.0"))
     
     # Application Settings
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
@@ -47,20 +106,35 @@ class Config:
     # Reports Directory
     REPORTS_DIR = Path(os.getenv("REPORTS_DIR", "./reports"))
     
+    # Deterministic registry pre-check before starting the crew
+    PRECHECK_ENABLED = os.getenv("PRECHECK_ENABLED", "true").lower() == "true"
+    
+    # AI Result Cache (keyed by provider + fingerprint of registry data)
+    AI_CACHE_ENABLED = os.getenv("AI_CACHE_ENABLED", "true").lower() == "true"
+    AI_CACHE_DIR = Path(os.getenv("AI_CACHE_DIR", "./ai_cache"))
+    AI_CACHE_MAX_AGE_HOURS = float(os.getenv("AI_CACHE_MAX_AGE_HOURS", "720"))
+    
     @classmethod
-    def validate(cls):
-        """Validate that all required environment variables are set."""
+    def missing_ai_settings(cls) -> list:
+        """Names of the required AI settings that are not set."""
         required_vars = {
             "GEMINI_API_KEY": cls.GEMINI_API_KEY,
         }
-        
+        # Replayed runs never reach Gemini
+        if cls.LLM_REPLAY_MODE == "replay":
+            del required_vars["GEMINI_API_KEY"]
+        return [name for name, value in required_vars.items() if not value]
+    
+    @classmethod
+    def validate(cls):
+        """Validate that all required environment variables are set."""
         # Optional but recommended
         optional_vars = {
             "PROPELUS_API_KEY": cls.PROPELUS_API_KEY,
             "NABP_API_KEY": cls.NABP_API_KEY,
         }
         
-        missing = [name for name, value in required_vars.items() if not value]
+        missing = cls.missing_ai_settings()
         
         if missing:
             print("❌ ERROR: Missing required environment variables:")
@@ -90,17 +164,22 @@ class Config:
         print("="*70)
         print(f"Gemini Model: {cls.GEMINI_MODEL}")
         print(f"Temperature: {cls.GEMINI_TEMPERATURE}")
+        print(f"LLM Router: {f'Gemini -> {cls.OLLAMA_MODEL}' if cls.LLM_ROUTER_ENABLED else 'Disabled'}")
         print(f"Agent Max RPM: {cls.AGENT_MAX_RPM}")
         print(f"Crew Max RPM: {cls.CREW_MAX_RPM}")
+        print(f"Crew Execution Mode: {cls.CREW_EXECUTION_MODE}")
+        print(f"LLM RPM Limit: {cls.LLM_RPM_LIMIT or 'Unlimited'}")
+        print(f"LLM TPM Limit: {cls.LLM_TPM_LIMIT or 'Unlimited'}")
+        print(f"LLM Replay: {f'{cls.LLM_REPLAY_MODE} ({cls.LLM_REPLAY_DIR})' if cls.LLM_REPLAY_MODE != 'passthrough' else 'Disabled'}")
+        print(f"Context Token Budget: {cls.CONTEXT_TOKEN_BUDGET or 'Unlimited'}")
+        print(f"Analysis Batch Size: {cls.ANALYSIS_BATCH_SIZE if cls.ANALYSIS_BATCH_SIZE > 1 else 'Disabled'}")
         print(f"Max Retries: {cls.MAX_RETRIES}")
+        print(f"NABP: {cls.NABP_MAX_RETRIES} retries, {cls.NABP_TIMEOUT:g}s timeout, cache {cls.NABP_CACHE_MIN_SECONDS:g}-{cls.NABP_CACHE_MAX_SECONDS:g}s")
         print(f"API Timeout: {cls.API_TIMEOUT}s")
+        print(f"Roster Scheduler: {'Autostart' if cls.SCHEDULER_AUTOSTART else 'Manual'}, re-verify after {cls.REVERIFY_MAX_AGE_HOURS:g}h at {cls.SCHEDULER_PEAK_RPM}/{cls.SCHEDULER_OFFPEAK_RPM} RPM (off-peak {cls.SCHEDULER_OFFPEAK_HOURS})")
         print(f"Reports Dir: {cls.REPORTS_DIR}")
+        print(f"AI Cache: {cls.AI_CACHE_DIR if cls.AI_CACHE_ENABLED else 'Disabled'}")
         print(f"Gemini API Key: {'✓ Set' if cls.GEMINI_API_KEY else '✗ Missing'}")
         print(f"Propelus API Key: {'✓ Set' if cls.PROPELUS_API_KEY else '✗ Missing'}")
         print(f"NABP API Key: {'✓ Set' if cls.NABP_API_KEY else '✗ Missing'}")
         print("="*70)
-
-
-
-# Validate configuration on import
-Config.validate()
@@ -0,0 +1,158 @@
+"""
+Context Compaction
+Trims upstream task outputs to a token budget before they enter downstream prompts.
+"""
+import json
+import re
+from typing import Any, List, Optional
+
+from crewai import Crew
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.formatter import DIVIDERS
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Rough characters-per-token ratio used for budgeting (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+
+# Starting and minimum limits for structured-output compaction
+_MAX_FIELD_CHARS, _MIN_FIELD_CHARS = 400, 40
+_MAX_LIST_ITEMS, _MIN_LIST_ITEMS = 10, 1
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a prompt fragment."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _compact_value(value: Any, max_chars: int, max_items: int) -> Any:
+    if isinstance(value, str):
+        value = re.sub(r'\s+', ' ', value).strip()
+        return value if len(value) <= max_chars else value[:max_chars - 1] + '…'
+    if isinstance(value, list):
+        items = [_compact_value(v, max_chars, max_items) for v in value[:max_items]]
+        if len(value) > max_items:
+            items.append(f"(+{len(value) - max_items} more)")
+        return items
+    if isinstance(value, dict):
+        compacted = {}
+        for key, v in value.items():
+            if v is None or v == '' or v == [] or v == {}:
+                continue
+            compacted[key] = _compact_value(v, max_chars, max_items)
+        return compacted
+    return value
+
+
+def _truncate_text(text: str, budget_tokens: int) -> str:
+    max_chars = budget_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    marker = f"\n[... {estimate_tokens(text) - budget_tokens} tokens trimmed ...]\n"
+    keep = max(max_chars - len(marker), 0)
+    head = keep * 2 // 3
+    return text[:head] + marker + text[len(text) - (keep - head):] if keep > head else text[:head] + marker
+
+
+def _compact_raw(raw: str) -> str:
+    # Verbose tool output tends to repeat itself; keep each line once
+    seen, lines = set(), []
+    for line in raw.splitlines():
+        line = line.rstrip()
+        if not line or line in seen:
+            continue
+        seen.add(line)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def compact_output(output: TaskOutput, budget_tokens: int) -> str:
+    """
+    Render one task output within a token budget.
+
+    Structured (pydantic) outputs are serialized without empty fields, then
+    long strings and lists are shortened until they fit. Free-text outputs
+    are de-duplicated line by line and truncated around a marker.
+
+    Args:
+        output: Upstream task output
+        budget_tokens: Token budget for this output
+
+    Returns:
+        Text to inject into the downstream prompt
+    """
+    if output.pydantic is not None:
+        data = output.pydantic.model_dump(mode='json')
+        max_chars, max_items = _MAX_FIELD_CHARS, _MAX_LIST_ITEMS
+        while True:
+            text = json.dumps(_compact_value(data, max_chars, max_items), ensure_ascii=False)
+            if estimate_tokens(text) <= budget_tokens or (max_chars, max_items) == (_MIN_FIELD_CHARS, _MIN_LIST_ITEMS):
+                break
+            max_chars = max(max_chars // 2, _MIN_FIELD_CHARS)
+            max_items = max(max_items // 2, _MIN_LIST_ITEMS)
+    else:
+        text = _compact_raw(output.raw)
+    return _truncate_text(text, budget_tokens)
+
+
+def compact_context(outputs: List[TaskOutput], budget_tokens: int) -> str:
+    """
+    Join upstream task outputs within a shared token budget.
+
+    Each output gets an equal share of the budget; shares an output does
+    not need are handed to the others.
+
+    Args:
+        outputs: Upstream task outputs, in task order
+        budget_tokens: Total token budget of the context
+
+    Returns:
+        Context text for the downstream prompt
+    """
+    if not outputs:
+        return ""
+    divider_tokens = estimate_tokens(DIVIDERS) * (len(outputs) - 1)
+    available = max(budget_tokens - divider_tokens, len(outputs))
+
+    natural = [estimate_tokens(compact_output(o, available)) for o in outputs]
+    shares = [available // len(outputs)] * len(outputs)
+    surplus = sum(max(share - need, 0) for share, need in zip(shares, natural))
+    hungry = [i for i, need in enumerate(natural) if need > shares[i]]
+    for i in hungry:
+        shares[i] += surplus // len(hungry)
+
+    return DIVIDERS.join(
+        compact_output(output, min(share, need))
+        for output, share, need in zip(outputs, shares, natural)
+    )
+
+
+class ContextCompactingCrew(Crew):
+    """
+    Crew whose tasks receive their context compacted to a token budget.
+
+    The raw and compacted context size of every task is reported to
+    ``context_metrics`` (a metrics.RunMetrics) when one is set.
+    """
+
+    context_token_budget: int = 0
+    context_metrics: Optional[Any] = None
+
+    def _get_context(self, task, task_outputs: List[TaskOutput]) -> str:
+        raw_context = Crew._get_context(task, task_outputs)
+        if not raw_context:
+            return raw_context
+
+        if self.context_token_budget > 0 and task.context:
+            outputs = [t.output for t in task.context if t.output is not None] if isinstance(task.context, list) else task_outputs
+            context = compact_context(outputs, self.context_token_budget)
+        else:
+            context = raw_context
+
+        stage = task.name or task.agent.role
+        if self.context_metrics is not None:
+            self.context_metrics.record_context(stage, estimate_tokens(raw_context), estimate_tokens(context))
+        logger.debug(f"Context for {stage}: {estimate_tokens(raw_context)} -> {estimate_tokens(context)} tokens")
+        return context
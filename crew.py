@@ -2,38 +2,424 @@
 Crew Configuration
 Main crew orchestration for healthcare provider validation.
 """
+import contextvars
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import List, Optional, Tuple
+
 from crewai import Crew, Process
+from crewai.crews.crew_output import CrewOutput
 
 from config import Config
-from agents import (
-    validation_agent,
-    enrichment_agent,
-    quality_assurance_agent,
-    report_maker_agent
-)
-from tasks import validation_task, enrichment_task, qa_task, report_task
+from agents import ProviderAgents, create_agents
+from ai_jobs import report_progress
+from analysis_batcher import AnalysisBatcher, BatchCancelled
+from context_compaction import ContextCompactingCrew, compact_output
+from crew_progress import install_progress_listener
+from llm_replay import create_tool_memo
+from metrics import RunMetrics
+from rate_limiter import attach_llm_limits
+from registry_lookup import snapshot_findings
+from tasks import ProviderTasks, create_batch_tasks, create_tasks
+from report_renderer import render_report
 from utils import get_logger
+from validation_models import (
+    EnrichmentBatch,
+    EnrichmentFindings,
+    ProviderValidationResult,
+    QABatch,
+    QAFindings,
+    ValidationFindings,
+    findings_from_output,
+    split_batch,
+)
 
 logger = get_logger(__name__)
 
-# Create the crew
-provider_validation_crew = Crew(
-    agents=[
-        validation_agent,
-        enrichment_agent,
-        quality_assurance_agent,
-        report_maker_agent
-    ],
-    tasks=[
-        validation_task,
-        enrichment_task,
-        qa_task,
-        report_task
-    ],
-    process=Process.sequential,
-    max_rpm=Config.CREW_MAX_RPM,
-    verbose=True,
-    share_crew=True
-)
+# Supported values of Config.CREW_EXECUTION_MODE
+EXECUTION_MODES = ("sequential", "dag")
+
+# How often a deadline-bound kickoff checks for cancellation, in seconds
+CANCEL_POLL_SECONDS = 0.5
+
+
+class RunCancelled(Exception):
+    """Raised inside a validation run that was cancelled or ran out of time."""
+
+
+class _CancellationGate:
+    """Wraps an agent's RPMController so no further LLM call starts once the run is cancelled."""
+
+    def __init__(self, controller, cancelled: threading.Event):
+        self._controller = controller
+        self._cancelled = cancelled
+
+    def check_or_wait(self) -> bool:
+        if self._cancelled.is_set():
+            raise RunCancelled("validation run cancelled")
+        return self._controller.check_or_wait() if self._controller is not None else True
+
+    def stop_rpm_counter(self):
+        if self._controller is not None:
+            self._controller.stop_rpm_counter()
+
+
+def _kickoff_concurrently(crews: List[Crew], inputs: dict):
+    # Each stage thread inherits the caller's context (job progress, metrics)
+    with ThreadPoolExecutor(max_workers=len(crews), thread_name_prefix="crew-stage") as pool:
+        futures = [pool.submit(contextvars.copy_context().run, crew.kickoff, inputs=inputs) for crew in crews]
+        for future in futures:
+            future.result()
+
+
+class ProviderValidationCrew:
+    """
+    One provider validation run: its agents, tasks and execution strategy.
+
+    Validation always runs first. When it finds the provider, "sequential"
+    mode runs enrichment and then QA, while "dag" mode runs the two
+    concurrently (QA only depends on validation). When it does not, both
+    are skipped. With Config.ANALYSIS_BATCH_SIZE above 1, enrichment and
+    QA are instead handed to the shared analysis batcher, which reviews
+    several concurrent runs' providers in one LLM call per stage and adds
+    an even share of that call's tokens and latency to each run's metrics.
+    The report is rendered from the structured task outputs and written to
+    report_path.
+
+    A run given a timeout or cancel event is stopped when either fires: no
+    further LLM call or stage starts, and the report is built from what is
+    already known (finished task outputs, else the registry snapshot) and
+    marked partial. The abandoned crew thread may still finish a call in
+    flight; it can no longer write the report, and the run's metrics stay
+    attached until it has ended so that call is still counted.
+    """
+
+    def __init__(self, agents: ProviderAgents, tasks: ProviderTasks, execution_mode: str, report_path: str):
+        self.agents = agents
+        self.tasks = tasks
+        self.execution_mode = execution_mode
+        self.report_path = Path(report_path)
+        # Never kicked off itself; it owns the RPM controller the stage crews
+        # share and aggregates their token usage
+        self.crew = Crew(
+            agents=list(agents),
+            tasks=list(tasks),
+            process=Process.sequential,
+            max_rpm=Config.CREW_MAX_RPM,
+            cache=False,
+            verbose=True,
+            share_crew=True
+        )
+        self.metrics = RunMetrics()
+        # Tool cache of the whole run; the crews must not install their own
+        self.tool_memo = create_tool_memo()
+        self.cancelled = threading.Event()
+        # Whoever finishes first (the crew or the partial result) writes the report
+        self._finish_lock = threading.Lock()
+        self._finished = False
+        self._crew_thread_done: Optional[Future] = None
+        self._deadline: Optional[float] = None
+
+    def kickoff(self, inputs: dict, timeout: float = None, cancel_event: threading.Event = None,
+                snapshot: dict = None) -> CrewOutput:
+        """
+        Run the validation.
+
+        Args:
+            inputs: Task inputs ('provider_name', 'state')
+            timeout: Seconds the run may take before it is stopped (None for no limit)
+            cancel_event: Event that stops the run when set (e.g. the job's cancel flag)
+            snapshot: Registry snapshot (see registry_lookup.fetch_source_snapshot)
+                used for the report when the run is stopped before validation finished
+
+        Returns:
+            CrewOutput whose raw output is the rendered report, whose pydantic
+            output is the ProviderValidationResult and whose tasks_output
+            holds the output of every task that ran. Per-agent timings, tokens,
+            retries, throttling and deduplicated tool calls are left in
+            self.metrics. A stopped run returns a partial result instead of raising
+        """
+        self.tool_memo.attach(self.agents)
+        attach_llm_limits(self.agents, Config.LLM_RPM_LIMIT, Config.LLM_TPM_LIMIT)
+        for agent in self.agents:
+            if not isinstance(agent._rpm_controller, _CancellationGate):
+                agent._rpm_controller = _CancellationGate(agent._rpm_controller, self.cancelled)
+        self.metrics.attach(self.agents)
+        install_progress_listener()
+        try:
+            if timeout is None and cancel_event is None:
+                return self._kickoff(inputs)
+            return self._kickoff_bounded(inputs, timeout, cancel_event, snapshot)
+        finally:
+            if self._crew_thread_done is not None:
+                # Runs once the crew thread has ended (at once if it already has)
+                self._crew_thread_done.add_done_callback(lambda _: self._end_run())
+            else:
+                self._end_run()
+
+    def _end_run(self):
+        self.crew._rpm_controller.stop_rpm_counter()
+        self.metrics.detach()
+        deduplicated = self.tool_memo.deduplicated()
+        if deduplicated:
+            logger.info(f"Deduplicated tool calls: {deduplicated}")
+
+    def _kickoff_bounded(self, inputs: dict, timeout: Optional[float], cancel_event: Optional[threading.Event],
+                         snapshot: Optional[dict]) -> CrewOutput:
+        deadline = self._deadline = time.monotonic() + timeout if timeout is not None else None
+        future = self._crew_thread_done = Future()
+
+        def run():
+            try:
+                future.set_result(self._kickoff(inputs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        # Daemon thread: a stuck LLM or tool call must not keep the process alive
+        threading.Thread(target=contextvars.copy_context().run, args=(run,), name="crew-run", daemon=True).start()
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                reason = "cancelled"
+                break
+            remaining = deadline - time.monotonic() if deadline is not None else CANCEL_POLL_SECONDS
+            if remaining <= 0:
+                reason = f"deadline of {timeout:.0f}s exceeded"
+                break
+            try:
+                return future.result(timeout=min(remaining, CANCEL_POLL_SECONDS))
+            except FutureTimeoutError:
+                continue
+
+        self.cancelled.set()
+        with self._finish_lock:
+            finished = self._finished
+        if finished:
+            # The crew wrote its report just before the stop; its result is complete
+            return future.result()
+        logger.warning(f"Validation of {inputs.get('provider_name', '')} stopped: {reason}")
+        report_progress('stage', message=f"AI validation stopped ({reason}); returning partial results")
+        return self._partial_output(inputs, snapshot, reason)
+
+    def _check_cancelled(self):
+        if self.cancelled.is_set():
+            raise RunCancelled("validation run cancelled")
+
+    def _partial_output(self, inputs: dict, snapshot: Optional[dict], reason: str) -> CrewOutput:
+        tasks = self.tasks
+        if tasks.validation.output is not None:
+            validation = findings_from_output(
+                tasks.validation.output,
+                ValidationFindings,
+                provider_found="NO_USER_FOUND" not in tasks.validation.output.raw,
+                summary=tasks.validation.output.raw
+            )
+        else:
+            validation = snapshot_findings(snapshot)
+        enrichment = findings_from_output(tasks.enrichment.output, EnrichmentFindings) if tasks.enrichment.output else None
+        qa = findings_from_output(tasks.qa.output, QAFindings) if tasks.qa.output else None
+        return self._finish(inputs, validation, enrichment, qa, partial_reason=reason)
+
+    def _stage(self, tasks: list) -> Crew:
+        # Stage crews share the agents (and so the full crew's RPM controller)
+        return ContextCompactingCrew(
+            agents=list({id(task.agent): task.agent for task in tasks}.values()),
+            tasks=tasks,
+            process=Process.sequential,
+            cache=False,
+            verbose=True,
+            share_crew=True,
+            context_token_budget=Config.CONTEXT_TOKEN_BUDGET,
+            context_metrics=self.metrics
+        )
+
+    def _analyze(self, inputs: dict) -> Tuple[EnrichmentFindings, QAFindings]:
+        tasks = self.tasks
+        if self.execution_mode == "dag":
+            _kickoff_concurrently([self._stage([tasks.enrichment]), self._stage([tasks.qa])], inputs)
+        else:
+            for task in (tasks.enrichment, tasks.qa):
+                self._check_cancelled()
+                self._stage([task]).kickoff(inputs=inputs)
+        return (
+            findings_from_output(tasks.enrichment.output, EnrichmentFindings),
+            findings_from_output(tasks.qa.output, QAFindings)
+        )
+
+    def _kickoff(self, inputs: dict) -> CrewOutput:
+        tasks = self.tasks
+        self._stage([tasks.validation]).kickoff(inputs=inputs)
+        self._check_cancelled()
+        raw_validation = tasks.validation.output.raw if tasks.validation.output else ""
+        validation = findings_from_output(
+            tasks.validation.output,
+            ValidationFindings,
+            provider_found="NO_USER_FOUND" not in raw_validation,
+            summary=raw_validation
+        )
+
+        enrichment = qa = None
+        if validation.provider_found:
+            if Config.ANALYSIS_BATCH_SIZE > 1:
+                enrichment, qa, usage = get_analysis_batcher().submit(
+                    _batch_payload(inputs, tasks.validation.output),
+                    deadline=self._deadline,
+                    cancelled=self.cancelled
+                ) or (None, None, None)
+                if usage:
+                    self.metrics.add_usage(usage)
+            if enrichment is None or qa is None:
+                self._check_cancelled()
+                enrichment, qa = self._analyze(inputs)
+
+        self._check_cancelled()
+        return self._finish(inputs, validation, enrichment, qa)
+
+    def _finish(self, inputs: dict, validation: ValidationFindings, enrichment: Optional[EnrichmentFindings],
+                qa: Optional[QAFindings], partial_reason: str = None) -> CrewOutput:
+        tasks = self.tasks
+        result = ProviderValidationResult(
+            provider_name=inputs.get("provider_name", ""),
+            state=inputs.get("state", ""),
+            validation=validation,
+            enrichment=enrichment,
+            qa=qa,
+            partial=partial_reason is not None,
+            partial_reason=partial_reason
+        )
+
+        report = render_report(result)
+        with self._finish_lock:
+            # A crew thread finishing after its run was stopped must not replace the partial report
+            if self._finished or (partial_reason is None and self.cancelled.is_set()):
+                raise RunCancelled("validation run cancelled")
+            self._finished = True
+            self.report_path.parent.mkdir(parents=True, exist_ok=True)
+            self.report_path.write_text(report, encoding="utf-8")
+        for section in re.split(r"(?=\n## )", report):
+            report_progress('report_chunk', text=section)
+
+        return CrewOutput(
+            raw=report,
+            pydantic=result,
+            tasks_output=[task.output for task in tasks if task.output is not None],
+            token_usage=self.crew.calculate_usage_metrics()
+        )
+
+
+def _batch_payload(inputs: dict, validation_output) -> dict:
+    budget = Config.CONTEXT_TOKEN_BUDGET
+    return {
+        "provider_name": inputs.get("provider_name", ""),
+        "state": inputs.get("state", ""),
+        "findings": compact_output(validation_output, budget) if budget > 0 else validation_output.raw,
+    }
+
+
+def run_batched_analysis(payloads: dict, cancelled: Optional[BatchCancelled] = None) -> dict:
+    """
+    Run enrichment and QA for several providers with one LLM call per stage.
+
+    Args:
+        payloads: Dictionary of provider_key to {'provider_name', 'state', 'findings'}
+        cancelled: Flag that stops the batch before its next LLM call
+            (see analysis_batcher.BatchCancelled)
+
+    Returns:
+        Dictionary of provider_key to (EnrichmentFindings, QAFindings, usage);
+        either findings is None when the batch output has no entry for that
+        provider, and usage is the provider's even share of the batch's LLM
+        usage (see RunMetrics.usage_share)
+    """
+    agents = create_agents()
+    tasks = create_batch_tasks(agents)
+    batch_agents = [agents.enrichment, agents.quality_assurance]
+    # Owns the RPM controller of the batch agents, like ProviderValidationCrew.crew
+    owner = Crew(
+        agents=batch_agents,
+        tasks=list(tasks),
+        process=Process.sequential,
+        max_rpm=Config.CREW_MAX_RPM,
+        verbose=True,
+        share_crew=True
+    )
+    providers = "\n\n".join(
+        f"provider_key: {key}\nprovider: {payload['provider_name']} ({payload['state']})\n"
+        f"validation findings: {payload['findings']}"
+        for key, payload in payloads.items()
+    )
+
+    metrics = RunMetrics()
+    attach_llm_limits(batch_agents, Config.LLM_RPM_LIMIT, Config.LLM_TPM_LIMIT)
+    if cancelled is not None:
+        for agent in batch_agents:
+            agent._rpm_controller = _CancellationGate(agent._rpm_controller, cancelled)
+    metrics.attach(batch_agents)
+    try:
+        _kickoff_concurrently(
+            [Crew(agents=[task.agent], tasks=[task], process=Process.sequential, verbose=True, share_crew=True) for task in tasks],
+            {"providers": providers}
+        )
+    finally:
+        owner._rpm_controller.stop_rpm_counter()
+        metrics.detach()
+
+    enrichment = split_batch(findings_from_output(tasks.enrichment.output, EnrichmentBatch), EnrichmentFindings)
+    qa = split_batch(findings_from_output(tasks.qa.output, QABatch), QAFindings)
+    totals = metrics.to_dict()["totals"]
+    logger.info(
+        f"Batched analysis of {len(payloads)} provider(s): {len(enrichment)} enrichment and {len(qa)} QA entries, "
+        f"{totals['llm_calls']} LLM calls, {totals['prompt_tokens']} prompt tokens"
+    )
+    usage = metrics.usage_share(len(payloads))
+    return {key: (enrichment.get(key), qa.get(key), usage) for key in payloads}
+
+
+_analysis_batcher: Optional[AnalysisBatcher] = None
+_analysis_batcher_lock = threading.Lock()
+
+
+def get_analysis_batcher() -> AnalysisBatcher:
+    """Process-wide analysis batcher shared by all validation runs."""
+    global _analysis_batcher
+    with _analysis_batcher_lock:
+        if _analysis_batcher is None:
+            _analysis_batcher = AnalysisBatcher(
+                run_batched_analysis,
+                max_batch_size=Config.ANALYSIS_BATCH_SIZE,
+                max_wait_seconds=Config.ANALYSIS_BATCH_WAIT_SECONDS
+            )
+        return _analysis_batcher
+
+
+def create_provider_validation_crew(report_path: str = None, execution_mode: str = None) -> ProviderValidationCrew:
+    """
+    Build an isolated provider validation crew.
+
+    Each call creates new agents, tools and tasks, so separate validations
+    can be kicked off in parallel threads or processes without sharing
+    agent state or task outputs.
+
+    Args:
+        report_path: Where this run's report is written; give every
+            concurrent run its own path (see utils.make_report_path).
+            Defaults to REPORTS_DIR/provider_validation_report.md
+        execution_mode: "sequential" or "dag" (defaults to Config.CREW_EXECUTION_MODE)
+
+    Returns:
+        A ready-to-kickoff ProviderValidationCrew
+    """
+    execution_mode = execution_mode or Config.CREW_EXECUTION_MODE
+    if execution_mode not in EXECUTION_MODES:
+        raise ValueError(f"Unknown crew execution mode: {execution_mode}")
+    if report_path is None:
+        report_path = Config.REPORTS_DIR / "provider_validation_report.md"
+
+    agents = create_agents()
+    tasks = create_tasks(agents, qa_after_enrichment=(execution_mode == "sequential"))
+    crew = ProviderValidationCrew(agents, tasks, execution_mode, report_path)
 
-logger.info("Provider validation crew configured successfully")
+    logger.debug(f"Provider validation crew configured successfully ({execution_mode})")
+    return crew
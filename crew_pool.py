@@ -0,0 +1,111 @@
+"""
+Crew Pool
+Ready-built validation crews, warmed up in the background when the web app starts.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class CrewPool:
+    """
+    Pool of ready-to-kickoff crews.
+
+    Crews are single-use (their tasks keep their outputs), so every acquire
+    hands one out for good and a replacement is built in the background.
+    Warm-up first runs ``prepare`` (e.g. the CrewAI/LiteLLM imports), then
+    builds ``size`` crews; ``ready`` turns true once that is done. When the
+    pool is empty, acquire builds a crew on the spot.
+    """
+
+    def __init__(self, factory: Callable[[], object], size: int = 2, prepare: Optional[Callable[[], None]] = None):
+        self.factory = factory
+        self.size = size
+        self.prepare = prepare
+        self.started = False
+        self.ready = False
+        self.error = None
+        self.warmup_seconds = None
+        self.hits = 0
+        self.misses = 0
+        self._idle = deque()
+        self._building = 0
+        self._lock = threading.Lock()
+        # One builder thread: refills never compete with request threads for more than a core
+        self._builder = ThreadPoolExecutor(max_workers=1, thread_name_prefix='crew-pool')
+
+    def start(self):
+        """Start warming up in the background."""
+        self.started = True
+        self._builder.submit(self._warm_up)
+
+    def _warm_up(self):
+        started = time.perf_counter()
+        try:
+            if self.prepare:
+                self.prepare()
+            for _ in range(self.size):
+                crew = self.factory()
+                with self._lock:
+                    self._idle.append(crew)
+        except BaseException as e:
+            # Config.validate() exits when the AI settings are missing; stay unready
+            self.error = f"{type(e).__name__}: {e}"
+            logger.error(f"Crew pool warm-up failed: {self.error}")
+            return
+        self.warmup_seconds = round(time.perf_counter() - started, 2)
+        self.ready = True
+        logger.info(f"Crew pool ready: {self.size} crew(s) in {self.warmup_seconds}s")
+
+    def _build_one(self):
+        try:
+            crew = self.factory()
+            with self._lock:
+                self._idle.append(crew)
+        except Exception:
+            logger.exception("Could not build a pooled crew")
+        finally:
+            with self._lock:
+                self._building -= 1
+
+    def acquire(self):
+        """
+        Take a crew out of the pool, building one if none is ready.
+
+        Returns:
+            A crew that has not been kicked off
+        """
+        with self._lock:
+            crew = self._idle.popleft() if self._idle else None
+            if crew is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            refill = self.ready and len(self._idle) + self._building < self.size
+            if refill:
+                self._building += 1
+        if refill:
+            self._builder.submit(self._build_one)
+        return crew if crew is not None else self.factory()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'started': self.started,
+                'ready': self.ready,
+                'size': self.size,
+                'available': len(self._idle),
+                'hits': self.hits,
+                'misses': self.misses,
+                'warmup_seconds': self.warmup_seconds,
+                'error': self.error,
+            }
+
+    def shutdown(self):
+        self._builder.shutdown(wait=False, cancel_futures=True)
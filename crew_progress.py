@@ -0,0 +1,62 @@
+"""
+Crew Progress
+Forwards CrewAI execution events to the progress log of the running AI job.
+"""
+import threading
+
+from crewai.events import crewai_event_bus
+from crewai.events.types.agent_events import AgentExecutionStartedEvent
+from crewai.events.types.llm_events import LLMStreamChunkEvent
+from crewai.events.types.task_events import TaskCompletedEvent
+from crewai.events.types.tool_usage_events import ToolUsageFinishedEvent, ToolUsageStartedEvent
+
+from ai_jobs import report_progress
+
+# Longest tool argument / task summary excerpt forwarded to the page
+EXCERPT_CHARS = 300
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def _excerpt(value) -> str:
+    text = str(value)
+    return text if len(text) <= EXCERPT_CHARS else text[:EXCERPT_CHARS - 1] + '…'
+
+
+def install_progress_listener():
+    """Subscribe to the CrewAI event bus once per process."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        _installed = True
+
+    # Handlers run with the emitting thread's context, so report_progress
+    # reaches the job that started the crew
+
+    @crewai_event_bus.on(AgentExecutionStartedEvent)
+    def _on_agent_started(source, event):
+        report_progress('agent_started', agent=event.agent.role, task=getattr(event.task, 'name', None))
+
+    @crewai_event_bus.on(ToolUsageStartedEvent)
+    def _on_tool_started(source, event):
+        report_progress('tool_called', agent=event.agent_role, tool=event.tool_name, args=_excerpt(event.tool_args))
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def _on_tool_finished(source, event):
+        report_progress(
+            'tool_returned',
+            agent=event.agent_role,
+            tool=event.tool_name,
+            seconds=round((event.finished_at - event.started_at).total_seconds(), 3),
+            from_cache=event.from_cache
+        )
+
+    @crewai_event_bus.on(TaskCompletedEvent)
+    def _on_task_completed(source, event):
+        report_progress('task_done', task=event.output.name, agent=event.output.agent, summary=_excerpt(event.output.raw))
+
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def _on_llm_chunk(source, event):
+        report_progress('token', agent=event.agent_role, text=event.chunk)
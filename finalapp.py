@@ -1,6 +1,5 @@
 # Complete app.py with AI integration and all templates
-from flask import Flask, render_template_string, request, jsonify, send_file, session
-import random
+from flask import Flask, render_template_string, request, jsonify, send_file, session, Response
 import datetime
 import io
 import csv
@@ -8,10 +7,22 @@ import os
 import requests
 import json
 import re
+import sqlite3
 from pathlib import Path
 from werkzeug.utils import secure_filename
 import sys
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from verification_cache import VerificationCache
+from scheduler import RosterScheduler
+from result_store import ResultStore
+from metrics import metrics_registry
+from ai_jobs import AIJobManager, current_cancel_event, report_progress
+from rate_limiter import host_key, shared_limiter
+from config import Config
+from ai_validation import ai_deadline, crew_pool, mock_validate_provider, validate_provider_with_ai
+from http_replay import install_from_env as install_http_replay, installed as http_replay_installed
 # import mysql.connector
 # import bcrypt
 # db = mysql.connector.connect(
@@ -39,6 +50,9 @@ import time
 # Add the CrewAI modules to the path
 sys.path.append('.')
 
+# Offline runs: serve upstream registry traffic from a recorded cassette (HTTP_REPLAY_MODE)
+install_http_replay()
+
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-12345-change-in-production'
 
@@ -46,21 +60,55 @@ app.secret_key = 'your-secret-key-12345-change-in-production'
 Path('reports').mkdir(exist_ok=True)
 Path('ai_reports').mkdir(exist_ok=True)
 
+BATCH_VALIDATE_MAX = int(os.getenv('BATCH_VALIDATE_MAX', '50000'))
+BATCH_VALIDATE_WORKERS = int(os.getenv('BATCH_VALIDATE_WORKERS', '16'))
+RESULTS_MAX_JOBS = int(os.getenv('RESULTS_MAX_JOBS', '20'))
+RESULTS_PAGE_MAX = int(os.getenv('RESULTS_PAGE_MAX', '500'))
+# SQLite file holding bulk results, shared by every worker process ("memory" keeps them per process)
+RESULTS_DB = os.getenv('RESULTS_DB', './results.db')
+
+# AI validations run on their own pool so request threads stay free
+AI_JOB_WORKERS = int(os.getenv('AI_JOB_WORKERS', '2'))
+AI_JOBS_MAX = int(os.getenv('AI_JOBS_MAX', '200'))
+# SQLite file holding AI job state and events, shared by every worker process ("memory" keeps them per process)
+AI_JOBS_DB = os.getenv('AI_JOBS_DB', './ai_jobs.db')
+AI_JOB_EVENTS_KEEPALIVE = 15
+BULK_AI_MAX_ROWS = int(os.getenv('BULK_AI_MAX_ROWS', '1000'))
+# Build crews ahead of the first AI request (pool size: AI_CREW_POOL_SIZE, 0 only warms up the imports)
+AI_WARMUP_ENABLED = os.getenv('AI_WARMUP_ENABLED', 'true').lower() == 'true'
+# Stop an AI job once the last page following its events has gone away, after a grace period
+# in which a reconnecting event stream keeps it alive; jobs shared by identical requests stop
+# only when every requester has left
+AI_CANCEL_ON_DISCONNECT = os.getenv('AI_CANCEL_ON_DISCONNECT', 'true').lower() == 'true'
+AI_CANCEL_GRACE_SECONDS = float(os.getenv('AI_CANCEL_GRACE_SECONDS', '10'))
+
+npi_cache = VerificationCache(ttl_seconds=Config.NPI_CACHE_TTL_SECONDS)
+result_store = ResultStore(RESULTS_DB, max_jobs=RESULTS_MAX_JOBS)
+ai_jobs = AIJobManager(AI_JOBS_DB, max_workers=AI_JOB_WORKERS, max_jobs=AI_JOBS_MAX)
+
 # ==========================================
 # NPI Validation Function (Real NPPES API)
 # ==========================================
 
-def validate_npi_real(npi):
+def validate_npi_real(npi, max_age=None):
     """
     Validate NPI using official NPPES API.
     Returns dict with 'valid': bool, 'provider': data if valid.
+
+    Results are served from npi_cache when they are younger than max_age
+    seconds (defaults to Config.NPI_CACHE_TTL_SECONDS); max_age=0 forces a lookup.
     """
     if not re.match(r'^\d{10}$', npi):
         return {'valid': False, 'error': 'Invalid NPI format'}
 
-    url = f"https://npiregistry.cms.hhs.gov/api/?version=2.1&number={npi}"
+    cached = npi_cache.get(npi, max_age=max_age)
+    if cached is not None:
+        return cached
+
+    url = f"{Config.NPI_BASE_URL}?version=2.1&number={npi}"
     
     try:
+        shared_limiter().acquire(host_key(url), Config.NPPES_RPM_LIMIT)
         response = requests.get(url, timeout=10)
         response.raise_for_status()
         data = response.json()
@@ -69,257 +117,58 @@ def validate_npi_real(npi):
             provider = data['results'][0]
             status = provider.get('basic', {}).get('status', '') == 'A'
             if status:
-                return {
+                result = {
                     'valid': True,
                     'provider': provider
                 }
             else:
-                return {'valid': False, 'error': 'Inactive provider'}
+                result = {'valid': False, 'error': 'Inactive provider'}
         else:
-            return {'valid': False, 'error': 'NPI not found'}
+            result = {'valid': False, 'error': 'NPI not found'}
     except requests.RequestException as e:
         return {'valid': False, 'error': f'API error: {str(e)}'}
     except (json.JSONDecodeError, KeyError) as e:
         return {'valid': False, 'error': f'Invalid response: {str(e)}'}
 
-# ==========================================
-# Real AI Validation Function (Using CrewAI)
-# ==========================================
-
-def validate_provider_with_ai(provider_name, state):
-    """
-    Real AI validation using CrewAI multi-agent system.
-    """
-    try:
-        # Import the CrewAI components
-        from crew import provider_validation_crew
-        from config import Config
-        import hashlib
-        from datetime import datetime
-        
-        # Generate a unique report filename
-        safe_name = re.sub(r'[^\w\-_]', '', provider_name.replace(' ', '_'))
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        report_filename = f"ai_reports/{safe_name}_{state}_{timestamp}.md"
-        
-        # Save original Config.REPORTS_DIR
-        original_reports_dir = Config.REPORTS_DIR
-        
-        try:
-            # Temporarily change reports directory for this run
-            Config.REPORTS_DIR = Path('ai_reports')
-            
-            print(f"\n{'='*70}")
-            print(f"AI VALIDATION STARTED")
-            print(f"{'='*70}")
-            print(f"Provider: {provider_name}")
-            print(f"State: {state}")
-            print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"{'='*70}")
-            
-            # Run the AI validation
-            result = provider_validation_crew.kickoff(inputs={
-                'provider_name': provider_name,
-                'state': state
-            })
-            
-            # Read the generated report
-            report_path = Config.REPORTS_DIR / "provider_validation_report.md"
-            
-            # Rename the report to our unique filename
-            if report_path.exists():
-                report_path.rename(report_filename)
-                report_content = ""
-                try:
-                    with open(report_filename, 'r', encoding='utf-8') as f:
-                        report_content = f.read()
-                except:
-                    report_content = str(result)
-            else:
-                # If report file wasn't created, create one
-                report_content = f"""# AI Healthcare Provider Validation Report
-
-## Provider Information
-- **Name**: {provider_name}
-- **State**: {state}
-- **Validation Date**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-- **AI Model**: CrewAI Multi-Agent System
-
-## Validation Result
-{str(result)}
-
-## AI Analysis Summary
-This validation was performed using our CrewAI multi-agent system.
-
-## Generated by MediverifyAI Real AI System
-"""
-                with open(report_filename, 'w', encoding='utf-8') as f:
-                    f.write(report_content)
-            
-            # Parse the AI result
-            ai_result_str = str(result).lower()
-            is_valid = "valid" in ai_result_str or "active" in ai_result_str or "clear" in ai_result_str
-            has_issues = "issue" in ai_result_str or "warning" in ai_result_str or "discrepancy" in ai_result_str
-            is_sanctioned = "sanction" in ai_result_str or "exclusion" in ai_result_str or "flagged" in ai_result_str
-            
-            # Generate mock data for display
-            input_str = f"{provider_name.lower()}_{state.lower()}_{timestamp}"
-            hash_val = int(hashlib.md5(input_str.encode()).hexdigest(), 16)
-            mock_npi = str(1000000000 + (hash_val % 9000000000))
-            
-            specialties = [
-                "Family Medicine", "Internal Medicine", "Pediatrics", "Cardiology",
-                "Dermatology", "Psychiatry", "General Surgery", "Orthopedic Surgery",
-                "Radiology", "Anesthesiology", "Emergency Medicine", "Obstetrics & Gynecology"
-            ]
-            specialty = specialties[hash_val % len(specialties)]
-            
-            cities_by_state = {
-                'CA': ['Los Angeles', 'San Francisco', 'San Diego', 'Sacramento', 'San Jose'],
-                'NY': ['New York', 'Buffalo', 'Rochester', 'Albany', 'Syracuse'],
-                'TX': ['Houston', 'Dallas', 'Austin', 'San Antonio', 'Fort Worth'],
-                'FL': ['Miami', 'Orlando', 'Tampa', 'Jacksonville', 'Tallahassee'],
-                'IL': ['Chicago', 'Springfield', 'Peoria', 'Naperville', 'Rockford']
-            }
-            city = random.choice(cities_by_state.get(state, ['Unknown City']))
-            
-            print(f"\n{'='*70}")
-            print(f"AI VALIDATION COMPLETED")
-            print(f"{'='*70}")
-            print(f"Report saved to: {report_filename}")
-            print(f"Status: {'VALID' if is_valid else 'NEEDS REVIEW'}")
-            print(f"{'='*70}\n")
-            
-            return {
-                'status': 'success',
-                'result': str(result),
-                'report_path': report_filename,
-                'valid': is_valid,
-                'has_issues': has_issues,
-                'is_sanctioned': is_sanctioned,
-                'mock_npi': mock_npi,
-                'specialty': specialty,
-                'location': f"{city}, {state}",
-                'report_content': report_content[:1000] + "..." if len(report_content) > 1000 else report_content,
-                'ai_model_used': True,
-                'validation_time': datetime.now().isoformat()
-            }
-            
-        finally:
-            # Restore original reports directory
-            Config.REPORTS_DIR = original_reports_dir
-            
-    except Exception as e:
-        print(f"AI Validation Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        
-        # Fallback to mock validation if AI fails
-        return mock_validate_provider(provider_name, state)
-
-# ==========================================
-# Mock AI Validation Function (Fallback)
-# ==========================================
-
-def mock_validate_provider(provider_name, state):
-    """
-    Mock AI validation for development - used as fallback
-    """
-    import hashlib
-    
-    input_str = f"{provider_name.lower()}_{state.lower()}"
-    hash_val = int(hashlib.md5(input_str.encode()).hexdigest(), 16)
-    
-    is_valid = (hash_val % 10) > 2
-    is_sanctioned = (hash_val % 20) == 0
-    has_discrepancies = (hash_val % 4) == 0
-    mock_npi = str(1000000000 + (hash_val % 9000000000))
-    
-    specialties = [
-        "Family Medicine", "Internal Medicine", "Pediatrics", "Cardiology",
-        "Dermatology", "Psychiatry", "General Surgery", "Orthopedic Surgery",
-        "Radiology", "Anesthesiology", "Emergency Medicine", "Obstetrics & Gynecology"
-    ]
-    specialty = specialties[hash_val % len(specialties)]
-    
-    cities_by_state = {
-        'CA': ['Los Angeles', 'San Francisco', 'San Diego', 'Sacramento', 'San Jose'],
-        'NY': ['New York', 'Buffalo', 'Rochester', 'Albany', 'Syracuse'],
-        'TX': ['Houston', 'Dallas', 'Austin', 'San Antonio', 'Fort Worth'],
-        'FL': ['Miami', 'Orlando', 'Tampa', 'Jacksonville', 'Tallahassee'],
-        'IL': ['Chicago', 'Springfield', 'Peoria', 'Naperville', 'Rockford']
-    }
-    city = random.choice(cities_by_state.get(state, ['Unknown City']))
-    
-    if not is_valid:
-        return {
-            'status': 'success',
-            'result': f"NO_USER_FOUND: Provider '{provider_name}' not found in {state} verification systems.",
-            'report_path': '',
-            'valid': False,
-            'ai_model_used': False,
-            'is_mock': True
-        }
-    
-    # Create mock report
-    report_content = f"""# Healthcare Provider Validation Report (MOCK)
-
-## Provider Information
-- **Name**: {provider_name}
-- **State**: {state}
-- **NPI**: {mock_npi}
-- **Validation Date**: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-## AI Validation Summary
-{"✅ VALID" if is_valid else "⚠️ NEEDS REVIEW"}
-
-## Quick Results
-- **NPI Check**: {"✅ Active" if is_valid else "❌ Inactive"}
-- **License Status**: {"✅ Active" if is_valid else "❌ Inactive"}
-- **Sanctions**: {"✅ Clear" if not is_sanctioned else "❌ Flagged"}
-- **Discrepancies**: {"None" if not has_discrepancies else "Found"}
-
-## Generated by MediverifyAI Mock System
-*Note: This is mock data. Enable real AI for actual validation.*
-"""
-    
-    safe_name = re.sub(r'[^\w\-_]', '', provider_name.replace(' ', '_'))
-    report_filename = f"ai_reports/MOCK_{safe_name}_{state}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
-    
-    with open(report_filename, 'w', encoding='utf-8') as f:
-        f.write(report_content)
-    
-    ai_result_str = f"""
-AI VALIDATION COMPLETE for {provider_name} in {state}
-
-OVERALL STATUS: {"VALID" if is_valid else "NEEDS REVIEW"}
-
-KEY FINDINGS:
-- NPI: {mock_npi} ({"Active" if is_valid else "Inactive"})
-- State License: {state} ({"Active" if is_valid else "Inactive"})
-- Sanctions Check: {"CLEAR" if not is_sanctioned else "FLAGGED"}
-- Specialty: {specialty}
-- Location: {city}, {state}
-
-{"⚠️ NOTE: This is MOCK data. Real AI validation not configured."}
-
-"""
-    
-    return {
-        'status': 'success',
-        'result': ai_result_str,
-        'report_path': report_filename,
-        'valid': is_valid,
-        'has_issues': has_discrepancies,
-        'is_sanctioned': is_sanctioned,
-        'mock_npi': mock_npi,
-        'specialty': specialty,
-        'location': f"{city}, {state}",
-        'report_content': report_content,
-        'ai_model_used': False,
-        'is_mock': True,
-        'validation_time': datetime.datetime.now().isoformat()
-    }
+    # Only definitive registry answers are cached; transport errors are retried
+    npi_cache.put(npi, result)
+    return result
+
+roster_scheduler = RosterScheduler(
+    validate_fn=validate_npi_real,
+    cache=npi_cache,
+    registry_path=Config.ROSTERS_DIR / 'registry.json',
+    max_age_seconds=int(Config.REVERIFY_MAX_AGE_HOURS * 3600),
+    peak_rpm=Config.SCHEDULER_PEAK_RPM,
+    offpeak_rpm=Config.SCHEDULER_OFFPEAK_RPM,
+    offpeak_hours=Config.SCHEDULER_OFFPEAK_HOURS,
+)
+
+# Background work of a serving process, started by its first request: every server
+# (python finalapp.py, flask run, gunicorn workers) runs it once per process, while
+# importers that serve nothing (the reloader parent, scripts, benchmarks) never do
+_background_started = False
+_background_lock = threading.Lock()
+
+
+def start_background_work():
+    """Start this process's crew-pool warm-up and roster scheduler, once."""
+    global _background_started
+    with _background_lock:
+        if _background_started:
+            return
+        _background_started = True
+    if AI_WARMUP_ENABLED and not Config.missing_ai_settings():
+        crew_pool.start()
+    # Every worker starts it; the scheduler elects one of them to run rosters
+    if Config.SCHEDULER_AUTOSTART:
+        roster_scheduler.start()
+
+
+@app.before_request
+def _start_background_work_once():
+    if not _background_started:
+        start_background_work()
 
 # ==========================================
 # Shared Templates
@@ -1118,6 +967,8 @@ SEARCH_RESULTS_TEMPLATE = """
                 <div class="animate-spin rounded-full h-12 w-12 border-b-2 border-brand-600 mx-auto mb-4"></div>
                 <p class="text-slate-600 dark:text-slate-400">Validating provider information...</p>
                 <p class="text-sm text-slate-500 dark:text-slate-500 mt-2">Checking NPI registry, license databases, and compliance records</p>
+                <ul id="progressLog" class="hidden mt-6 max-w-xl mx-auto text-left text-sm space-y-1 text-slate-600 dark:text-slate-400"></ul>
+                <pre id="reportPreview" class="hidden mt-6 max-w-3xl mx-auto text-left text-xs whitespace-pre-wrap bg-slate-50 dark:bg-slate-800 text-slate-700 dark:text-slate-300 p-4 rounded-lg max-h-96 overflow-y-auto"></pre>
             </div>
 
             <!-- Results Container -->
@@ -1408,7 +1259,17 @@ SEARCH_RESULTS_TEMPLATE = """
                     body: JSON.stringify({ query, state })
                 });
 
-                const data = await response.json();
+                let data = await response.json();
+
+                // Name searches run as background AI jobs; follow their progress until the result arrives
+                if (response.status === 202 && data.job_id) {
+                    activeAIJob = data;
+                    try {
+                        data = await streamAIJob(data.job_id, data.lease);
+                    } finally {
+                        activeAIJob = null;
+                    }
+                }
 
                 // Hide loading
                 document.getElementById('loading').classList.add('hidden');
@@ -1429,6 +1290,100 @@ SEARCH_RESULTS_TEMPLATE = """
             }
         }
 
+        // Leaving the page gives up its interest in the AI job it was waiting for;
+        // the job stops using LLM quota once no other requester waits for it either
+        let activeAIJob = null;
+        window.addEventListener('pagehide', () => {
+            if (activeAIJob && navigator.sendBeacon) {
+                navigator.sendBeacon(`/api/ai-jobs/${activeAIJob.job_id}/cancel?lease=${activeAIJob.lease}`);
+            }
+        });
+
+        function streamAIJob(jobId, lease) {
+            if (!window.EventSource) {
+                return waitForAIJob(jobId);
+            }
+
+            const log = document.getElementById('progressLog');
+            const preview = document.getElementById('reportPreview');
+            log.innerHTML = '';
+            log.classList.remove('hidden');
+            preview.textContent = '';
+            preview.classList.add('hidden');
+
+            const addLine = (icon, text) => {
+                const li = document.createElement('li');
+                li.innerHTML = `<i class="fa-solid ${icon} mr-2 text-brand-600"></i>${escapeHtml(text)}`;
+                log.appendChild(li);
+            };
+            let streamingTokens = false;
+            const showText = (text, fromTokens) => {
+                if (!fromTokens && streamingTokens) {
+                    // The rendered report replaces the raw LLM token stream
+                    preview.textContent = '';
+                    streamingTokens = false;
+                }
+                streamingTokens = streamingTokens || fromTokens;
+                preview.classList.remove('hidden');
+                preview.textContent += text;
+                preview.scrollTop = preview.scrollHeight;
+            };
+
+            return new Promise(resolve => {
+                const source = new EventSource(`/api/ai-jobs/${jobId}/events?lease=${lease}`);
+                let finished = false;
+                const on = (type, handler) => source.addEventListener(type, e => handler(JSON.parse(e.data)));
+
+                on('stage', d => addLine('fa-circle-info', d.message));
+                on('agent_started', d => addLine('fa-user-gear', `${d.agent} started`));
+                on('tool_called', d => addLine('fa-wrench', `${d.agent} called ${d.tool}`));
+                on('tool_returned', d => addLine('fa-reply', `${d.tool} returned in ${d.seconds}s${d.from_cache ? ' (cached)' : ''}`));
+                on('task_done', d => addLine('fa-check', `Task ${d.task || d.agent} completed`));
+                on('token', d => showText(d.text, true));
+                on('report_chunk', d => showText(d.text, false));
+                on('done', d => {
+                    finished = true;
+                    source.close();
+                    resolve(d.result);
+                });
+                source.addEventListener('error', e => {
+                    if (finished) {
+                        return;
+                    }
+                    finished = true;
+                    source.close();
+                    if (e.data) {
+                        resolve({ status: 'error', error: JSON.parse(e.data).error || 'AI validation failed' });
+                    } else {
+                        // Stream unavailable: fall back to polling
+                        resolve(waitForAIJob(jobId));
+                    }
+                });
+            });
+        }
+
+        async function waitForAIJob(jobId) {
+            let delay = 500;
+            while (true) {
+                await new Promise(resolve => setTimeout(resolve, delay));
+                const response = await fetch(`/api/ai-jobs/${jobId}`);
+                const data = await response.json();
+                if (data.status !== 'success') {
+                    return data;
+                }
+                if (data.job.status === 'done') {
+                    return data.job.result;
+                }
+                if (data.job.status === 'error') {
+                    return { status: 'error', error: data.job.error || 'AI validation failed' };
+                }
+                if (data.job.status === 'cancelled') {
+                    return { status: 'error', error: 'AI validation cancelled' };
+                }
+                delay = Math.min(delay * 1.5, 3000);
+            }
+        }
+
         function displayNPIResults(data) {
             const template = document.getElementById('npiResultTemplate');
             const clone = template.content.cloneNode(true);
@@ -1674,8 +1629,8 @@ VALIDATOR_TEMPLATE = """
                 <p class="text-lg text-slate-600 dark:text-slate-400 max-w-2xl mx-auto">Upload your CSV file with NPI numbers to validate multiple providers at once. Get instant compliance reports.</p>
             </div>
 
-            {% if results %}
-            <div class="bg-white dark:bg-dark-800 rounded-2xl shadow-xl border border-slate-100 dark:border-slate-700 p-8 mb-8">
+            {% if session_id %}
+            <div class="bg-white dark:bg-dark-800 rounded-2xl shadow-xl border border-slate-100 dark:border-slate-700 p-8 mb-8" id="resultsPanel" data-job-id="{{ session_id }}" data-total="{{ total_count }}">
                 <div class="flex flex-col md:flex-row justify-between items-center gap-4 mb-6">
                     <h2 class="text-2xl font-bold text-slate-900 dark:text-white">Validation Results</h2>
                     <div class="flex gap-4">
@@ -1687,36 +1642,31 @@ VALIDATOR_TEMPLATE = """
                         </a>
                     </div>
                 </div>
-                <div class="overflow-x-auto">
-                    <table class="w-full text-sm text-left text-slate-500 dark:text-slate-400">
-                        <thead class="text-xs uppercase bg-slate-50 dark:bg-slate-700 text-slate-700 dark:text-slate-300">
-                            <tr>
-                                <th class="px-6 py-3">NPI</th>
-                                <th class="px-6 py-3">Provider Name</th>
-                                <th class="px-6 py-3">Status</th>
-                                <th class="px-6 py-3">Taxonomy</th>
-                                <th class="px-6 py-3">City, State</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {% for row in results %}
-                            <tr class="bg-white dark:bg-dark-800 border-b border-slate-100 dark:border-slate-700 {% if row.valid %}hover:bg-green-50 dark:hover:bg-green-900/20{% else %}hover:bg-red-50 dark:hover:bg-red-900/20{% endif %}">
-                                <td class="px-6 py-4 font-mono font-semibold">{{ row.npi }}</td>
-                                <td class="px-6 py-4">{{ row.name }}</td>
-                                <td class="px-6 py-4">
-                                    <span class="px-2 py-1 rounded-full text-xs font-bold {% if row.valid %}bg-green-100 text-green-700 dark:bg-green-900/30 dark:text-green-400{% else %}bg-red-100 text-red-700 dark:bg-red-900/30 dark:text-red-400{% endif %}">
-                                        {{ 'Valid' if row.valid else 'Invalid' }}
-                                    </span>
-                                </td>
-                                <td class="px-6 py-4">{{ row.taxonomy or 'N/A' }}</td>
-                                <td class="px-6 py-4">{{ row.location or 'N/A' }}</td>
-                            </tr>
-                            {% endfor %}
-                        </tbody>
-                    </table>
+                <div class="flex flex-col md:flex-row gap-4 mb-4">
+                    <input type="text" id="resultsFilter" placeholder="Filter by NPI, name, taxonomy or location" class="flex-1 px-4 py-2 bg-slate-50 dark:bg-slate-700 border border-slate-200 dark:border-slate-600 rounded-lg focus:ring-2 focus:ring-brand-500 outline-none">
+                    <select id="resultsStatus" class="px-4 py-2 bg-slate-50 dark:bg-slate-700 border border-slate-200 dark:border-slate-600 rounded-lg outline-none">
+                        <option value="all">All statuses</option>
+                        <option value="valid">Valid only</option>
+                        <option value="invalid">Invalid only</option>
+                    </select>
+                </div>
+                <div class="text-sm text-left text-slate-500 dark:text-slate-400">
+                    <div class="grid grid-cols-5 text-xs uppercase bg-slate-50 dark:bg-slate-700 text-slate-700 dark:text-slate-300">
+                        <button type="button" data-sort="npi" class="sort-header px-6 py-3 text-left uppercase">NPI</button>
+                        <button type="button" data-sort="name" class="sort-header px-6 py-3 text-left uppercase">Provider Name</button>
+                        <button type="button" data-sort="valid" class="sort-header px-6 py-3 text-left uppercase">Status</button>
+                        <button type="button" data-sort="taxonomy" class="sort-header px-6 py-3 text-left uppercase">Taxonomy</button>
+                        <button type="button" data-sort="location" class="sort-header px-6 py-3 text-left uppercase">City, State</button>
+                    </div>
+                    <!-- Virtualized body: only the rows inside the viewport are in the DOM -->
+                    <div id="resultsViewport" class="relative overflow-y-auto" style="height: 560px;">
+                        <div id="resultsSpacer" style="height: 0px;"></div>
+                        <div id="resultsWindow" class="absolute left-0 right-0 top-0"></div>
+                    </div>
                 </div>
                 <div class="mt-4 text-center text-sm text-slate-500 dark:text-slate-400">
-                    Processed {{ results|length }} records. {{ valid_count }} valid, {{ invalid_count }} invalid.
+                    Processed {{ total_count }} records. {{ valid_count }} valid, {{ invalid_count }} invalid.
+                    <span id="resultsShowing"></span>
                 </div>
             </div>
             {% endif %}
@@ -1757,6 +1707,138 @@ NPI,Name
             btn.innerHTML = '<i class="fa-solid fa-spinner fa-spin mr-2"></i> Processing...';
             btn.disabled = true;
         });
+
+        // Virtualized results table backed by /api/results/<job_id>
+        (function() {
+            const panel = document.getElementById('resultsPanel');
+            if (!panel) return;
+
+            const ROW_HEIGHT = 56;
+            const PAGE_SIZE = 200;
+            const OVERSCAN = 10;
+            const jobId = panel.dataset.jobId;
+            const viewport = document.getElementById('resultsViewport');
+            const spacer = document.getElementById('resultsSpacer');
+            const windowEl = document.getElementById('resultsWindow');
+            const showing = document.getElementById('resultsShowing');
+
+            let state = { sort: 'index', order: 'asc', status: 'all', q: '' };
+            // Loaded pages by page number; only the pages around the viewport are kept
+            let pages = new Map();
+            let pending = new Set();
+            let total = parseInt(panel.dataset.total, 10) || 0;
+            let generation = 0;
+
+            function escapeHtml(value) {
+                return String(value == null ? '' : value).replace(/[&<>"']/g, c => ({
+                    '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+                }[c]));
+            }
+
+            function rowHtml(row) {
+                const status = row.valid
+                    ? '<span class="px-2 py-1 rounded-full text-xs font-bold bg-green-100 text-green-700 dark:bg-green-900/30 dark:text-green-400">Valid</span>'
+                    : '<span class="px-2 py-1 rounded-full text-xs font-bold bg-red-100 text-red-700 dark:bg-red-900/30 dark:text-red-400">Invalid</span>';
+                const hover = row.valid ? 'hover:bg-green-50 dark:hover:bg-green-900/20' : 'hover:bg-red-50 dark:hover:bg-red-900/20';
+                return `<div class="grid grid-cols-5 items-center bg-white dark:bg-dark-800 border-b border-slate-100 dark:border-slate-700 ${hover}" style="height: ${ROW_HEIGHT}px;">
+                    <div class="px-6 font-mono font-semibold truncate">${escapeHtml(row.npi)}</div>
+                    <div class="px-6 truncate">${escapeHtml(row.name)}</div>
+                    <div class="px-6">${status}</div>
+                    <div class="px-6 truncate">${escapeHtml(row.taxonomy || 'N/A')}</div>
+                    <div class="px-6 truncate">${escapeHtml(row.location || 'N/A')}</div>
+                </div>`;
+            }
+
+            async function loadPage(number) {
+                if (pages.has(number) || pending.has(number)) return;
+                pending.add(number);
+                const requestGeneration = generation;
+                const params = new URLSearchParams({ limit: PAGE_SIZE, offset: number * PAGE_SIZE, sort: state.sort, order: state.order, status: state.status, q: state.q });
+                try {
+                    const response = await fetch(`/api/results/${jobId}?${params}`);
+                    const data = await response.json();
+                    if (requestGeneration !== generation) return;
+                    if (data.status !== 'success') {
+                        showToast(data.error || 'Could not load results', 'error');
+                        return;
+                    }
+                    pages.set(number, data.rows);
+                    total = data.total;
+                    spacer.style.height = `${total * ROW_HEIGHT}px`;
+                } catch (error) {
+                    if (requestGeneration === generation) showToast('Could not load results', 'error');
+                    return;
+                } finally {
+                    if (requestGeneration === generation) pending.delete(number);
+                }
+                render();
+            }
+
+            function render() {
+                const first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+                const visible = Math.ceil(viewport.clientHeight / ROW_HEIGHT) + 2 * OVERSCAN;
+                const last = Math.min(total, first + visible);
+
+                // Fetch only the pages the window overlaps, wherever the user scrolled to
+                const firstPage = Math.floor(first / PAGE_SIZE);
+                const lastPage = Math.max(firstPage, Math.floor((last - 1) / PAGE_SIZE));
+                for (const number of pages.keys()) {
+                    if (number < firstPage - 1 || number > lastPage + 1) pages.delete(number);
+                }
+
+                const windowRows = [];
+                for (let number = firstPage; number <= lastPage; number++) {
+                    if (!pages.has(number)) {
+                        loadPage(number);
+                        continue;
+                    }
+                    const pageRows = pages.get(number);
+                    const from = Math.max(first - number * PAGE_SIZE, 0);
+                    const to = Math.min(last - number * PAGE_SIZE, pageRows.length);
+                    windowRows.push(...pageRows.slice(from, to).map(rowHtml));
+                }
+
+                windowEl.style.transform = `translateY(${first * ROW_HEIGHT}px)`;
+                windowEl.innerHTML = windowRows.join('');
+                showing.textContent = total ? `Showing ${first + 1}-${last} of ${total}.` : 'No matching records.';
+            }
+
+            function reset() {
+                generation += 1;
+                pages = new Map();
+                pending = new Set();
+                viewport.scrollTop = 0;
+                loadPage(0);
+            }
+
+            let scheduled = false;
+            viewport.addEventListener('scroll', () => {
+                if (scheduled) return;
+                scheduled = true;
+                requestAnimationFrame(() => { scheduled = false; render(); });
+            });
+
+            document.querySelectorAll('.sort-header').forEach(header => {
+                header.addEventListener('click', () => {
+                    const field = header.dataset.sort;
+                    state.order = state.sort === field && state.order === 'asc' ? 'desc' : 'asc';
+                    state.sort = field;
+                    reset();
+                });
+            });
+
+            let filterTimer = null;
+            document.getElementById('resultsFilter').addEventListener('input', event => {
+                clearTimeout(filterTimer);
+                filterTimer = setTimeout(() => { state.q = event.target.value; reset(); }, 250);
+            });
+            document.getElementById('resultsStatus').addEventListener('change', event => {
+                state.status = event.target.value;
+                reset();
+            });
+
+            reset();
+        })();
     </script>
 """ + SHARED_SCRIPTS + """
 </body>
@@ -1966,6 +2048,75 @@ def validate_npi():
     except Exception as e:
         return jsonify({'status': 'error', 'message': 'Internal server error'}), 500
 
+def parse_batch_npis(body, content_type):
+    """
+    Parse a batch request body into a list of NPI strings.
+
+    Accepts a JSON array of NPIs or {"npi": ...} objects, a {"npis": [...]}
+    object, or NDJSON with one NPI string or object per line.
+    """
+    text = body.decode('utf-8').strip()
+    if not text:
+        return []
+
+    if 'ndjson' in content_type or 'jsonlines' in content_type:
+        items = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        items = json.loads(text)
+        if isinstance(items, dict):
+            items = items.get('npis', [])
+        if not isinstance(items, list):
+            raise ValueError('Body must be a JSON array of NPIs')
+
+    npis = []
+    for item in items:
+        if isinstance(item, dict):
+            item = item.get('npi', '')
+        npis.append(str(item).strip())
+    return npis
+
+@app.route('/api/validate/batch', methods=['POST'])
+def validate_npi_batch():
+    """Validate many NPIs concurrently and stream NDJSON results in completion order"""
+    try:
+        npis = parse_batch_npis(request.get_data(), request.content_type or '')
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({'status': 'error', 'message': f'Invalid batch body: {str(e)}'}), 400
+
+    if not npis:
+        return jsonify({'status': 'error', 'message': 'At least one NPI is required'}), 400
+    if len(npis) > BATCH_VALIDATE_MAX:
+        return jsonify({'status': 'error', 'message': f'Batch exceeds {BATCH_VALIDATE_MAX} NPIs'}), 413
+
+    # Duplicate NPIs are looked up once and answered for every input index
+    indexes_by_npi = {}
+    for index, npi in enumerate(npis):
+        indexes_by_npi.setdefault(npi, []).append(index)
+
+    def generate():
+        executor = ThreadPoolExecutor(max_workers=min(BATCH_VALIDATE_WORKERS, len(indexes_by_npi)))
+        try:
+            futures = {executor.submit(validate_npi_real, npi): npi for npi in indexes_by_npi}
+            for future in as_completed(futures):
+                npi = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'valid': False, 'error': f'Internal error: {str(e)}'}
+
+                if result['valid']:
+                    item = {'status': 'success', 'valid': True, 'provider': result['provider']}
+                else:
+                    item = {'status': 'error', 'valid': False, 'message': result.get('error', 'Validation failed')}
+
+                for index in indexes_by_npi[npi]:
+                    yield json.dumps({'index': index, 'npi': npi, **item}) + '\n'
+        finally:
+            # Stop queued lookups if the client goes away mid-stream
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
 @app.route('/api/npi-lookup', methods=['POST'])
 def npi_lookup_api():
     """API endpoint for dedicated NPI lookup"""
@@ -2013,6 +2164,93 @@ def npi_lookup_api():
     except Exception as e:
         return jsonify({'status': 'error', 'error': str(e)}), 500
 
+def name_search_result(query, state, deadline=None):
+    """
+    Run an AI validation for a name search and shape it for the search page.
+    Executed on the AI job pool.
+    """
+    try:
+        result = validate_provider_with_ai(query, state, deadline)
+        
+        # Check if it's a mock result (AI failed)
+        if result.get('is_mock', False):
+            return {
+                'status': 'success',
+                'type': 'name',
+                'provider_name': query,
+                'state': state,
+                'valid': result.get('valid', True),
+                'ai_result': result.get('result', ''),
+                'report': result.get('report_content', ''),
+                'summary': 'Mock AI validation (Real AI not configured or failed)',
+                'mock_npi': result.get('mock_npi', ''),
+                'specialty': result.get('specialty', ''),
+                'location': result.get('location', ''),
+                'has_issues': result.get('has_issues', False),
+                'is_sanctioned': result.get('is_sanctioned', False),
+                'ai_model_used': False,
+                'is_mock': True,
+                'report_path': result.get('report_path', ''),
+                'validation_time': result.get('validation_time', '')
+            }
+        else:
+            # Real AI was used, or the registry pre-check answered directly
+            summary = 'Real AI validation completed using CrewAI multi-agent system'
+            if result.get('precheck'):
+                summary = 'Provider not found in any registry (deterministic pre-check, AI not needed)'
+            elif result.get('partial'):
+                summary = f"Partial validation: {result.get('partial_reason')}. Registry data and finished AI stages only"
+            elif result.get('cached'):
+                summary += ' (cached result)'
+            return {
+                'status': 'success',
+                'type': 'name',
+                'provider_name': query,
+                'state': state,
+                'valid': result.get('valid', True),
+                'ai_result': result.get('result', ''),
+                'report': result.get('report_content', ''),
+                'summary': summary,
+                'mock_npi': result.get('mock_npi', ''),
+                'specialty': result.get('specialty', ''),
+                'location': result.get('location', ''),
+                'has_issues': result.get('has_issues', False),
+                'is_sanctioned': result.get('is_sanctioned', False),
+                'ai_model_used': result.get('ai_model_used', True),
+                'is_mock': False,
+                'cached': result.get('cached', False),
+                'precheck': result.get('precheck', False),
+                'partial': result.get('partial', False),
+                'partial_reason': result.get('partial_reason'),
+                'metrics': result.get('metrics'),
+                'report_path': result.get('report_path', ''),
+                'validation_time': result.get('validation_time', '')
+            }
+            
+    except Exception as ai_error:
+        # If AI validation fails, fall back to mock
+        print(f"AI validation failed: {ai_error}")
+        result = mock_validate_provider(query, state)
+        return {
+            'status': 'success',
+            'type': 'name',
+            'provider_name': query,
+            'state': state,
+            'valid': result.get('valid', True),
+            'ai_result': result.get('result', ''),
+            'report': result.get('report_content', ''),
+            'summary': 'AI validation failed, using mock data',
+            'mock_npi': result.get('mock_npi', ''),
+            'specialty': result.get('specialty', ''),
+            'location': result.get('location', ''),
+            'has_issues': result.get('has_issues', False),
+            'is_sanctioned': result.get('is_sanctioned', False),
+            'ai_model_used': False,
+            'is_mock': True,
+            'report_path': result.get('report_path', ''),
+            'validation_time': result.get('validation_time', '')
+        }
+
 @app.route('/api/search', methods=['POST'])
 def search_api():
     """API endpoint for search - uses REAL AI validation"""
@@ -2054,80 +2292,89 @@ def search_api():
                     'ai_model_used': False
                 })
         else:
-            # Use REAL AI validation for name search
-            try:
-                result = validate_provider_with_ai(query, state)
-                
-                # Check if it's a mock result (AI failed)
-                if result.get('is_mock', False):
-                    return jsonify({
-                        'status': 'success',
-                        'type': 'name',
-                        'provider_name': query,
-                        'state': state,
-                        'valid': result.get('valid', True),
-                        'ai_result': result.get('result', ''),
-                        'report': result.get('report_content', ''),
-                        'summary': 'Mock AI validation (Real AI not configured or failed)',
-                        'mock_npi': result.get('mock_npi', ''),
-                        'specialty': result.get('specialty', ''),
-                        'location': result.get('location', ''),
-                        'has_issues': result.get('has_issues', False),
-                        'is_sanctioned': result.get('is_sanctioned', False),
-                        'ai_model_used': False,
-                        'is_mock': True,
-                        'report_path': result.get('report_path', ''),
-                        'validation_time': result.get('validation_time', '')
-                    })
-                else:
-                    # Real AI was used
-                    return jsonify({
-                        'status': 'success',
-                        'type': 'name',
-                        'provider_name': query,
-                        'state': state,
-                        'valid': result.get('valid', True),
-                        'ai_result': result.get('result', ''),
-                        'report': result.get('report_content', ''),
-                        'summary': 'Real AI validation completed using CrewAI multi-agent system',
-                        'mock_npi': result.get('mock_npi', ''),
-                        'specialty': result.get('specialty', ''),
-                        'location': result.get('location', ''),
-                        'has_issues': result.get('has_issues', False),
-                        'is_sanctioned': result.get('is_sanctioned', False),
-                        'ai_model_used': True,
-                        'is_mock': False,
-                        'report_path': result.get('report_path', ''),
-                        'validation_time': result.get('validation_time', '')
-                    })
-                    
-            except Exception as ai_error:
-                # If AI validation fails, fall back to mock
-                print(f"AI validation failed: {ai_error}")
-                result = mock_validate_provider(query, state)
-                return jsonify({
-                    'status': 'success',
-                    'type': 'name',
-                    'provider_name': query,
-                    'state': state,
-                    'valid': result.get('valid', True),
-                    'ai_result': result.get('result', ''),
-                    'report': result.get('report_content', ''),
-                    'summary': 'AI validation failed, using mock data',
-                    'mock_npi': result.get('mock_npi', ''),
-                    'specialty': result.get('specialty', ''),
-                    'location': result.get('location', ''),
-                    'has_issues': result.get('has_issues', False),
-                    'is_sanctioned': result.get('is_sanctioned', False),
-                    'ai_model_used': False,
-                    'is_mock': True,
-                    'report_path': result.get('report_path', ''),
-                    'validation_time': result.get('validation_time', '')
-                })
+            # Use REAL AI validation for name search, in the background; the page polls the job
+            job = ai_jobs.submit(
+                name_search_result, query, state, ai_deadline(data.get('deadline_seconds')),
+                key=('search', query.lower(), state),
+                kind='search', provider_name=query, state=state
+            )
+            return jsonify({
+                'status': 'accepted',
+                'type': 'name',
+                'job_id': job['id'],
+                'lease': job['lease'],
+                'provider_name': query,
+                'state': state,
+                'poll_url': f"/api/ai-jobs/{job['id']}"
+            }), 202
                 
     except Exception as e:
         return jsonify({'status': 'error', 'error': str(e)}), 500
 
+@app.route('/api/ai-jobs/<job_id>')
+def ai_job_api(job_id):
+    """Status, and once finished the result, of a background AI validation"""
+    job = ai_jobs.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'error': 'Job not found or expired'}), 404
+    return jsonify({'status': 'success', 'job': job})
+
+@app.route('/api/ai-jobs/<job_id>/cancel', methods=['POST'])
+def ai_job_cancel_api(job_id):
+    """
+    Stop a queued or running AI job; a running validation returns its partial result.
+
+    With the ``lease`` returned on submission only that requester leaves, and
+    the job stops once no other requester is left. Without one, the job stops
+    only if nobody else requested it.
+    """
+    job = ai_jobs.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'error': 'Job not found or expired'}), 404
+    lease = request.args.get('lease') or (request.get_json(silent=True) or {}).get('lease')
+    if lease:
+        cancelled = ai_jobs.release(job_id, lease)
+    else:
+        cancelled = ai_jobs.requesters(job_id) <= 1 and ai_jobs.cancel(job_id)
+    return jsonify({'status': 'success', 'cancelled': cancelled, 'requesters': ai_jobs.requesters(job_id)})
+
+@app.route('/api/ai-jobs/<job_id>/events')
+def ai_job_events_api(job_id):
+    """Server-sent events with the progress, and finally the result, of an AI job"""
+    if ai_jobs.get(job_id) is None:
+        return jsonify({'status': 'error', 'error': 'Job not found or expired'}), 404
+
+    try:
+        after = int(request.headers.get('Last-Event-ID') or request.args.get('after', 0))
+    except ValueError:
+        after = 0
+    lease = request.args.get('lease')
+
+    def generate(after):
+        ai_jobs.watch(job_id, lease)
+        try:
+            while True:
+                events = ai_jobs.wait_events(job_id, after, timeout=AI_JOB_EVENTS_KEEPALIVE)
+                if events is None:
+                    return
+                if not events:
+                    yield ": keepalive\n\n"
+                    continue
+                for event in events:
+                    after = event['seq']
+                    yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+                    if event['type'] in ('done', 'error'):
+                        return
+        finally:
+            # The stream closes early when the client goes away; unless it reconnects within the
+            # grace period, its requester is no longer waiting for the result
+            ai_jobs.unwatch(job_id, lease, release_after=AI_CANCEL_GRACE_SECONDS if AI_CANCEL_ON_DISCONNECT else None)
+
+    return Response(generate(after), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/validator', methods=['GET', 'POST'])
 def validator():
     if request.method == 'POST':
@@ -2180,14 +2427,16 @@ def validator():
                         'location': location
                     })
             
-            # Store in session
-            session_id = str(random.randint(100000, 999999))
-            session['results'] = results
+            # Keep rows server-side; the session only remembers the job id
+            try:
+                session_id = result_store.create(results)
+            except sqlite3.Error as e:
+                # Without the store there is nothing to page through: hand over the report instead
+                print(f"Could not store bulk results: {e}")
+                return results_csv_response(results)
             session['session_id'] = session_id
-            session['valid_count'] = valid_count
-            session['invalid_count'] = invalid_count
             
-            return render_template_string(VALIDATOR_TEMPLATE, results=results, session_id=session_id, valid_count=valid_count, invalid_count=invalid_count)
+            return render_template_string(VALIDATOR_TEMPLATE, session_id=session_id, total_count=len(results), valid_count=valid_count, invalid_count=invalid_count)
     
     return render_template_string(VALIDATOR_TEMPLATE)
 
@@ -2197,10 +2446,14 @@ def download_report():
     if not session_id or session_id != session.get('session_id'):
         return 'Invalid session', 400
     
-    results = session.get('results', [])
+    job = result_store.get(session_id)
+    results = job['rows'] if job else []
     if not results:
         return 'No results to download', 400
-    
+    return results_csv_response(results)
+
+def results_csv_response(results):
+    """CSV report attachment of bulk validation result rows"""
     output = io.StringIO()
     writer = csv.writer(output)
     
@@ -2220,6 +2473,45 @@ def download_report():
         download_name=filename
     )
 
+@app.route('/api/results/<job_id>')
+def results_api(job_id):
+    """Cursor- or offset-paginated, sortable and filterable rows of a bulk validation job"""
+    try:
+        limit = min(max(int(request.args.get('limit', 100)), 1), RESULTS_PAGE_MAX)
+        page = result_store.page(
+            job_id,
+            cursor=request.args.get('cursor') or None,
+            limit=limit,
+            offset=int(request.args.get('offset', 0)),
+            sort=request.args.get('sort', 'index'),
+            order=request.args.get('order', 'asc'),
+            status=request.args.get('status', 'all'),
+            query=request.args.get('q', '')
+        )
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+    except sqlite3.Error as e:
+        return jsonify({'status': 'error', 'error': f'Results store unavailable: {e}'}), 503
+
+    if page is None:
+        return jsonify({'status': 'error', 'error': 'Results not found or expired'}), 404
+    return jsonify({'status': 'success', **page})
+
+@app.route('/api/metrics')
+def metrics_api():
+    """Aggregated histograms of crew LLM calls, tool calls and RPM throttling"""
+    # The router and registry lookups are only loaded once a crew ran with them
+    llm_router = sys.modules.get('llm_router')
+    registry_lookup = sys.modules.get('registry_lookup')
+    return jsonify({
+        'status': 'success',
+        **metrics_registry.snapshot(),
+        'llm_backends': llm_router.backend_stats() if llm_router else {},
+        'rate_limits': shared_limiter().stats(),
+        'http_replay': http_replay_installed().stats() if http_replay_installed() else None,
+        'nabp_cache': registry_lookup.nabp_cache.stats() if registry_lookup else None,
+    })
+
 @app.route('/api/ai-validate', methods=['POST'])
 def ai_validate_endpoint():
     """Direct endpoint for AI validation"""
@@ -2231,16 +2523,65 @@ def ai_validate_endpoint():
         if not provider_name:
             return jsonify({'status': 'error', 'error': 'Provider name is required'}), 400
         
-        result = validate_provider_with_ai(provider_name, state)
-        
-        if result['status'] == 'success':
-            return jsonify(result)
-        else:
-            return jsonify(result), 500
+        job = ai_jobs.submit(
+            validate_provider_with_ai, provider_name, state, ai_deadline(data.get('deadline_seconds')),
+            key=('validate', provider_name.lower(), state),
+            kind='validate', provider_name=provider_name, state=state
+        )
+        return jsonify({
+            'status': 'accepted',
+            'job_id': job['id'],
+            'lease': job['lease'],
+            'poll_url': f"/api/ai-jobs/{job['id']}"
+        }), 202
             
     except Exception as e:
         return jsonify({'status': 'error', 'error': str(e)}), 500
 
+def bulk_ai_validation(rows):
+    """
+    Run AI validations for a roster on the bulk runner. Executed on the AI job pool.
+    """
+    from bulk_validation import run_bulk_validation
+    
+    return run_bulk_validation(
+        rows,
+        validate_provider_with_ai,
+        summary_dir=Path('ai_reports'),
+        on_result=lambda entry, done, total: report_progress(
+            'provider_done', done=done, total=total,
+            name=entry['name'], state=entry['state'], outcome=entry['outcome']
+        ),
+        cancel_event=current_cancel_event()
+    )
+
+@app.route('/api/ai-validate/bulk', methods=['POST'])
+def ai_validate_bulk_endpoint():
+    """Queue AI validation of a roster CSV (columns: name or provider_name, optional state)"""
+    if 'csv_file' not in request.files or request.files['csv_file'].filename == '':
+        return jsonify({'status': 'error', 'error': 'No file uploaded'}), 400
+    
+    from bulk_validation import parse_roster
+    
+    try:
+        csv_text = request.files['csv_file'].stream.read().decode('utf-8-sig')
+        rows = parse_roster(csv_text, default_state=request.form.get('state', 'CA'))
+    except (UnicodeDecodeError, ValueError) as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+    if not rows:
+        return jsonify({'status': 'error', 'error': 'Roster has no providers'}), 400
+    if len(rows) > BULK_AI_MAX_ROWS:
+        return jsonify({'status': 'error', 'error': f'Roster exceeds {BULK_AI_MAX_ROWS} rows'}), 400
+    
+    job = ai_jobs.submit(bulk_ai_validation, rows, kind='bulk', rows_total=len(rows))
+    return jsonify({
+        'status': 'accepted',
+        'job_id': job['id'],
+        'lease': job['lease'],
+        'rows_total': len(rows),
+        'poll_url': f"/api/ai-jobs/{job['id']}"
+    }), 202
+
 @app.route('/view-report/<path:report_path>')
 def view_report(report_path):
     """View a generated AI report"""
@@ -2284,10 +2625,97 @@ def view_report(report_path):
     except Exception as e:
         return f"Error loading report: {str(e)}", 500
 
+@app.route('/api/rosters', methods=['GET', 'POST'])
+def rosters_api():
+    """List registered rosters or register a CSV roster for periodic re-verification"""
+    if request.method == 'GET':
+        return jsonify({'status': 'success', 'rosters': roster_scheduler.list_rosters()})
+
+    try:
+        file = request.files.get('csv_file')
+        if not file or not file.filename.endswith('.csv'):
+            return jsonify({'status': 'error', 'error': 'A CSV file is required'}), 400
+
+        stream = io.StringIO(file.stream.read().decode('UTF-8'), newline=None)
+        rows = []
+        for row in csv.DictReader(stream):
+            npi = (row.get('NPI') or '').strip()
+            if npi:
+                rows.append({'npi': npi, 'name': (row.get('Name') or '').strip()})
+
+        if not rows:
+            return jsonify({'status': 'error', 'error': "CSV has no rows with an 'NPI' column"}), 400
+
+        interval_hours = float(request.form.get('interval_hours', '24'))
+        if interval_hours <= 0:
+            return jsonify({'status': 'error', 'error': 'interval_hours must be positive'}), 400
+
+        roster = roster_scheduler.register(
+            name=request.form.get('name') or file.filename,
+            rows=rows,
+            interval_seconds=int(interval_hours * 3600)
+        )
+        return jsonify({
+            'status': 'success',
+            'roster_id': roster['id'],
+            'row_count': len(rows),
+            'interval_seconds': roster['interval_seconds']
+        }), 201
+    except ValueError as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 500
+
+@app.route('/api/rosters/<roster_id>', methods=['GET', 'DELETE'])
+def roster_detail_api(roster_id):
+    """Show a roster's run history, or unregister it"""
+    if request.method == 'DELETE':
+        if not roster_scheduler.unregister(roster_id):
+            return jsonify({'status': 'error', 'error': 'Roster not found'}), 404
+        return jsonify({'status': 'success'})
+
+    roster = roster_scheduler.get(roster_id)
+    if roster is None:
+        return jsonify({'status': 'error', 'error': 'Roster not found'}), 404
+    return jsonify({
+        'status': 'success',
+        'roster_id': roster['id'],
+        'name': roster['name'],
+        'row_count': len(roster['rows']),
+        'interval_seconds': roster['interval_seconds'],
+        'last_run_at': roster['last_run_at'],
+        'runs': roster['runs']
+    })
+
+@app.route('/api/rosters/<roster_id>/run', methods=['POST'])
+def roster_run_api(roster_id):
+    """Trigger an immediate re-verification run"""
+    if roster_scheduler.get(roster_id) is None:
+        return jsonify({'status': 'error', 'error': 'Roster not found'}), 404
+    roster_scheduler.run_async(roster_id)
+    return jsonify({'status': 'accepted', 'roster_id': roster_id}), 202
+
 # Health check endpoint
 @app.route('/health')
 def health():
-    return jsonify({'status': 'healthy', 'timestamp': datetime.datetime.now().isoformat()})
+    """
+    Liveness plus AI readiness.
+
+    ai_ready turns true once the crew pool has warmed up. With
+    ?require=ai the check answers 503 until then, so a load balancer can
+    keep AI traffic away from cold workers.
+    """
+    pool = crew_pool.stats()
+    body = {
+        'status': 'healthy',
+        'timestamp': datetime.datetime.now().isoformat(),
+        'ai_ready': pool['ready'],
+        'ai_pool': pool,
+        'ai_jobs': ai_jobs.stats()
+    }
+    if request.args.get('require') == 'ai' and not pool['ready']:
+        return jsonify({**body, 'status': 'warming_up' if pool['started'] and not pool['error'] else 'unavailable'}), 503
+    return jsonify(body)
 
 # ==========================================
 # Main Application Entry
@@ -0,0 +1,286 @@
+"""
+HTTP Record/Replay
+Records upstream HTTP exchanges (NPPES, NABP, Propelus) once and replays them offline with controlled latency.
+"""
+import atexit
+import base64
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Iterable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Harness settings of a process; see install_from_env
+HTTP_REPLAY_MODE = os.getenv('HTTP_REPLAY_MODE', 'off').lower()
+HTTP_REPLAY_CASSETTE = os.getenv('HTTP_REPLAY_CASSETTE', './http_recordings/upstream.json')
+HTTP_REPLAY_LATENCY = os.getenv('HTTP_REPLAY_LATENCY', 'recorded')
+HTTP_REPLAY_SEED = int(os.getenv('HTTP_REPLAY_SEED', '0'))
+
+# Supported values of HTTP_REPLAY_MODE
+HTTP_REPLAY_MODES = ('off', 'record', 'replay')
+
+# Response headers not worth keeping in a cassette
+_DROPPED_HEADERS = {'set-cookie', 'date', 'content-encoding', 'transfer-encoding', 'content-length', 'connection'}
+
+
+def request_key(method: str, url: str, body) -> str:
+    """
+    Replay key of a request: method, URL with sorted query parameters, and body.
+
+    Headers are left out, so API keys never end up in a cassette and a
+    rotated key does not invalidate the recordings.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    canonical_url = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ''))
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    if body:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True).encode('utf-8')
+        except ValueError:
+            pass
+    digest = hashlib.sha256(body or b'').hexdigest()[:16]
+    return f"{method.upper()} {canonical_url} {digest}"
+
+
+class LatencyModel:
+    """
+    Delay added to each replayed response.
+
+    Specs: "none"; "recorded" (the latency measured when recording);
+    "fixed:S"; "uniform:A,B"; "lognormal:MEDIAN,SIGMA" (seconds). Synthetic
+    delays come from a seeded generator, so a replay is repeatable.
+    """
+
+    def __init__(self, spec: str = 'recorded', seed: int = 0):
+        self.spec = spec
+        kind, _, args = spec.partition(':')
+        self.kind = kind.strip().lower()
+        self.args = [float(arg) for arg in args.split(',')] if args else []
+        expected = {'none': 0, 'recorded': 0, 'fixed': 1, 'uniform': 2, 'lognormal': 2}
+        if self.kind not in expected or len(self.args) != expected[self.kind]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self, recorded_seconds: float) -> float:
+        if self.kind == 'none':
+            return 0.0
+        if self.kind == 'recorded':
+            return recorded_seconds
+        if self.kind == 'fixed':
+            return self.args[0]
+        with self._lock:
+            if self.kind == 'uniform':
+                return self._random.uniform(*self.args)
+            median, sigma = self.args
+            return self._random.lognormvariate(math.log(median), sigma)
+
+
+class HTTPCassette:
+    """
+    Recorded exchanges in one JSON file.
+
+    A request recorded several times keeps every response; a replay hands
+    them out in recorded order and starts over when they run out.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self._exchanges = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._exchanges = json.load(f).get('exchanges', {})
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._exchanges.values())
+
+    def record(self, key: str, entry: dict):
+        with self._lock:
+            self._exchanges.setdefault(key, []).append(entry)
+
+    def next(self, key: str) -> Optional[dict]:
+        """Next recorded response of a request, or None if it was never recorded."""
+        with self._lock:
+            entries = self._exchanges.get(key)
+            if not entries:
+                self.misses += 1
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            self.hits += 1
+            return entries[cursor % len(entries)]
+
+    def save(self):
+        with self._lock:
+            exchanges = {key: list(entries) for key, entries in self._exchanges.items()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{time.time_ns()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'exchanges': exchanges}, f, indent=1, sort_keys=True)
+        tmp_path.replace(self.path)
+        logger.info(f"Saved {sum(len(e) for e in exchanges.values())} HTTP exchange(s) to {self.path}")
+
+
+def _encode_body(content: bytes) -> dict:
+    try:
+        return {'text': content.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'base64': base64.b64encode(content).decode('ascii')}
+
+
+def _decode_body(entry: dict) -> bytes:
+    if 'base64' in entry:
+        return base64.b64decode(entry['base64'])
+    return entry.get('text', '').encode('utf-8')
+
+
+class HTTPReplay:
+    """
+    Records or replays every request sent through ``requests``.
+
+    Patches HTTPAdapter.send, which plain requests.get/post calls and
+    retrying sessions (utils.create_retry_session) all go through. In
+    "record" mode requests go out and their responses and latencies are
+    kept in the cassette; in "replay" mode responses come from the cassette
+    after the LatencyModel's delay, and an unrecorded request fails with
+    ConnectionError (or goes out, with strict=False). Hosts in
+    passthrough_hosts (e.g. local stand-in servers) are never touched.
+    """
+
+    def __init__(self, cassette, mode: str = 'replay', latency: str = 'recorded', seed: int = 0,
+                 strict: bool = True, passthrough_hosts: Iterable[str] = ()):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown HTTP replay mode: {mode}")
+        # A path, or a ready cassette (e.g. one synthesizing responses)
+        self.cassette = cassette if isinstance(cassette, HTTPCassette) else HTTPCassette(cassette)
+        self.mode = mode
+        self.latency = LatencyModel(latency, seed)
+        self.strict = strict
+        self.passthrough_hosts = set(passthrough_hosts)
+        self._original_send = None
+
+    def install(self) -> 'HTTPReplay':
+        if self._original_send is not None:
+            return self
+        self._original_send = original_send = HTTPAdapter.send
+        replay = self
+
+        def send(adapter, request, **kwargs):
+            return replay._send(original_send, adapter, request, **kwargs)
+
+        HTTPAdapter.send = send
+        logger.info(f"HTTP {self.mode} installed ({self.cassette.path}, {len(self.cassette)} exchange(s))")
+        return self
+
+    def uninstall(self):
+        if self._original_send is None:
+            return
+        HTTPAdapter.send = self._original_send
+        self._original_send = None
+        if self.mode == 'record':
+            self.cassette.save()
+
+    def __enter__(self) -> 'HTTPReplay':
+        return self.install()
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+    def _send(self, original_send, adapter, request, **kwargs):
+        if urlsplit(request.url).hostname in self.passthrough_hosts:
+            return original_send(adapter, request, **kwargs)
+        key = request_key(request.method, request.url, request.body)
+        if self.mode == 'record':
+            started = time.perf_counter()
+            response = original_send(adapter, request, **kwargs)
+            content = response.content
+            self.cassette.record(key, {
+                'status': response.status_code,
+                'reason': response.reason,
+                'headers': {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS},
+                'body': _encode_body(content),
+                'elapsed': round(time.perf_counter() - started, 4),
+            })
+            return response
+
+        entry = self.cassette.next(key)
+        if entry is None:
+            if not self.strict:
+                return original_send(adapter, request, **kwargs)
+            raise requests.ConnectionError(f"No recorded response for {key}", request=request)
+        delay = self.latency.delay(entry.get('elapsed', 0.0))
+        if delay > 0:
+            time.sleep(delay)
+        return self._build_response(request, entry, delay)
+
+    @staticmethod
+    def _build_response(request, entry: dict, delay: float) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry.get('reason')
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response._content = _decode_body(entry['body'])
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers) or 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=delay)
+        return response
+
+    def stats(self) -> dict:
+        return {
+            'mode': self.mode,
+            'cassette': str(self.cassette.path),
+            'exchanges': len(self.cassette),
+            'hits': self.cassette.hits,
+            'misses': self.cassette.misses,
+            'latency': self.latency.spec,
+        }
+
+
+_installed: Optional[HTTPReplay] = None
+
+
+def install_from_env() -> Optional[HTTPReplay]:
+    """
+    Install the harness configured by the HTTP_REPLAY_* environment variables.
+
+    Returns:
+        The installed HTTPReplay, or None when HTTP_REPLAY_MODE is "off"
+    """
+    global _installed
+    if HTTP_REPLAY_MODE not in HTTP_REPLAY_MODES:
+        raise ValueError(f"Unknown HTTP_REPLAY_MODE: {HTTP_REPLAY_MODE}")
+    if HTTP_REPLAY_MODE == 'off' or _installed is not None:
+        return _installed
+    _installed = HTTPReplay(
+        HTTP_REPLAY_CASSETTE, mode=HTTP_REPLAY_MODE, latency=HTTP_REPLAY_LATENCY, seed=HTTP_REPLAY_SEED
+    ).install()
+    if HTTP_REPLAY_MODE == 'record':
+        atexit.register(_installed.cassette.save)
+    return _installed
+
+
+def installed() -> Optional[HTTPReplay]:
+    """The harness installed by install_from_env, if any."""
+    return _installed
@@ -0,0 +1,137 @@
+"""
+License Cache
+Thread-safe store of license validation results kept until the license's expiration date.
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Expiration date formats seen in license registry responses
+_DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%Y%m%d')
+
+
+def parse_expiration(value) -> Optional[date]:
+    """
+    Parse a license expiration date.
+
+    Args:
+        value: Date string (ISO date or timestamp, MM/DD/YYYY or YYYYMMDD)
+
+    Returns:
+        The date, or None if the value is missing or not a date
+    """
+    if not value or not isinstance(value, str):
+        return None
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+    except ValueError:
+        pass
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def license_ttl(expiration: Optional[date], min_seconds: float, max_seconds: float, now: Optional[float] = None) -> float:
+    """
+    How long a validation result may be reused.
+
+    A validated license does not change before it expires, so the result
+    lives until the end of its expiration day, clamped to
+    [min_seconds, max_seconds]. Results without a future expiration date
+    (unknown, not validated or already expired) get the floor.
+
+    Args:
+        expiration: Expiration date of the license, if known
+        min_seconds: Floor of the TTL
+        max_seconds: Ceiling of the TTL
+        now: Current time as a Unix timestamp (defaults to time.time())
+
+    Returns:
+        TTL in seconds
+    """
+    now = time.time() if now is None else now
+    if expiration is None:
+        return min_seconds
+    expires_at = datetime.combine(expiration + timedelta(days=1), datetime.min.time()).timestamp()
+    return min(max(expires_at - now, min_seconds), max_seconds)
+
+
+class LicenseCache:
+    """In-memory cache of license validation results, each with its own expiry."""
+
+    def __init__(self, min_seconds: float = 3600, max_seconds: float = 604800):
+        """
+        Args:
+            min_seconds: Shortest time a result is kept
+            max_seconds: Longest time a result is kept, however far off its expiration
+        """
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[dict]:
+        """
+        Return the cached result for a license query unless it has expired.
+
+        Args:
+            key: Normalized query (see registry_lookup.nabp_cache_key)
+
+        Returns:
+            Cached result dictionary, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, result: dict, expiration: Optional[date] = None) -> float:
+        """
+        Store a validation result until the license's expiration date.
+
+        Args:
+            key: Normalized query
+            result: Parsed registry response
+            expiration: Expiration date of a validated license (None for the floor TTL)
+
+        Returns:
+            TTL given to the entry, in seconds
+        """
+        now = time.time()
+        ttl = license_ttl(expiration, self.min_seconds, self.max_seconds, now)
+        with self._lock:
+            self._entries[key] = (now + ttl, result)
+            # Drop expired entries now and then, so one-off queries do not pile up
+            if len(self._entries) % 256 == 0:
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+        return ttl
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,331 @@
+"""
+LLM Record/Replay
+Records LLM completions and tool results of crew runs to disk and replays them offline.
+"""
+import hashlib
+import json
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any, Optional
+
+from crewai.events.types.llm_events import LLMCallType
+from crewai.llms.base_llm import BaseLLM, call_stop_override, llm_call_context
+from crewai.types.usage_metrics import UsageMetrics
+from pydantic import BaseModel, PrivateAttr
+
+from config import Config
+from tool_memo import ToolCallMemo, normalize_tool_input
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Supported values of Config.LLM_REPLAY_MODE
+REPLAY_MODES = ("passthrough", "record", "replay")
+
+# Sampling parameters of the wrapped LLM that change its completions
+_KEY_PARAMS = ("temperature", "top_p", "max_tokens", "seed", "frequency_penalty", "presence_penalty", "n")
+
+
+class ReplayMiss(Exception):
+    """Raised in replay mode for a call that was never recorded."""
+
+
+def _normalize_content(content):
+    if isinstance(content, str):
+        return " ".join(content.split())
+    if isinstance(content, list):
+        return [_normalize_content(part) for part in content]
+    if isinstance(content, dict):
+        return {k: _normalize_content(v) for k, v in sorted(content.items()) if v is not None}
+    return content
+
+
+def normalize_messages(messages) -> list:
+    """
+    Canonical form of a prompt.
+
+    Whitespace differences (indentation, trailing newlines) and empty
+    fields do not change a completion, so they do not change the key.
+    """
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    return [_normalize_content(dict(message)) for message in messages]
+
+
+def _tool_names(tools) -> list:
+    names = []
+    for tool in tools or []:
+        function = tool.get("function", tool) if isinstance(tool, dict) else {}
+        names.append(function.get("name") or getattr(tool, "name", str(tool)))
+    return sorted(names)
+
+
+def completion_key(model: str, params: dict, messages, tools=None, response_model: type = None) -> str:
+    """
+    Recording key of one LLM call.
+
+    Args:
+        model: Model of the wrapped LLM
+        params: Sampling parameters and stop words
+        messages: Prompt (string or chat messages)
+        tools: Tools offered to the model, if any
+        response_model: Structured output model, if any
+
+    Returns:
+        Hex SHA-256 digest of the canonical request
+    """
+    material = json.dumps({
+        "model": model,
+        "params": params,
+        "messages": normalize_messages(messages),
+        "tools": _tool_names(tools),
+        "response_model": getattr(response_model, "__name__", None),
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def tool_key(tool: str, tool_input: str) -> str:
+    """Recording key of one tool call."""
+    material = f"{tool}|{normalize_tool_input(tool_input)}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ReplayStore:
+    """
+    Recordings on disk, one JSON file per call.
+
+    Files live under <dir>/<kind>/<key[:2]>/<key>.json, so a recording
+    directory can be committed as a fixture and reviewed entry by entry.
+    """
+
+    def __init__(self, recordings_dir: Path):
+        self.recordings_dir = Path(recordings_dir)
+
+    def _path(self, kind: str, key: str) -> Path:
+        return self.recordings_dir / kind / key[:2] / f"{key}.json"
+
+    def get(self, kind: str, key: str) -> Optional[dict]:
+        """Return a recorded entry, or None if there is none."""
+        path = self._path(kind, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable recording {path}: {e}")
+            return None
+
+    def put(self, kind: str, key: str, entry: dict) -> None:
+        """Record an entry, replacing an earlier recording of the same call."""
+        path = self._path(kind, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{time.time_ns()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, indent=1, default=str)
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Could not write recording {path}: {e}")
+
+
+def _encode_response(response) -> Optional[dict]:
+    if isinstance(response, str):
+        return {"type": "text", "value": response}
+    if isinstance(response, BaseModel):
+        return {"type": "pydantic", "value": response.model_dump(mode="json")}
+    if isinstance(response, list):
+        # Native tool calls; the agent executor accepts them as OpenAI-style dictionaries
+        calls = []
+        for call in response:
+            function = getattr(call, "function", None)
+            if function is None:
+                return None
+            calls.append({
+                "id": getattr(call, "id", None),
+                "type": "function",
+                "function": {"name": function.name, "arguments": function.arguments},
+            })
+        return {"type": "tool_calls", "value": calls}
+    return None
+
+
+def _decode_response(entry: dict, response_model: type = None):
+    if entry["type"] == "pydantic" and response_model is not None:
+        return response_model.model_validate(entry["value"])
+    return entry["value"]
+
+
+class ReplayLLM(BaseLLM):
+    """
+    LLM that records the completions of the wrapped LLM, or replays them.
+
+    Calls are keyed by the wrapped model, its sampling parameters and stop
+    words, and a whitespace-normalized hash of the prompt (see
+    completion_key). In "record" mode every call goes to the wrapped LLM
+    and its completion is stored; in "replay" mode completions come from
+    the store only and an unrecorded call raises ReplayMiss; in
+    "passthrough" mode the wrapper does nothing.
+
+    Replayed calls emit the usual LLM events, so progress and metrics keep
+    working; their token usage is the recorded one.
+    """
+
+    inner: BaseLLM
+    store: Any
+    mode: str = "record"
+    _replayed: int = PrivateAttr(default=0)
+    _recorded: int = PrivateAttr(default=0)
+
+    def __init__(self, **data: Any):
+        if data.get("mode", "record") not in REPLAY_MODES:
+            raise ValueError(f"Unknown LLM replay mode: {data['mode']}")
+        data.setdefault("model", data["inner"].model)
+        super().__init__(**data)
+
+    def _key(self, messages, tools, response_model) -> str:
+        params = {name: getattr(self.inner, name, None) for name in _KEY_PARAMS}
+        params["stop"] = list(self.stop_sequences or [])
+        return completion_key(self.inner.model, params, messages, tools, response_model)
+
+    def _stop_override(self):
+        # The agent sets stop words on the wrapper; pass them to the wrapped LLM
+        stop = self.stop_sequences
+        return call_stop_override(self.inner, stop) if stop != self.inner.stop else nullcontext()
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None, **kwargs):
+        if self.mode == "replay":
+            return self._replay(messages, tools, from_task, from_agent, response_model)
+
+        before = self.inner.get_token_usage_summary()
+        with self._stop_override():
+            response = self.inner.call(
+                messages,
+                tools=tools,
+                callbacks=callbacks,
+                available_functions=available_functions,
+                from_task=from_task,
+                from_agent=from_agent,
+                response_model=response_model,
+                **kwargs
+            )
+        if self.mode == "record":
+            self._record(messages, tools, response_model, response, before)
+        return response
+
+    def _record(self, messages, tools, response_model, response, before: UsageMetrics):
+        encoded = _encode_response(response)
+        if encoded is None:
+            logger.warning(f"Not recording LLM response of type {type(response).__name__}")
+            return
+        after = self.inner.get_token_usage_summary()
+        self.store.put("llm", self._key(messages, tools, response_model), {
+            "model": self.inner.model,
+            "messages": normalize_messages(messages),
+            "response": encoded,
+            # Approximate when agents share the client concurrently
+            "usage": {
+                "prompt_tokens": max(after.prompt_tokens - before.prompt_tokens, 0),
+                "completion_tokens": max(after.completion_tokens - before.completion_tokens, 0),
+            },
+        })
+        self._recorded += 1
+
+    def _replay(self, messages, tools, from_task, from_agent, response_model):
+        key = self._key(messages, tools, response_model)
+        entry = self.store.get("llm", key)
+        with llm_call_context():
+            self._emit_call_started_event(messages=messages, tools=tools, from_task=from_task, from_agent=from_agent)
+            if entry is None:
+                self._emit_call_failed_event(error=f"No recording {key}", from_task=from_task, from_agent=from_agent)
+                raise ReplayMiss(
+                    f"No recorded completion for {self.inner.model} call {key[:12]} "
+                    f"(agent: {getattr(from_agent, 'role', None)}); record it first"
+                )
+            response = _decode_response(entry["response"], response_model)
+            usage = entry.get("usage") or {}
+            self._track_token_usage_internal(usage)
+            self._emit_call_completed_event(
+                response=response,
+                call_type=LLMCallType.TOOL_CALL if entry["response"]["type"] == "tool_calls" else LLMCallType.LLM_CALL,
+                from_task=from_task,
+                from_agent=from_agent,
+                messages=messages,
+                usage=usage
+            )
+        self._replayed += 1
+        return response
+
+    def replay_stats(self) -> dict:
+        return {"mode": self.mode, "recorded": self._recorded, "replayed": self._replayed}
+
+    def supports_function_calling(self) -> bool:
+        return self.inner.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.inner.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.inner.get_context_window_size()
+
+    def get_token_usage_summary(self) -> UsageMetrics:
+        if self.mode == "replay":
+            return super().get_token_usage_summary()
+        return self.inner.get_token_usage_summary()
+
+
+class ReplayToolCallMemo(ToolCallMemo):
+    """
+    Tool memo that also records tool results, or replays them.
+
+    In "record" mode every result, errors included, is stored so a replay
+    sees exactly what the recorded run saw; in "replay" mode a recorded
+    result is returned without running the tool.
+    """
+
+    _store: Optional[ReplayStore] = PrivateAttr(default=None)
+    _mode: str = PrivateAttr(default="passthrough")
+
+    def __init__(self, store: ReplayStore, mode: str, **data: Any):
+        super().__init__(**data)
+        self._store = store
+        self._mode = mode
+
+    def add(self, tool: str, input: str, output) -> None:
+        super().add(tool, input, output)
+        if self._mode == "record":
+            self._store.put("tool", tool_key(tool, input), {
+                "tool": tool,
+                "input": normalize_tool_input(input),
+                "output": output,
+            })
+
+    def read(self, tool: str, input: str):
+        output = super().read(tool, input)
+        if output is None and self._mode == "replay":
+            entry = self._store.get("tool", tool_key(tool, input))
+            if entry is not None:
+                logger.debug(f"Replayed call to {tool}")
+                return entry["output"]
+            logger.warning(f"No recorded result for {tool}; running it")
+        return output
+
+
+_replay_store: Optional[ReplayStore] = None
+
+
+def replay_store() -> ReplayStore:
+    """Process-wide store over Config.LLM_REPLAY_DIR."""
+    global _replay_store
+    if _replay_store is None:
+        _replay_store = ReplayStore(Config.LLM_REPLAY_DIR)
+    return _replay_store
+
+
+def create_tool_memo() -> ToolCallMemo:
+    """Tool memo of one run, recording or replaying tool results as Config.LLM_REPLAY_MODE says."""
+    if Config.LLM_REPLAY_MODE == "passthrough":
+        return ToolCallMemo()
+    return ReplayToolCallMemo(replay_store(), Config.LLM_REPLAY_MODE)
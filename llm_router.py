@@ -0,0 +1,222 @@
+"""
+LLM Router
+Routes agent LLM calls between the primary (Gemini) and fallback (local Ollama) models by load and health.
+"""
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Optional
+
+from crewai.llms.base_llm import BaseLLM, call_stop_override
+from crewai.types.usage_metrics import UsageMetrics
+
+from ai_jobs import report_progress
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Recent calls per backend used for latency and error rate
+HEALTH_WINDOW = 20
+# Calls needed in the window before a backend can be judged degraded
+MIN_HEALTH_SAMPLES = 5
+# While the primary is degraded, one call in this many still probes it
+PROBE_EVERY = 10
+
+
+class BackendHealth:
+    """
+    Load and health of one LLM backend.
+
+    Shared by every router of the process (each run has its own router and
+    clients), so one run's failures steer the next runs as well.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.in_flight = 0
+        self.served = 0
+        self.failures = 0
+        self._skipped = 0
+        self._latencies = deque(maxlen=HEALTH_WINDOW)
+        self._outcomes = deque(maxlen=HEALTH_WINDOW)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self):
+        """Count a call as in flight and record its latency and outcome."""
+        with self._lock:
+            self.in_flight += 1
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            seconds = time.perf_counter() - started
+            with self._lock:
+                self.in_flight -= 1
+                self._outcomes.append(ok)
+                if ok:
+                    self.served += 1
+                    self._latencies.append(seconds)
+                else:
+                    self.failures += 1
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            return self._outcomes.count(False) / len(self._outcomes) if self._outcomes else 0.0
+
+    @property
+    def median_latency(self) -> Optional[float]:
+        with self._lock:
+            return statistics.median(self._latencies) if self._latencies else None
+
+    def degraded(self, max_error_rate: float, max_latency_seconds: float) -> bool:
+        """True if recent calls failed too often or were too slow."""
+        with self._lock:
+            samples = len(self._outcomes)
+        if samples < MIN_HEALTH_SAMPLES:
+            return False
+        latency = self.median_latency
+        return self.error_rate >= max_error_rate or (latency is not None and latency >= max_latency_seconds)
+
+    def probe_due(self) -> bool:
+        """
+        Count a call diverted from this degraded backend; True for every
+        PROBE_EVERY-th, which should probe it instead.
+
+        The count is process-wide like the health window, so a backend is
+        probed even though each run's router makes only a few calls.
+        """
+        with self._lock:
+            self._skipped += 1
+            return self._skipped % PROBE_EVERY == 0
+
+    def snapshot(self) -> dict:
+        latency = self.median_latency
+        return {
+            'in_flight': self.in_flight,
+            'served': self.served,
+            'failures': self.failures,
+            'error_rate': round(self.error_rate, 3),
+            'median_latency_seconds': round(latency, 3) if latency is not None else None,
+        }
+
+
+_backends: Dict[str, BackendHealth] = {}
+_backends_lock = threading.Lock()
+
+
+def backend_health(name: str) -> BackendHealth:
+    """Process-wide health record of the backend called ``name``."""
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = BackendHealth(name)
+        return _backends[name]
+
+
+def backend_stats() -> dict:
+    """Load and health of every backend the routers have used."""
+    with _backends_lock:
+        backends = list(_backends.values())
+    return {backend.name: backend.snapshot() for backend in backends}
+
+
+class RoutingLLM(BaseLLM):
+    """
+    LLM that sends each call to the primary or the fallback model.
+
+    Calls stay on the primary while it is healthy. They go to the fallback
+    when the primary already has ``max_in_flight`` calls running in this
+    process (overflow), or when its recent error rate or median latency
+    crossed the limits (degraded; one call in PROBE_EVERY still goes to the
+    primary so it can recover). A call that fails on one backend is retried
+    once on the other. The fallback is never used for calls that need native
+    function calling it does not support, or while it is degraded itself.
+
+    The backend that served each call is counted in backend_stats(), shown
+    in the run's metrics (the backends' LLM events carry their model name)
+    and published as an 'llm_backend' progress event.
+    """
+
+    primary: BaseLLM
+    fallback: BaseLLM
+    max_in_flight: int = 4
+    max_error_rate: float = 0.5
+    max_latency_seconds: float = 30.0
+
+    def __init__(self, **data: Any):
+        data.setdefault("model", f"router:{data['primary'].model}|{data['fallback'].model}")
+        super().__init__(**data)
+
+    def _health(self, llm: BaseLLM) -> BackendHealth:
+        return backend_health(llm.model)
+
+    def _fallback_usable(self, tools) -> bool:
+        if tools and not self.fallback.supports_function_calling():
+            return False
+        return not self._health(self.fallback).degraded(self.max_error_rate, self.max_latency_seconds)
+
+    def _route(self, tools) -> tuple:
+        primary = self._health(self.primary)
+        if not self._fallback_usable(tools):
+            return self.primary, "primary"
+        if primary.degraded(self.max_error_rate, self.max_latency_seconds):
+            if primary.probe_due():
+                return self.primary, "probe"
+            return self.fallback, "degraded"
+        if primary.in_flight >= self.max_in_flight:
+            return self.fallback, "overflow"
+        return self.primary, "primary"
+
+    def _stop_override(self, llm: BaseLLM):
+        # The agent sets stop words on the router; pass them to the backend
+        stop = self.stop_sequences
+        return call_stop_override(llm, stop) if stop != llm.stop else nullcontext()
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None, **kwargs):
+        llm, reason = self._route(tools)
+        try:
+            return self._call_backend(llm, reason, messages, tools, callbacks, available_functions,
+                                      from_task, from_agent, response_model, **kwargs)
+        except Exception as e:
+            other = self.fallback if llm is self.primary else self.primary
+            if other is self.fallback and not self._fallback_usable(tools):
+                raise
+            logger.warning(f"LLM call on {llm.model} failed ({e}); failing over to {other.model}")
+            return self._call_backend(other, "failover", messages, tools, callbacks, available_functions,
+                                      from_task, from_agent, response_model, **kwargs)
+
+    def _call_backend(self, llm, reason, messages, tools, callbacks, available_functions,
+                      from_task, from_agent, response_model, **kwargs):
+        logger.debug(f"Routing LLM call to {llm.model} ({reason})")
+        report_progress('llm_backend', agent=getattr(from_agent, 'role', None), backend=llm.model, reason=reason)
+        with self._health(llm).track(), self._stop_override(llm):
+            return llm.call(
+                messages,
+                tools=tools,
+                callbacks=callbacks,
+                available_functions=available_functions,
+                from_task=from_task,
+                from_agent=from_agent,
+                response_model=response_model,
+                **kwargs
+            )
+
+    def supports_function_calling(self) -> bool:
+        return self.primary.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.primary.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return min(self.primary.get_context_window_size(), self.fallback.get_context_window_size())
+
+    def get_token_usage_summary(self) -> UsageMetrics:
+        usage = self.primary.get_token_usage_summary()
+        usage.add_usage_metrics(self.fallback.get_token_usage_summary())
+        return usage
@@ -4,10 +4,13 @@ Healthcare Provider Validation System
 """
 import sys
 from datetime import datetime
+from pathlib import Path
 
-from crew import provider_validation_crew
+from bulk_validation import parse_roster, render_summary_table, run_bulk_validation
+from crew import create_provider_validation_crew
 from config import Config
-from utils import get_logger
+from http_replay import install_from_env as install_http_replay
+from utils import get_logger, make_report_path
 
 logger = get_logger(__name__)
 
@@ -32,9 +35,12 @@ def validate_provider(provider_name: str, state: str) -> dict:
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*70}\n")
     
+    report_path = make_report_path(Config.REPORTS_DIR, provider_name, state)
+    
     try:
         # Execute the crew
-        result = provider_validation_crew.kickoff(inputs={
+        crew = create_provider_validation_crew(report_path=report_path.as_posix())
+        result = crew.kickoff(inputs={
             'provider_name': provider_name,
             'state': state
         })
@@ -46,7 +52,6 @@ def validate_provider(provider_name: str, state: str) -> dict:
         print(f"{'='*70}\n")
         
         # Display the generated report
-        report_path = Config.REPORTS_DIR / "provider_validation_report.md"
         if report_path.exists():
             print(f"\n{'='*70}")
             print(f"GENERATED REPORT")
@@ -81,6 +86,35 @@ def validate_provider(provider_name: str, state: str) -> dict:
         }
 
 
+def validate_roster(roster_path: str, concurrency: int = None) -> dict:
+    """
+    Validate every provider of a roster CSV.
+    
+    Args:
+        roster_path: CSV with a provider name column and an optional state column
+        concurrency: Parallel validations (defaults to the LLM rate limit based cap)
+        
+    Returns:
+        Bulk validation summary
+    """
+    # Same single-provider pipeline as the web app: registry pre-check, result cache, per-run reports
+    from ai_validation import validate_provider_with_ai
+    
+    rows = parse_roster(Path(roster_path).read_text(encoding='utf-8'))
+    summary = run_bulk_validation(
+        rows,
+        validate_provider_with_ai,
+        concurrency=concurrency,
+        on_result=lambda entry, done, total: print(
+            f"[{done}/{total}] {entry['name']} ({entry['state']}): {entry['outcome']}"
+        )
+    )
+    
+    print(f"\n{render_summary_table(summary)}")
+    print(f"Summary saved to: {summary['summary_path']}")
+    return summary
+
+
 def main():
     """Main entry point."""
     print(f"\n{'='*70}")
@@ -88,6 +122,15 @@ def main():
     print(f"Powered by CrewAI Multi-Agent Framework")
     print(f"{'='*70}\n")
     
+    # Offline runs: serve upstream registry traffic from a recorded cassette (HTTP_REPLAY_MODE)
+    install_http_replay()
+    
+    # Bulk mode: python main.py --bulk roster.csv [concurrency]
+    if len(sys.argv) >= 3 and sys.argv[1] == '--bulk':
+        concurrency = int(sys.argv[3]) if len(sys.argv) >= 4 else None
+        summary = validate_roster(sys.argv[2], concurrency)
+        sys.exit(0 if summary['counts']['error'] == 0 else 1)
+    
     # Example usage - modify as needed
     if len(sys.argv) >= 3:
         provider_name = sys.argv[1]
@@ -97,6 +140,7 @@ def main():
         provider_name = "Aditya Sharma"
         state = "CA"
         print(f"Usage: python main.py \"Provider Name\" STATE")
+        print(f"       python main.py --bulk roster.csv [concurrency]")
         print(f"Using default example: {provider_name} in {state}\n")
     
     result = validate_provider(provider_name, state)
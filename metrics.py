@@ -0,0 +1,390 @@
+"""
+Crew Metrics
+Per-run and aggregated instrumentation of the crew's LLM calls, tool calls and RPM throttling.
+"""
+import bisect
+import threading
+import time
+from typing import Iterable, Optional, Tuple
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Histogram bucket upper bounds
+SECONDS_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000)
+
+# Usage keys reported by the different LLM providers
+_PROMPT_TOKEN_KEYS = ("prompt_tokens", "prompt_token_count", "input_tokens")
+_COMPLETION_TOKEN_KEYS = ("completion_tokens", "candidates_token_count", "output_tokens")
+
+
+class Histogram:
+    """Fixed-bucket histogram with cumulative bucket counts."""
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self) -> dict:
+        cumulative, running = [], 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            running += count
+            cumulative.append({'le': bound, 'count': running})
+        return {'count': self.count, 'sum': round(self.sum, 4), 'buckets': cumulative}
+
+
+class MetricsRegistry:
+    """Process-wide histograms of crew activity, labelled by agent role or task stage."""
+
+    HISTOGRAMS = {
+        'llm_call_seconds': SECONDS_BUCKETS,
+        'llm_prompt_tokens': TOKEN_BUCKETS,
+        'llm_completion_tokens': TOKEN_BUCKETS,
+        'tool_call_seconds': SECONDS_BUCKETS,
+        'rpm_wait_seconds': SECONDS_BUCKETS,
+        'context_tokens_sent': TOKEN_BUCKETS,
+        'run_seconds': SECONDS_BUCKETS,
+    }
+
+    def __init__(self):
+        self._histograms = {}
+        self._runs = 0
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, label: str, value: float):
+        """Record one observation of histogram ``name`` for ``label``."""
+        with self._lock:
+            histogram = self._histograms.setdefault(name, {}).get(label)
+            if histogram is None:
+                histogram = self._histograms[name][label] = Histogram(self.HISTOGRAMS[name])
+            histogram.observe(value)
+            if name == 'run_seconds':
+                self._runs += 1
+
+    def snapshot(self) -> dict:
+        """All histograms as {name: {label: histogram}}."""
+        with self._lock:
+            return {
+                'runs': self._runs,
+                'histograms': {
+                    name: {label: h.to_dict() for label, h in by_label.items()}
+                    for name, by_label in self._histograms.items()
+                }
+            }
+
+
+metrics_registry = MetricsRegistry()
+
+
+def _new_agent_stats() -> dict:
+    return {
+        'llm_calls': 0,
+        'llm_failures': 0,
+        'retries': 0,
+        'llm_seconds': 0.0,
+        'prompt_tokens': 0,
+        'completion_tokens': 0,
+        'tool_calls': 0,
+        'tool_calls_deduplicated': 0,
+        'tool_errors': 0,
+        'tool_seconds': 0.0,
+        'rpm_waits': 0,
+        'rpm_wait_seconds': 0.0,
+    }
+
+
+# Per-agent stats a batch splits across the runs it served (see RunMetrics.usage_share)
+_SHARED_USAGE_KEYS = ('llm_seconds', 'prompt_tokens', 'completion_tokens', 'rpm_wait_seconds')
+
+
+def _usage_value(usage: Optional[dict], keys: tuple) -> int:
+    for key in keys:
+        if usage and usage.get(key):
+            return int(usage[key])
+    return 0
+
+
+def usage_tokens(usage: Optional[dict]) -> Tuple[int, int]:
+    """(prompt, completion) token counts of an LLM call's usage, whatever the provider."""
+    return _usage_value(usage, _PROMPT_TOKEN_KEYS), _usage_value(usage, _COMPLETION_TOKEN_KEYS)
+
+
+class _TimedRPMGate:
+    """Wraps an agent's RPMController to measure time spent throttled."""
+
+    # Waits shorter than this are lock contention, not throttling
+    MIN_WAIT_SECONDS = 0.01
+
+    def __init__(self, controller, run: "RunMetrics", agent_role: str):
+        self._controller = controller
+        self._run = run
+        self._agent_role = agent_role
+
+    def check_or_wait(self) -> bool:
+        start = time.perf_counter()
+        try:
+            return self._controller.check_or_wait()
+        finally:
+            self._run.record_rpm_wait(self._agent_role, time.perf_counter() - start)
+
+    def stop_rpm_counter(self):
+        self._controller.stop_rpm_counter()
+
+
+# agent id -> RunMetrics of the run the agent belongs to
+_active_runs = {}
+_active_runs_lock = threading.Lock()
+_listener_installed = False
+
+
+def _run_for(event) -> Optional["RunMetrics"]:
+    agent_id = getattr(event, 'agent_id', None)
+    if agent_id is None:
+        return None
+    with _active_runs_lock:
+        return _active_runs.get(agent_id)
+
+
+def _install_listener():
+    """Subscribe to the CrewAI event bus once per process."""
+    global _listener_installed
+    with _active_runs_lock:
+        if _listener_installed:
+            return
+        _listener_installed = True
+
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.llm_events import LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent
+    from crewai.events.types.tool_usage_events import ToolUsageErrorEvent, ToolUsageFinishedEvent
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def _on_llm_started(source, event):
+        run = _run_for(event)
+        if run:
+            run.on_llm_started(event)
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def _on_llm_completed(source, event):
+        run = _run_for(event)
+        if run:
+            run.on_llm_finished(event, failed=False)
+
+    @crewai_event_bus.on(LLMCallFailedEvent)
+    def _on_llm_failed(source, event):
+        run = _run_for(event)
+        if run:
+            run.on_llm_finished(event, failed=True)
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def _on_tool_finished(source, event):
+        run = _run_for(event)
+        if run:
+            run.on_tool_finished(event)
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def _on_tool_error(source, event):
+        run = _run_for(event)
+        if run:
+            run.on_tool_error(event)
+
+
+class RunMetrics:
+    """
+    Instrumentation of one crew run, attributed per agent.
+
+    LLM and tool timings come from CrewAI events, matched to this run by
+    agent id (every run has its own agents). Throttling time is measured
+    around each agent's RPMController. Every observation also feeds the
+    process-wide histograms of ``registry``.
+    """
+
+    def __init__(self, registry: MetricsRegistry = metrics_registry):
+        self.registry = registry
+        self._roles = {}
+        self._stats = {}
+        self._pending_calls = {}
+        self._call_starts = {}
+        self._call_failures = {}
+        self._stages = {}
+        self._backends = {}
+        self._lock = threading.Lock()
+        self._started = None
+        self.duration_seconds = None
+
+    def attach(self, agents: Iterable):
+        """
+        Start collecting for the given agents.
+
+        Call after the crew is built, so the agents' RPM controllers are set.
+        """
+        _install_listener()
+        for agent in agents:
+            agent_id = str(agent.id)
+            self._roles[agent_id] = agent.role
+            self._stats.setdefault(agent.role, _new_agent_stats())
+            if agent._rpm_controller is not None and not isinstance(agent._rpm_controller, _TimedRPMGate):
+                agent._rpm_controller = _TimedRPMGate(agent._rpm_controller, self, agent.role)
+            with _active_runs_lock:
+                _active_runs[agent_id] = self
+        self._started = time.perf_counter()
+
+    def detach(self):
+        """Stop collecting, once pending event handlers have run."""
+        from crewai.events import crewai_event_bus
+
+        crewai_event_bus.flush(timeout=5.0)
+        with _active_runs_lock:
+            for agent_id in self._roles:
+                _active_runs.pop(agent_id, None)
+        with self._lock:
+            self._count_retries()
+        if self._started is not None and self.duration_seconds is None:
+            self.duration_seconds = time.perf_counter() - self._started
+            self.registry.observe('run_seconds', 'crew', self.duration_seconds)
+
+    def _agent_stats(self, event) -> tuple:
+        role = self._roles.get(event.agent_id, event.agent_role or 'unknown')
+        return role, self._stats.setdefault(role, _new_agent_stats())
+
+    def on_llm_started(self, event):
+        with self._lock:
+            self._call_starts.setdefault(event.agent_id, []).append(event.timestamp)
+            finished = self._pending_calls.pop(event.call_id, None)
+            if finished is None:
+                self._pending_calls[event.call_id] = event
+                return
+        # Handlers run on a thread pool, so the finish event may arrive first
+        self._record_llm_call(event, *finished)
+
+    def on_llm_finished(self, event, failed: bool):
+        with self._lock:
+            if failed:
+                self._call_failures.setdefault(event.agent_id, []).append(event.timestamp)
+            started = self._pending_calls.pop(event.call_id, None)
+            if started is None:
+                self._pending_calls[event.call_id] = (event, failed)
+                return
+        self._record_llm_call(started, event, failed)
+
+    def _record_llm_call(self, started, finished, failed: bool):
+        seconds = max((finished.timestamp - started.timestamp).total_seconds(), 0.0)
+        prompt_tokens = completion_tokens = 0
+        if not failed:
+            prompt_tokens, completion_tokens = usage_tokens(finished.usage)
+        with self._lock:
+            role, stats = self._agent_stats(finished)
+            stats['llm_calls'] += 1
+            stats['llm_seconds'] += seconds
+            stats['llm_failures'] += int(failed)
+            stats['prompt_tokens'] += prompt_tokens
+            stats['completion_tokens'] += completion_tokens
+            if not failed:
+                backends = self._backends.setdefault(role, {})
+                backends[finished.model or 'unknown'] = backends.get(finished.model or 'unknown', 0) + 1
+        self.registry.observe('llm_call_seconds', role, seconds)
+        if not failed:
+            self.registry.observe('llm_prompt_tokens', role, prompt_tokens)
+            self.registry.observe('llm_completion_tokens', role, completion_tokens)
+
+    def _count_retries(self):
+        # A failed call followed by another call of the same agent was retried
+        for agent_id, failures in self._call_failures.items():
+            starts = self._call_starts.get(agent_id, [])
+            role = self._roles.get(agent_id, 'unknown')
+            stats = self._stats.setdefault(role, _new_agent_stats())
+            stats['retries'] = sum(1 for failed_at in failures if any(s > failed_at for s in starts))
+
+    def on_tool_finished(self, event):
+        seconds = max((event.finished_at - event.started_at).total_seconds(), 0.0)
+        with self._lock:
+            role, stats = self._agent_stats(event)
+            stats['tool_calls'] += 1
+            stats['tool_calls_deduplicated'] += int(event.from_cache)
+            stats['tool_seconds'] += seconds
+        if not event.from_cache:
+            self.registry.observe('tool_call_seconds', role, seconds)
+
+    def on_tool_error(self, event):
+        with self._lock:
+            self._agent_stats(event)[1]['tool_errors'] += 1
+
+    def record_rpm_wait(self, role: str, seconds: float):
+        if seconds < _TimedRPMGate.MIN_WAIT_SECONDS:
+            return
+        with self._lock:
+            stats = self._stats.setdefault(role, _new_agent_stats())
+            stats['rpm_waits'] += 1
+            stats['rpm_wait_seconds'] += seconds
+        self.registry.observe('rpm_wait_seconds', role, seconds)
+
+    def usage_share(self, runs: int) -> dict:
+        """
+        One run's share of this run's LLM usage, for a batch that served several runs.
+
+        Args:
+            runs: Number of runs the usage is split across
+
+        Returns:
+            Dictionary of agent role to its share of tokens, LLM and throttling seconds
+        """
+        with self._lock:
+            return {
+                role: {
+                    key: stats[key] / runs if isinstance(stats[key], float) else round(stats[key] / runs)
+                    for key in _SHARED_USAGE_KEYS
+                }
+                for role, stats in self._stats.items()
+            }
+
+    def add_usage(self, usage: dict):
+        """
+        Add LLM usage spent for this run elsewhere (see usage_share).
+
+        The process-wide histograms already saw the calls, and llm_calls
+        keeps counting the run's own calls only.
+        """
+        with self._lock:
+            for role, shares in usage.items():
+                stats = self._stats.setdefault(role, _new_agent_stats())
+                for key, value in shares.items():
+                    stats[key] += value
+
+    def record_context(self, stage: str, raw_tokens: int, sent_tokens: int):
+        """Record the upstream context size of a task before and after compaction."""
+        with self._lock:
+            self._stages[stage] = {
+                'context_tokens_raw': raw_tokens,
+                'context_tokens_sent': sent_tokens,
+                'context_tokens_saved': raw_tokens - sent_tokens,
+            }
+        self.registry.observe('context_tokens_sent', stage, sent_tokens)
+
+    def to_dict(self) -> dict:
+        """Per-agent stats, LLM backends that served each agent, per-stage context sizes and run totals."""
+        with self._lock:
+            agents = {
+                role: {k: round(v, 4) if isinstance(v, float) else v for k, v in stats.items()}
+                for role, stats in self._stats.items()
+            }
+            stages = {stage: dict(sizes) for stage, sizes in self._stages.items()}
+            backends = {role: dict(counts) for role, counts in self._backends.items()}
+        totals = _new_agent_stats()
+        for stats in agents.values():
+            for key, value in stats.items():
+                totals[key] += value
+        return {
+            'duration_seconds': round(self.duration_seconds, 4) if self.duration_seconds is not None else None,
+            'agents': agents,
+            'backends': backends,
+            'stages': stages,
+            'totals': {k: round(v, 4) if isinstance(v, float) else v for k, v in totals.items()},
+        }
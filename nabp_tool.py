@@ -8,6 +8,7 @@ from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
 from config import Config
+from registry_lookup import NABP_TIMEOUT, nabp_is_valid, validate_nabp_license
 from utils import get_logger, format_api_error
 
 logger = get_logger(__name__)
@@ -45,43 +46,14 @@ class NABPValidationTool(BaseTool):
         Returns:
             Validation results or error message
         """
-        base_url = Config.NABP_BASE_URL
-        api_key = Config.NABP_API_KEY
-        
         search_desc = f"{first_name or ''} {last_name or ''}, License: {license_number or 'N/A'} ({state or 'N/A'})"
         logger.info(f"Validating NABP license for: {search_desc}")
 
-        headers = {"Content-Type": "application/json"}
-        if api_key:
-            headers["Authorization"] = f"Bearer {api_key}"
-
-        # Build payload with camelCase (NABP API standard)
-        payload = {}
-        if first_name:
-            payload["firstName"] = first_name
-        if last_name:
-            payload["lastName"] = last_name
-        if license_number:
-            payload["licenseNumber"] = license_number
-        if state:
-            payload["state"] = state.upper()
-
-        if not payload:
-            return "ERROR: At least one identifying field (first_name/last_name/license_number/state) is required."
-
         try:
-            resp = requests.post(base_url, json=payload, headers=headers, timeout=25)
-            resp.raise_for_status()
-            data = resp.json()
+            data = validate_nabp_license(first_name, last_name, license_number, state)
 
             # Check validation status
-            valid = (
-                data.get("valid") or 
-                data.get("is_valid") or 
-                data.get("status") in ["VALIDATED", "VALID", "Active"]
-            )
-
-            if valid:
+            if nabp_is_valid(data):
                 # Extract license information
                 license_info = data.get("license", {}) or {}
                 status = (
@@ -124,8 +96,16 @@ class NABPValidationTool(BaseTool):
                 f"  Reason: {message}"
             )
 
+        except ValueError as e:
+            return f"ERROR: {str(e)}"
+
         except requests.exceptions.Timeout:
-            error_msg = "ERROR: NABP API request timed out after 25 seconds."
+            error_msg = f"ERROR: NABP API request timed out after {NABP_TIMEOUT:g} seconds."
+            logger.error(error_msg)
+            return error_msg
+
+        except requests.exceptions.ConnectionError as e:
+            error_msg = f"ERROR: Could not reach NABP API after {Config.NABP_MAX_RETRIES} retries: {str(e)}"
             logger.error(error_msg)
             return error_msg
             
@@ -7,6 +7,7 @@ import requests
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
+from registry_lookup import NPI_SEARCH_TIMEOUT, search_npi_registry
 from utils import get_logger, format_api_error
 
 logger = get_logger(__name__)
@@ -47,18 +48,9 @@ class NPISearchTool(BaseTool):
         Returns:
             Formatted search results or error message
         """
-        api_url = "https://npiregistry.cms.hhs.gov/api/"
-        params = {"version": "2.1", "limit": 5}
-
         if npi_number:
-            params["number"] = npi_number
             search_desc = f"NPI: {npi_number}"
         elif first_name and last_name and state:
-            params.update({
-                "first_name": first_name,
-                "last_name": last_name,
-                "state": state
-            })
             search_desc = f"{first_name} {last_name} ({state})"
         else:
             return (
@@ -69,9 +61,7 @@ class NPISearchTool(BaseTool):
         logger.info(f"Searching NPI Registry for: {search_desc}")
 
         try:
-            resp = requests.get(api_url, params=params, timeout=20)
-            resp.raise_for_status()
-            data = resp.json()
+            data = search_npi_registry(first_name, last_name, state, npi_number)
 
             if data.get("result_count", 0) == 0:
                 logger.warning(f"No NPI results found for: {search_desc}")
@@ -115,7 +105,7 @@ class NPISearchTool(BaseTool):
             return "NPI Search Results:\n" + "\n".join(formatted)
 
         except requests.exceptions.Timeout:
-            error_msg = "ERROR: NPI registry request timed out after 20 seconds."
+            error_msg = f"ERROR: NPI registry request timed out after {NPI_SEARCH_TIMEOUT} seconds."
             logger.error(error_msg)
             return error_msg
             
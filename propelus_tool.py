@@ -8,6 +8,7 @@
 # from pydantic import BaseModel, Field, validator
 
 # from config import Config
+# from rate_limiter import host_key, shared_limiter
 # from utils import (
 #     create_retry_session,
 #     get_logger,
@@ -115,6 +116,7 @@
 #         )
         
 #         try:
+#             shared_limiter().acquire(host_key(Config.PROPELUS_BASE_URL), Config.PROPELUS_RPM_LIMIT)
 #             response = session.post(
 #                 Config.PROPELUS_BASE_URL,
 #                 json=payload,
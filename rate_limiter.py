@@ -0,0 +1,250 @@
+"""
+Shared Rate Limiter
+Token buckets shared by every worker process, for LLM requests/tokens and upstream registry hosts.
+"""
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+from metrics import usage_tokens
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# SQLite file shared by the processes of one host; "memory" keeps buckets per process
+RATE_LIMIT_DB = os.getenv('RATE_LIMIT_DB', './rate_limits.db')
+
+# Bucket keys of the LLM limits
+LLM_REQUESTS_KEY = 'llm:requests'
+LLM_TOKENS_KEY = 'llm:tokens'
+
+
+def host_key(url: str) -> str:
+    """Bucket key of the host serving ``url``."""
+    return f"host:{urlparse(url).hostname}"
+
+
+class BucketStore(ABC):
+    """
+    Storage of token bucket balances.
+
+    Implementations must apply take() atomically for all processes sharing
+    the store; a networked store (e.g. Redis with a Lua script) only needs
+    to implement this one method.
+    """
+
+    @abstractmethod
+    def take(self, key: str, capacity: float, rate: float, cost: float, now: float) -> float:
+        """
+        Refill bucket ``key`` up to ``capacity`` at ``rate`` tokens per second, then deduct ``cost``.
+
+        The balance may go negative: the caller reserved tokens that are not
+        there yet and must wait for them.
+
+        Returns:
+            Seconds until the balance is back at zero (0 if it never went negative)
+        """
+
+
+def _refill_and_take(tokens: Optional[float], updated: Optional[float], capacity: float,
+                     rate: float, cost: float, now: float) -> float:
+    if tokens is None:
+        tokens, updated = capacity, now
+    return min(capacity, tokens + max(now - updated, 0.0) * rate) - cost
+
+
+class MemoryBucketStore(BucketStore):
+    """Buckets of this process only."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, rate: float, cost: float, now: float) -> float:
+        with self._lock:
+            tokens = _refill_and_take(*self._buckets.get(key, (None, None)), capacity, rate, cost, now)
+            self._buckets[key] = (tokens, now)
+        return max(-tokens, 0.0) / rate
+
+
+class SQLiteBucketStore(BucketStore):
+    """Buckets in a SQLite file, shared by every process that opens it."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def take(self, key: str, capacity: float, rate: float, cost: float, now: float) -> float:
+        conn = self._connection()
+        # IMMEDIATE takes the write lock up front, serializing read-modify-write across processes
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens = _refill_and_take(*(row or (None, None)), capacity, rate, cost, now)
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return max(-tokens, 0.0) / rate
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter over a BucketStore.
+
+    A limit of N per period lets bursts of up to N through, then refills at
+    N per period. Limits are passed with each call, so every caller can
+    take its setting from wherever it is configured; 0 means unlimited.
+    """
+
+    def __init__(self, store: BucketStore):
+        self.store = store
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, limit: int, cost: float = 1, period: float = 60.0) -> float:
+        """
+        Take ``cost`` tokens from bucket ``key``, sleeping until they are available.
+
+        A cost of 0 only waits until earlier charges are paid off.
+
+        Args:
+            key: Bucket key (e.g. LLM_REQUESTS_KEY or host_key(url))
+            limit: Tokens per period (0 for unlimited)
+            cost: Tokens to take
+            period: Period of the limit, in seconds
+
+        Returns:
+            Seconds spent waiting
+        """
+        if limit <= 0:
+            return 0.0
+        wait = self._take(key, limit, cost, period)
+        if wait > 0:
+            logger.debug(f"Rate limit {key}: waiting {wait:.2f}s")
+            time.sleep(wait)
+        with self._lock:
+            stats = self._stats.setdefault(key, {'acquired': 0, 'waits': 0, 'wait_seconds': 0.0})
+            stats['acquired'] += 1
+            stats['waits'] += int(wait > 0)
+            stats['wait_seconds'] += wait
+        return wait
+
+    def charge(self, key: str, limit: int, cost: float, period: float = 60.0):
+        """Deduct tokens already spent (e.g. LLM tokens known after the call) without waiting."""
+        if limit > 0 and cost > 0:
+            self._take(key, limit, cost, period)
+
+    def _take(self, key: str, limit: int, cost: float, period: float) -> float:
+        try:
+            return self.store.take(key, float(limit), limit / period, cost, time.time())
+        except sqlite3.Error as e:
+            # An unavailable store must not take the application down with it
+            logger.warning(f"Rate limit store unavailable ({e}); not limiting {key}")
+            return 0.0
+
+    def stats(self) -> dict:
+        """Acquisitions and waits of this process, per bucket."""
+        with self._lock:
+            return {
+                key: {**stats, 'wait_seconds': round(stats['wait_seconds'], 3)}
+                for key, stats in self._stats.items()
+            }
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_limiter_lock = threading.Lock()
+
+
+def shared_limiter() -> RateLimiter:
+    """Process-wide limiter over the RATE_LIMIT_DB store."""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            store = MemoryBucketStore() if RATE_LIMIT_DB == 'memory' else SQLiteBucketStore(RATE_LIMIT_DB)
+            _shared_limiter = RateLimiter(store)
+        return _shared_limiter
+
+
+class _SharedLLMGate:
+    """Wraps an agent's RPMController so its LLM calls also draw from the shared LLM buckets."""
+
+    def __init__(self, controller, limiter: RateLimiter, rpm_limit: int, tpm_limit: int):
+        self._controller = controller
+        self._limiter = limiter
+        self._rpm_limit = rpm_limit
+        self._tpm_limit = tpm_limit
+
+    def check_or_wait(self) -> bool:
+        self._limiter.acquire(LLM_REQUESTS_KEY, self._rpm_limit)
+        # Tokens are charged after each call; wait until earlier calls are paid off
+        self._limiter.acquire(LLM_TOKENS_KEY, self._tpm_limit, cost=0)
+        return self._controller.check_or_wait() if self._controller is not None else True
+
+    def stop_rpm_counter(self):
+        if self._controller is not None:
+            self._controller.stop_rpm_counter()
+
+
+_tpm_limit = 0
+_tpm_listener_installed = False
+
+
+def _install_tpm_listener():
+    global _tpm_listener_installed
+    with _shared_limiter_lock:
+        if _tpm_listener_installed:
+            return
+        _tpm_listener_installed = True
+
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.llm_events import LLMCallCompletedEvent
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def _on_llm_completed(source, event):
+        prompt_tokens, completion_tokens = usage_tokens(event.usage)
+        shared_limiter().charge(LLM_TOKENS_KEY, _tpm_limit, prompt_tokens + completion_tokens)
+
+
+def attach_llm_limits(agents: Iterable, rpm_limit: int, tpm_limit: int = 0):
+    """
+    Make the agents' LLM calls respect the shared requests- and tokens-per-minute limits.
+
+    Call after the crew is built (so the agents' RPM controllers are set)
+    and before metrics.RunMetrics.attach, so waits count as throttling.
+
+    Args:
+        agents: Agents of one crew
+        rpm_limit: LLM requests per minute across all processes (0 for unlimited)
+        tpm_limit: LLM tokens per minute across all processes (0 for unlimited)
+    """
+    global _tpm_limit
+    if rpm_limit <= 0 and tpm_limit <= 0:
+        return
+    if tpm_limit > 0:
+        _tpm_limit = tpm_limit
+        _install_tpm_listener()
+    limiter = shared_limiter()
+    for agent in agents:
+        if not isinstance(agent._rpm_controller, _SharedLLMGate):
+            agent._rpm_controller = _SharedLLMGate(agent._rpm_controller, limiter, rpm_limit, tpm_limit)
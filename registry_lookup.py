@@ -0,0 +1,350 @@
+"""
+Registry Lookups
+Direct (non-agent) queries against the provider registries used by the crew.
+"""
+import hashlib
+import json
+import threading
+from datetime import date
+from typing import Optional, Tuple
+
+import requests
+
+from config import Config
+from license_cache import LicenseCache, parse_expiration
+from rate_limiter import host_key, shared_limiter
+from utils import create_retry_session, get_logger
+from validation_models import ValidationFindings
+
+logger = get_logger(__name__)
+
+# Timeouts used by registry queries, in seconds
+NPI_SEARCH_TIMEOUT = 20
+NABP_TIMEOUT = Config.NABP_TIMEOUT
+
+# NABP answers by query; repeat checks of a pharmacist are served from here
+nabp_cache = LicenseCache(Config.NABP_CACHE_MIN_SECONDS, Config.NABP_CACHE_MAX_SECONDS)
+
+_nabp_session = None
+_nabp_session_lock = threading.Lock()
+
+
+def split_provider_name(provider_name: str) -> Tuple[str, str]:
+    """
+    Split a free-text provider name into first and last name.
+
+    Args:
+        provider_name: Name as typed by the user (e.g. "Dr. Jane Q. Doe")
+
+    Returns:
+        Tuple of (first_name, last_name); either may be empty
+    """
+    parts = [p for p in provider_name.replace(',', ' ').split() if p.rstrip('.').lower() not in ('dr', 'md', 'do', 'rph', 'pharmd')]
+    if not parts:
+        return "", ""
+    if len(parts) == 1:
+        return "", parts[0]
+    return parts[0], parts[-1]
+
+
+def search_npi_registry(
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    state: Optional[str] = None,
+    npi_number: Optional[str] = None,
+    limit: int = 5,
+) -> dict:
+    """
+    Query the NPPES NPI Registry.
+
+    Args:
+        first_name: Provider's first name
+        last_name: Provider's last name
+        state: Two-letter state code
+        npi_number: 10-digit NPI number for direct lookup
+        limit: Maximum number of results
+
+    Returns:
+        Parsed registry response
+
+    Raises:
+        ValueError: If neither an NPI nor a name and state are given
+        requests.RequestException: On transport or HTTP errors
+    """
+    params = {"version": "2.1", "limit": limit}
+    if npi_number:
+        params["number"] = npi_number
+    elif first_name and last_name and state:
+        params.update({
+            "first_name": first_name,
+            "last_name": last_name,
+            "state": state
+        })
+    else:
+        raise ValueError(
+            "Please provide either 'npi_number' OR a combination of "
+            "'first_name', 'last_name', and 'state'."
+        )
+
+    shared_limiter().acquire(host_key(Config.NPI_BASE_URL), Config.NPPES_RPM_LIMIT)
+    resp = requests.get(Config.NPI_BASE_URL, params=params, timeout=NPI_SEARCH_TIMEOUT)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def nabp_session() -> requests.Session:
+    """
+    Pooled session of the NABP requests of this process.
+
+    The validate call is a read, so it is retried like an idempotent one:
+    on connection failures, timeouts and 429/502/503/504 answers. Every
+    retry takes a token from the NABP_RPM_LIMIT bucket, like the first
+    attempt does in validate_nabp_license. Once the retries are used up the
+    last response is returned, so raise_for_status() reports its status.
+    """
+    global _nabp_session
+    with _nabp_session_lock:
+        if _nabp_session is None:
+            _nabp_session = create_retry_session(
+                retries=Config.NABP_MAX_RETRIES,
+                backoff_factor=Config.RETRY_BACKOFF_FACTOR,
+                status_forcelist=(429, 502, 503, 504),
+                raise_on_status=False,
+                before_retry=_acquire_nabp_slot
+            )
+        return _nabp_session
+
+
+def _acquire_nabp_slot() -> None:
+    shared_limiter().acquire(host_key(Config.NABP_BASE_URL), Config.NABP_RPM_LIMIT)
+
+
+def nabp_cache_key(
+    first_name: Optional[str],
+    last_name: Optional[str],
+    license_number: Optional[str],
+    state: Optional[str],
+) -> tuple:
+    """Cache key of an NABP query, insensitive to case and surrounding whitespace."""
+    return tuple((value or "").strip().upper() for value in (first_name, last_name, license_number, state))
+
+
+def nabp_expiration(data: dict) -> Optional[date]:
+    """Expiration date of the license in a validated NABP response, if given."""
+    if not nabp_is_valid(data):
+        return None
+    license_info = data.get("license", {}) or {}
+    return parse_expiration(license_info.get("expiration_date") or data.get("expirationDate"))
+
+
+def validate_nabp_license(
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    license_number: Optional[str] = None,
+    state: Optional[str] = None,
+) -> dict:
+    """
+    Query the NABP e-Profile validation endpoint.
+
+    Answers are cached in nabp_cache: a validated license until its
+    expiration date, anything else for the cache's minimum TTL.
+
+    Args:
+        first_name: Pharmacist's first name
+        last_name: Pharmacist's last name
+        license_number: License number
+        state: Two-letter state code
+
+    Returns:
+        Parsed NABP response
+
+    Raises:
+        ValueError: If no identifying field is given
+        requests.RequestException: On transport or HTTP errors
+    """
+    headers = {"Content-Type": "application/json"}
+    if Config.NABP_API_KEY:
+        headers["Authorization"] = f"Bearer {Config.NABP_API_KEY}"
+
+    # Build payload with camelCase (NABP API standard)
+    payload = {}
+    if first_name:
+        payload["firstName"] = first_name
+    if last_name:
+        payload["lastName"] = last_name
+    if license_number:
+        payload["licenseNumber"] = license_number
+    if state:
+        payload["state"] = state.upper()
+
+    if not payload:
+        raise ValueError("At least one identifying field (first_name/last_name/license_number/state) is required.")
+
+    key = nabp_cache_key(first_name, last_name, license_number, state)
+    cached = nabp_cache.get(key)
+    if cached is not None:
+        return cached
+
+    _acquire_nabp_slot()
+    resp = nabp_session().post(Config.NABP_BASE_URL, json=payload, headers=headers, timeout=NABP_TIMEOUT)
+    resp.raise_for_status()
+    data = resp.json()
+    ttl = nabp_cache.put(key, data, nabp_expiration(data))
+    logger.debug(f"Cached NABP answer for {' '.join(filter(None, key))} for {ttl:.0f}s")
+    return data
+
+
+def nabp_is_valid(data: dict) -> bool:
+    """Whether an NABP response reports a validated license."""
+    return bool(
+        data.get("valid") or
+        data.get("is_valid") or
+        data.get("status") in ["VALIDATED", "VALID", "Active"]
+    )
+
+
+def _is_pharmacist(npi_result: dict) -> bool:
+    return any(
+        "pharmac" in (taxonomy.get("desc") or "").lower()
+        for taxonomy in npi_result.get("taxonomies", [])
+    )
+
+
+def fetch_source_snapshot(provider_name: str, state: str) -> Optional[dict]:
+    """
+    Fetch the registry records the crew would base its verdict on.
+
+    Args:
+        provider_name: Provider's full name
+        state: Two-letter state code
+
+    Returns:
+        Snapshot dictionary, or None if a registry could not be queried
+    """
+    first_name, last_name = split_provider_name(provider_name)
+    if not first_name or not last_name:
+        return None
+
+    try:
+        data = search_npi_registry(first_name, last_name, state.upper())
+    except (requests.RequestException, ValueError) as e:
+        logger.warning(f"Source snapshot unavailable for {provider_name} ({state}): {e}")
+        return None
+
+    results = sorted(data.get("results", []), key=lambda r: str(r.get("number", "")))
+    snapshot = {"npi": results}
+
+    # NABP applies to pharmacists, and to anyone NPPES does not know about
+    if Config.NABP_API_KEY and (not results or any(_is_pharmacist(r) for r in results)):
+        try:
+            snapshot["nabp"] = validate_nabp_license(first_name, last_name, state=state.upper())
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                logger.warning(f"NABP snapshot unavailable for {provider_name} ({state}): {e}")
+                return None
+            snapshot["nabp"] = {"valid": False, "status": "NOT_FOUND"}
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"NABP snapshot unavailable for {provider_name} ({state}): {e}")
+            return None
+
+    return snapshot
+
+
+def provider_not_found(snapshot: Optional[dict]) -> bool:
+    """
+    Whether a snapshot proves the provider is in no registry.
+
+    Args:
+        snapshot: Dictionary returned by fetch_source_snapshot
+
+    Returns:
+        True only when every applicable registry answered and none matched;
+        False when the snapshot is missing (a registry could not be queried)
+    """
+    if snapshot is None or snapshot.get("npi"):
+        return False
+    nabp = snapshot.get("nabp")
+    return nabp is None or not nabp_is_valid(nabp)
+
+
+def fingerprint_snapshot(snapshot: dict) -> str:
+    """
+    Stable content hash of a source snapshot.
+
+    Args:
+        snapshot: Dictionary returned by fetch_source_snapshot
+
+    Returns:
+        Hex SHA-256 digest that changes whenever the source data changes
+    """
+    canonical = json.dumps(snapshot, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _format_address(address: dict) -> str:
+    parts = [address.get("address_1"), address.get("address_2"), address.get("city"), address.get("state")]
+    line = ", ".join(part for part in parts if part)
+    postal_code = (address.get("postal_code") or "")[:5]
+    return f"{line} {postal_code}".strip()
+
+
+def snapshot_findings(snapshot: Optional[dict]) -> ValidationFindings:
+    """
+    Validation findings read directly from a source snapshot, without the LLM.
+
+    Used when a run is stopped before its validation task finished, so the
+    report still carries the registry data that was already fetched.
+
+    Args:
+        snapshot: Dictionary returned by fetch_source_snapshot (may be None)
+
+    Returns:
+        ValidationFindings; statuses stay "Unknown" for what the snapshot does not show
+    """
+    if snapshot is None:
+        return ValidationFindings(
+            provider_found=True,
+            summary="Registry data could not be retrieved; the provider has not been verified."
+        )
+    if provider_not_found(snapshot):
+        return ValidationFindings(
+            provider_found=False,
+            npi_status="Not Found",
+            sources_checked=["NPPES"] + (["NABP"] if "nabp" in snapshot else []),
+            summary="No NPPES record matches this name and state."
+        )
+
+    findings = ValidationFindings(provider_found=True, sources_checked=["NPPES"])
+    results = snapshot.get("npi") or []
+    if results:
+        record = results[0]
+        basic = record.get("basic", {})
+        taxonomies = record.get("taxonomies", [])
+        primary = next((t for t in taxonomies if t.get("primary")), taxonomies[0] if taxonomies else {})
+        location = next(
+            (a for a in record.get("addresses", []) if a.get("address_purpose") == "LOCATION"), None
+        )
+        findings.provider_name = " ".join(filter(None, [basic.get("first_name"), basic.get("last_name")]))
+        findings.npi = str(record.get("number", "")) or None
+        findings.specialty = primary.get("desc")
+        findings.practice_address = _format_address(location) if location else None
+        findings.npi_status = "Active" if basic.get("status") == "A" else "Inactive"
+        findings.license_number = primary.get("license")
+        if len(results) > 1:
+            findings.discrepancies.append(
+                f"{len(results)} NPPES records match this name and state; details are from NPI {findings.npi}."
+            )
+    else:
+        findings.npi_status = "Not Found"
+
+    nabp = snapshot.get("nabp")
+    if nabp is not None:
+        findings.sources_checked.append("NABP")
+        findings.nabp_status = "Validated" if nabp_is_valid(nabp) else str(nabp.get("status") or "Not validated")
+
+    findings.summary = (
+        f"Registry data only: NPI {findings.npi_status.lower()}"
+        + (f" ({findings.npi})" if findings.npi else "")
+        + ". License, sanctions and compliance were not reviewed."
+    )
+    return findings
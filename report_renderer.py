@@ -0,0 +1,102 @@
+"""
+Report Renderer
+Renders the provider validation report from the structured task outputs.
+"""
+from datetime import datetime
+
+from jinja2 import Environment, StrictUndefined
+
+from validation_models import ProviderValidationResult
+
+REPORT_TEMPLATE = """# Healthcare Provider Validation Report
+{% if r.partial %}
+> **Partial result**: AI validation did not complete ({{ r.partial_reason or 'stopped' }}). Findings below
+> come from the registry data and the stages that finished; review before relying on them.
+{% endif %}
+## 1. Provider Information
+- **Name**: {{ r.validation.provider_name or r.provider_name }}
+- **State**: {{ r.state }}
+- **NPI**: {{ r.validation.npi or 'N/A' }}
+- **Specialty**: {{ r.validation.specialty or 'N/A' }}
+- **Practice Address**: {{ r.validation.practice_address or 'N/A' }}
+- **License Number**: {{ r.validation.license_number or 'N/A' }}
+- **Validation Date**: {{ generated_at }}
+
+## 2. Overall Validation Status
+**{{ 'VALID' if r.valid else 'NEEDS REVIEW' }}**{% if r.is_sanctioned %} - sanctions or exclusions found{% endif %}
+
+{{ r.validation.summary }}
+
+## 3. Detailed Validation Findings
+| Source | Result |
+| ------ | ------ |
+| NPI Registry | {{ r.validation.npi_status }} |
+| State License | {{ r.validation.license_status }} |
+| NABP | {{ r.validation.nabp_status }} |
+| Propelus | {{ r.validation.propelus_status }} |
+
+**Sources checked**: {{ r.validation.sources_checked | join(', ') if r.validation.sources_checked else 'N/A' }}
+
+### Discrepancies
+{% for item in r.validation.discrepancies %}- {{ item }}
+{% else %}- None found
+{% endfor %}
+{% if r.enrichment %}
+### Data Completeness
+- **Completeness Score**: {{ r.enrichment.completeness_score }}/100
+- **Missing Fields**: {{ r.enrichment.missing_fields | join(', ') if r.enrichment.missing_fields else 'None' }}
+{% for item in r.enrichment.inconsistencies %}- Inconsistency: {{ item }}
+{% endfor %}{% endif %}
+## 4. Compliance Status
+{% if r.qa %}**{{ r.qa.compliance_status }}**
+
+{{ r.qa.summary }}
+
+{% for item in r.qa.sanctions %}- Sanction/Exclusion: {{ item }}
+{% endfor %}{% for item in r.qa.issues %}- Issue: {{ item }}
+{% endfor %}{% else %}QA review not available.
+{% endif %}
+## 5. Recommendations & Required Actions
+{% for item in actions %}- {{ item }}
+{% else %}- No further action required
+{% endfor %}
+---
+*Generated by MediverifyAI CrewAI multi-agent system*
+"""
+
+NO_USER_FOUND_TEMPLATE = """NO_USER_FOUND: Provider '{{ r.provider_name }}' not found in {{ r.state }} verification systems.
+
+{{ r.validation.summary }}
+{% if r.partial %}
+(Partial result: AI validation did not complete - {{ r.partial_reason or 'stopped' }}.)
+{% endif %}"""
+
+_env = Environment(undefined=StrictUndefined, keep_trailing_newline=True)
+_report_template = _env.from_string(REPORT_TEMPLATE)
+_not_found_template = _env.from_string(NO_USER_FOUND_TEMPLATE)
+
+
+def render_report(result: ProviderValidationResult) -> str:
+    """
+    Render the markdown report for one validation run.
+
+    Args:
+        result: Combined structured outputs of the run
+
+    Returns:
+        Markdown report, or a NO_USER_FOUND notice when the provider was not found
+    """
+    if not result.provider_found:
+        return _not_found_template.render(r=result)
+
+    actions = []
+    if result.qa:
+        actions.extend(result.qa.required_actions)
+    if result.enrichment:
+        actions.extend(result.enrichment.recommendations)
+
+    return _report_template.render(
+        r=result,
+        actions=actions,
+        generated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    )
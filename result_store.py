@@ -0,0 +1,316 @@
+"""
+Result Store
+Keeps bulk validation job results server-side and serves them in pages.
+"""
+import base64
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Columns the results API can sort on
+SORT_FIELDS = ('npi', 'name', 'valid', 'taxonomy', 'location')
+
+# Filter values accepted for the status filter
+STATUS_FILTERS = ('all', 'valid', 'invalid')
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS jobs ("
+    "id TEXT PRIMARY KEY, created_at TEXT NOT NULL, total INTEGER NOT NULL, "
+    "valid_count INTEGER NOT NULL, invalid_count INTEGER NOT NULL)",
+    # Text columns compare case-insensitively, so sorting and cursors ignore case
+    "CREATE TABLE IF NOT EXISTS results ("
+    "job_id TEXT NOT NULL, idx INTEGER NOT NULL, npi TEXT COLLATE NOCASE NOT NULL, "
+    "name TEXT COLLATE NOCASE NOT NULL, valid INTEGER NOT NULL, taxonomy TEXT COLLATE NOCASE NOT NULL, "
+    "location TEXT COLLATE NOCASE NOT NULL, haystack TEXT NOT NULL, PRIMARY KEY (job_id, idx)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS counts ("
+    "job_id TEXT NOT NULL, status TEXT NOT NULL, query TEXT NOT NULL, count INTEGER NOT NULL, "
+    "used INTEGER NOT NULL, PRIMARY KEY (job_id, status, query))",
+) + tuple(
+    f"CREATE INDEX IF NOT EXISTS results_{field} ON results (job_id, {field}, idx)"
+    for field in SORT_FIELDS
+)
+
+
+def _sort_value(row: dict, field: str):
+    value = row.get(field)
+    if isinstance(value, (bool, int)):
+        return int(value)
+    return str(value or '')
+
+
+def encode_cursor(sort_value, index: int) -> str:
+    """Encode the position of the last returned row as an opaque cursor."""
+    raw = json.dumps([sort_value, index]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        sort_value, index = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return sort_value, int(index)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class ResultStore:
+    """
+    Store of bulk validation jobs in a SQLite file.
+
+    Every process opening the same file sees the same jobs, so any web
+    worker can serve the pages of a job another worker created; path
+    "memory" keeps the jobs in this process only. Only the most recent
+    ``max_jobs`` jobs are kept. Pages are read through per-column indexes;
+    filtered counts are cached for the ``max_cached_counts`` most recent
+    filters of each job.
+    """
+
+    def __init__(self, path: str = 'memory', max_jobs: int = 20, max_cached_counts: int = 64):
+        self.max_jobs = max_jobs
+        self.max_cached_counts = max_cached_counts
+        self.path = path
+        self._local = threading.local()
+        # An in-memory database lives in one connection, which the threads take turns on
+        self._memory = None
+        self._memory_lock = threading.Lock()
+        if path == 'memory':
+            self._memory = sqlite3.connect(':memory:', isolation_level=None, check_same_thread=False)
+        with self._connection() as conn:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        if self._memory is not None:
+            with self._memory_lock:
+                yield self._memory
+            return
+        conn = getattr(self._local, 'conn', None)
+        # A connection inherited from a parent process (fork) must not be reused
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        yield conn
+
+    def create(self, rows: List[dict]) -> str:
+        """
+        Store the rows of a finished job.
+
+        Args:
+            rows: Result rows (npi, name, valid, taxonomy, location)
+
+        Returns:
+            The new job id
+
+        Raises:
+            sqlite3.Error: If the store cannot be written
+        """
+        job_id = uuid.uuid4().hex
+        valid_count = sum(1 for row in rows if row.get('valid'))
+        records = []
+        for index, row in enumerate(rows):
+            values = [_sort_value(row, field) for field in SORT_FIELDS]
+            haystack = f"{values[0]} {values[1]} {values[3]} {values[4]}".lower()
+            records.append((job_id, index, *values, haystack))
+
+        with self._connection() as conn:
+            evicted = self._insert(conn, job_id, records, valid_count)
+        for old_id in evicted:
+            logger.info(f"Evicted results of job {old_id}")
+        return job_id
+
+    def _insert(self, conn: sqlite3.Connection, job_id: str, records: list, valid_count: int) -> list:
+        # IMMEDIATE takes the write lock up front, so concurrent creates evict in turn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, created_at, total, valid_count, invalid_count) VALUES (?, ?, ?, ?, ?)",
+                (job_id, datetime.now().isoformat(), len(records), valid_count, len(records) - valid_count)
+            )
+            conn.executemany(
+                "INSERT INTO results (job_id, idx, npi, name, valid, taxonomy, location, haystack) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                records
+            )
+            evicted = [job[0] for job in conn.execute(
+                "SELECT id FROM jobs ORDER BY rowid DESC LIMIT -1 OFFSET ?", (self.max_jobs,)
+            )]
+            for old_id in evicted:
+                for table, column in (('results', 'job_id'), ('counts', 'job_id'), ('jobs', 'id')):
+                    conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (old_id,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return evicted
+
+    def _job(self, job_id: str) -> Optional[dict]:
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT created_at, total, valid_count, invalid_count FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'id': job_id, 'created_at': row[0], 'total': row[1], 'valid_count': row[2], 'invalid_count': row[3]}
+
+    @staticmethod
+    def _row(record: tuple) -> dict:
+        index, npi, name, valid, taxonomy, location = record[:6]
+        return {'npi': npi, 'name': name, 'valid': bool(valid), 'taxonomy': taxonomy,
+                'location': location, 'index': index}
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a stored job with all its rows, or None."""
+        job = self._job(job_id)
+        if job is None:
+            return None
+        with self._connection() as conn:
+            job['rows'] = [self._row(record) for record in conn.execute(
+                "SELECT idx, npi, name, valid, taxonomy, location FROM results WHERE job_id = ? ORDER BY idx",
+                (job_id,)
+            )]
+        return job
+
+    @staticmethod
+    def _filters(job_id: str, status: str, query: str) -> tuple:
+        clauses, params = ["job_id = ?"], [job_id]
+        if status != 'all':
+            clauses.append("valid = ?")
+            params.append(int(status == 'valid'))
+        if query:
+            clauses.append("instr(haystack, ?) > 0")
+            params.append(query)
+        return clauses, params
+
+    def _filtered_count(self, job: dict, status: str, query: str) -> int:
+        if status == 'all' and not query:
+            return job['total']
+        key = (job['id'], status, query)
+        with self._connection() as conn:
+            return self._cached_count(conn, key)
+
+    def _cached_count(self, conn: sqlite3.Connection, key: tuple) -> int:
+        job_id = key[0]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # "used" orders the cached counts of a job from least to most recently read
+            used = conn.execute(
+                "SELECT COALESCE(MAX(used), 0) + 1 FROM counts WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            row = conn.execute(
+                "SELECT count FROM counts WHERE job_id = ? AND status = ? AND query = ?", key
+            ).fetchone()
+            if row is not None:
+                count = row[0]
+                conn.execute("UPDATE counts SET used = ? WHERE job_id = ? AND status = ? AND query = ?",
+                             (used, *key))
+            else:
+                clauses, params = self._filters(*key)
+                count = conn.execute(
+                    f"SELECT COUNT(*) FROM results WHERE {' AND '.join(clauses)}", params
+                ).fetchone()[0]
+                conn.execute("INSERT INTO counts (job_id, status, query, count, used) VALUES (?, ?, ?, ?, ?)",
+                             (*key, count, used))
+                # Every search-as-you-type prefix is a new filter: keep the recent ones only
+                conn.execute(
+                    "DELETE FROM counts WHERE job_id = ? AND used <= ("
+                    "SELECT used FROM counts WHERE job_id = ? ORDER BY used DESC LIMIT 1 OFFSET ?)",
+                    (job_id, job_id, self.max_cached_counts)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return count
+
+    def page(
+        self,
+        job_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        sort: str = 'index',
+        order: str = 'asc',
+        status: str = 'all',
+        query: str = '',
+    ) -> Optional[dict]:
+        """
+        Return one page of a job's rows.
+
+        Args:
+            job_id: Job to read
+            cursor: Cursor returned with the previous page, None for the first page
+            limit: Maximum rows to return
+            offset: Rows to skip before the page (after the cursor, if any), so
+                a client can jump to any position without reading the rows before it
+            sort: 'index' (upload order) or one of SORT_FIELDS
+            order: 'asc' or 'desc'
+            status: One of STATUS_FILTERS
+            query: Case-insensitive substring matched against the row text
+
+        Returns:
+            Page dictionary, or None if the job does not exist
+
+        Raises:
+            ValueError: On an unknown sort field, order, status, offset or a bad cursor
+        """
+        if offset < 0:
+            raise ValueError(f"Offset must not be negative: {offset}")
+        if sort != 'index' and sort not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {sort}")
+        if order not in ('asc', 'desc'):
+            raise ValueError(f"Unknown sort order: {order}")
+        if status not in STATUS_FILTERS:
+            raise ValueError(f"Unknown status filter: {status}")
+
+        job = self._job(job_id)
+        if job is None:
+            return None
+
+        query = query.strip().lower()
+        column = 'idx' if sort == 'index' else sort
+        direction = 'ASC' if order == 'asc' else 'DESC'
+        clauses, params = self._filters(job_id, status, query)
+
+        if cursor:
+            sort_value, index = decode_cursor(cursor)
+            numeric = column in ('idx', 'valid')
+            if isinstance(sort_value, bool) or not isinstance(sort_value, int if numeric else str):
+                raise ValueError(f"Cursor does not match sort field: {sort}")
+            operator = '>' if order == 'asc' else '<'
+            clauses.append(f"({column}, idx) {operator} (?, ?)")
+            params += [sort_value, index]
+
+        with self._connection() as conn:
+            records = conn.execute(
+                f"SELECT idx, npi, name, valid, taxonomy, location, {column} FROM results "
+                f"WHERE {' AND '.join(clauses)} ORDER BY {column} {direction}, idx {direction} LIMIT ? OFFSET ?",
+                (*params, limit + 1, offset)
+            ).fetchall()
+        has_more = len(records) > limit
+        records = records[:limit]
+
+        return {
+            'job_id': job_id,
+            'offset': offset,
+            'rows': [self._row(record) for record in records],
+            'next_cursor': encode_cursor(records[-1][6], records[-1][0]) if has_more else None,
+            'total': self._filtered_count(job, status, query),
+            'valid_count': job['valid_count'],
+            'invalid_count': job['invalid_count'],
+        }
@@ -0,0 +1,379 @@
+"""
+Roster Re-verification Scheduler
+Periodically re-runs registered NPI rosters in a background thread.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from utils import file_lock, get_logger, try_process_lock
+
+logger = get_logger(__name__)
+
+# Number of run records kept per roster
+RUN_HISTORY_LIMIT = 50
+
+# Rows verified between registry saves during a run, so a restart resumes
+# instead of re-checking the whole roster
+CHECKPOINT_ROWS = 200
+
+
+def parse_hour_window(window: str) -> tuple:
+    """
+    Parse an hour window such as "22-6" into (start, end) hours.
+
+    Args:
+        window: "start-end" in 24h clock; the window may wrap midnight
+
+    Returns:
+        Tuple of (start_hour, end_hour)
+    """
+    start, end = window.split("-", 1)
+    return int(start) % 24, int(end) % 24
+
+
+def in_hour_window(hour: int, window: tuple) -> bool:
+    """
+    Check whether an hour falls inside a (start, end) window.
+
+    Args:
+        hour: Hour of day (0-23)
+        window: Tuple returned by parse_hour_window
+
+    Returns:
+        True if the hour is inside the window
+    """
+    start, end = window
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+class RosterScheduler:
+    """
+    Re-verifies registered rosters on a cadence.
+
+    Each run only touches rows whose last verification is older than
+    ``max_age_seconds`` and paces its lookups at ``peak_rpm``, or at the
+    higher ``offpeak_rpm`` when the run happens inside the off-peak window.
+
+    The registry file is shared by every process built on it: each row's
+    last check time is stored there so restarts do not re-verify fresh rows,
+    changes are made under a file lock, and only one process (the holder of
+    the leader lock) runs the scheduling loop.
+    """
+
+    def __init__(
+        self,
+        validate_fn: Callable,
+        cache,
+        registry_path: Path,
+        max_age_seconds: int = 7 * 86400,
+        peak_rpm: int = 30,
+        offpeak_rpm: int = 240,
+        offpeak_hours: str = "22-6",
+        poll_interval: int = 60,
+    ):
+        """
+        Args:
+            validate_fn: NPI lookup, called as validate_fn(npi, max_age=0)
+            cache: VerificationCache shared with the web lookups
+            registry_path: JSON file holding registered rosters and run history
+            max_age_seconds: Rows verified more recently than this are skipped
+            peak_rpm: Lookups per minute outside the off-peak window
+            offpeak_rpm: Lookups per minute inside the off-peak window
+            offpeak_hours: Off-peak window as "start-end" hours (local time)
+            poll_interval: Seconds between checks for due rosters
+        """
+        self.validate_fn = validate_fn
+        self.cache = cache
+        self.registry_path = Path(registry_path)
+        self.max_age_seconds = max_age_seconds
+        self.peak_rpm = peak_rpm
+        self.offpeak_rpm = offpeak_rpm
+        self.offpeak_window = parse_hour_window(offpeak_hours)
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._running = set()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock_path = self.registry_path.with_suffix('.lock')
+        self._leader_path = self.registry_path.with_suffix('.leader')
+        self._mtime = None
+        self._rosters = self._load()
+
+    # ------------------------------------------------------------------
+    # Registry
+    # ------------------------------------------------------------------
+
+    def _registry_mtime(self) -> Optional[int]:
+        try:
+            return self.registry_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self) -> dict:
+        self._mtime = self._registry_mtime()
+        if self._mtime is None:
+            return {}
+        try:
+            with open(self.registry_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Could not load roster registry {self.registry_path}: {e}")
+            return {}
+
+    def _refresh(self) -> None:
+        """Reload the registry if another process saved it. Call with ``_lock`` held."""
+        if self._registry_mtime() != self._mtime:
+            self._rosters = self._load()
+
+    def _save(self) -> None:
+        self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.registry_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._rosters, f, indent=2)
+        tmp_path.replace(self.registry_path)
+        self._mtime = self._registry_mtime()
+
+    def _record_checks(self, roster_id: str, checked: dict, stats: Optional[dict] = None) -> None:
+        """
+        Merge row check times (and optionally a finished run) into the registry.
+
+        Args:
+            roster_id: Roster the rows belong to
+            checked: NPI -> unix time of its verification
+            stats: Finished run to append to the run history
+        """
+        with self._lock, file_lock(self._lock_path):
+            self._refresh()
+            roster = self._rosters.get(roster_id)
+            if roster is None:
+                return
+            roster.setdefault('checked_at', {}).update(checked)
+            if stats is not None:
+                roster['last_run_at'] = stats['started_at']
+                roster['runs'] = (roster['runs'] + [stats])[-RUN_HISTORY_LIMIT:]
+            self._save()
+
+    def register(self, name: str, rows: List[dict], interval_seconds: int) -> dict:
+        """
+        Register a roster for periodic re-verification.
+
+        Args:
+            name: Display name of the roster
+            rows: Roster rows, each with an 'npi' and optional 'name'
+            interval_seconds: Cadence between runs
+
+        Returns:
+            The registered roster record
+        """
+        roster_id = uuid.uuid4().hex[:12]
+        roster = {
+            'id': roster_id,
+            'name': name,
+            'rows': rows,
+            'interval_seconds': interval_seconds,
+            'created_at': datetime.now().isoformat(),
+            'last_run_at': None,
+            'runs': [],
+            'checked_at': {},
+        }
+        with self._lock, file_lock(self._lock_path):
+            self._refresh()
+            self._rosters[roster_id] = roster
+            self._save()
+        logger.info(f"Registered roster {roster_id} ({name}) with {len(rows)} rows")
+        return roster
+
+    def unregister(self, roster_id: str) -> bool:
+        """Remove a roster. Returns False if it was not registered."""
+        with self._lock, file_lock(self._lock_path):
+            self._refresh()
+            if self._rosters.pop(roster_id, None) is None:
+                return False
+            self._save()
+        return True
+
+    def get(self, roster_id: str) -> Optional[dict]:
+        """Return a roster record (including run history) or None."""
+        with self._lock:
+            self._refresh()
+            return self._rosters.get(roster_id)
+
+    def list_rosters(self) -> List[dict]:
+        """Return roster summaries without their rows."""
+        with self._lock:
+            self._refresh()
+            return [
+                {
+                    'id': r['id'],
+                    'name': r['name'],
+                    'row_count': len(r['rows']),
+                    'interval_seconds': r['interval_seconds'],
+                    'last_run_at': r['last_run_at'],
+                    'last_run': r['runs'][-1] if r['runs'] else None,
+                    'running': r['id'] in self._running,
+                }
+                for r in self._rosters.values()
+            ]
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def current_rpm(self, now: Optional[datetime] = None) -> int:
+        """Lookup rate for the current time of day."""
+        now = now or datetime.now()
+        if in_hour_window(now.hour, self.offpeak_window):
+            return self.offpeak_rpm
+        return self.peak_rpm
+
+    def due_rosters(self, now: Optional[float] = None) -> List[str]:
+        """IDs of rosters whose interval has elapsed since their last run."""
+        now = now or time.time()
+        due = []
+        with self._lock:
+            self._refresh()
+            for roster in self._rosters.values():
+                if roster['id'] in self._running:
+                    continue
+                last_run = roster['last_run_at']
+                if last_run is None:
+                    due.append(roster['id'])
+                    continue
+                elapsed = now - datetime.fromisoformat(last_run).timestamp()
+                if elapsed >= roster['interval_seconds']:
+                    due.append(roster['id'])
+        return due
+
+    def run_roster(self, roster_id: str) -> Optional[dict]:
+        """
+        Re-verify the stale rows of one roster.
+
+        Args:
+            roster_id: ID of a registered roster
+
+        Returns:
+            Run statistics, or None if the roster is unknown or already running
+        """
+        with self._lock:
+            self._refresh()
+            roster = self._rosters.get(roster_id)
+            if roster is None or roster_id in self._running:
+                return None
+            self._running.add(roster_id)
+            rows = list(roster['rows'])
+            checked_at = dict(roster.get('checked_at', {}))
+
+        started = time.time()
+        started_at = datetime.now()
+        stats = {
+            'run_id': uuid.uuid4().hex[:12],
+            'started_at': started_at.isoformat(),
+            'rows_total': len(rows),
+            'rows_checked': 0,
+            'rows_skipped': 0,
+            'valid': 0,
+            'invalid': 0,
+            'errors': 0,
+            'offpeak': in_hour_window(started_at.hour, self.offpeak_window),
+        }
+        logger.info(f"Roster {roster_id}: starting re-verification of {len(rows)} rows")
+
+        checked = {}
+        try:
+            for row in rows:
+                if self._stop.is_set():
+                    break
+                npi = row['npi']
+                # The newer of the registry's check time (kept across restarts)
+                # and the cache entry (which web lookups refresh too)
+                age = self.cache.age(npi)
+                if npi in checked_at:
+                    registry_age = time.time() - checked_at[npi]
+                    age = registry_age if age is None else min(age, registry_age)
+                if age is not None and age < self.max_age_seconds:
+                    stats['rows_skipped'] += 1
+                    continue
+
+                call_started = time.time()
+                try:
+                    result = self.validate_fn(npi, max_age=0)
+                    checked[npi] = time.time()
+                    stats['rows_checked'] += 1
+                    if len(checked) >= CHECKPOINT_ROWS:
+                        self._record_checks(roster_id, checked)
+                        checked = {}
+                    if result.get('valid'):
+                        stats['valid'] += 1
+                    else:
+                        stats['invalid'] += 1
+                except Exception as e:
+                    stats['errors'] += 1
+                    logger.error(f"Roster {roster_id}: lookup failed for {npi}: {e}")
+
+                # Pace lookups so the roster only uses the spare rate budget
+                delay = 60.0 / max(self.current_rpm(), 1) - (time.time() - call_started)
+                if delay > 0:
+                    self._stop.wait(delay)
+        finally:
+            duration = time.time() - started
+            stats['finished_at'] = datetime.now().isoformat()
+            stats['duration_seconds'] = round(duration, 3)
+            stats['throughput_rps'] = round(stats['rows_checked'] / duration, 3) if duration > 0 else 0.0
+            try:
+                self._record_checks(roster_id, checked, stats)
+            finally:
+                with self._lock:
+                    self._running.discard(roster_id)
+
+        logger.info(
+            f"Roster {roster_id}: checked {stats['rows_checked']}, skipped "
+            f"{stats['rows_skipped']} in {stats['duration_seconds']}s "
+            f"({stats['throughput_rps']} rows/s)"
+        )
+        return stats
+
+    def run_async(self, roster_id: str) -> None:
+        """Run a roster immediately in a background thread."""
+        threading.Thread(target=self.run_roster, args=(roster_id,), daemon=True).start()
+
+    def _loop(self) -> None:
+        leading = False
+        while not self._stop.is_set():
+            # Every process may start the scheduler; only the leader runs rosters,
+            # and another process takes over once the leader exits
+            if not try_process_lock(self._leader_path):
+                self._stop.wait(self.poll_interval)
+                continue
+            if not leading:
+                leading = True
+                logger.info(f"Roster scheduler leading in process {os.getpid()}")
+            for roster_id in self.due_rosters():
+                if self._stop.is_set():
+                    break
+                try:
+                    self.run_roster(roster_id)
+                except Exception as e:
+                    logger.exception(f"Roster {roster_id}: run failed: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def start(self) -> None:
+        """Start the background scheduling thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="roster-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("Roster scheduler started")
+
+    def stop(self) -> None:
+        """Signal the scheduling thread and any running roster to stop."""
+        self._stop.set()
@@ -0,0 +1,4 @@
+"""
+Upstream Stand-ins
+Local NPPES, NABP, Propelus and LLM servers with injectable latency, errors and 429s for offline load tests.
+"""
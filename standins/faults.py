@@ -0,0 +1,128 @@
+"""
+Fault Injection
+Latency, error and 429 faults of one stand-in service, adjustable while it runs.
+"""
+import random
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from flask import jsonify
+
+from http_replay import LatencyModel
+
+# Settings of a FaultProfile that can be changed at runtime
+FAULT_SETTINGS = ('latency', 'error_rate', 'error_status', 'rate_429', 'rpm_limit', 'retry_after')
+
+
+class FaultProfile:
+    """
+    Faults injected into every request of a stand-in service.
+
+    Each request first passes the rate limits: a 429 comes back when more
+    than ``rpm_limit`` requests arrived in the last minute (0 = unlimited)
+    or, independently, with probability ``rate_429``, telling the client
+    to retry after ``retry_after`` whole seconds. Admitted requests
+    are delayed by the latency model (see http_replay.LatencyModel) and
+    then fail with ``error_status`` with probability ``error_rate``. All
+    draws come from one seeded generator, so a run is repeatable.
+    """
+
+    def __init__(self, latency: str = 'none', error_rate: float = 0.0, error_status: int = 500,
+                 rate_429: float = 0.0, rpm_limit: int = 0, retry_after: int = 1, seed: int = 0):
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = deque()
+        self.counts = {'requests': 0, 'throttled': 0, 'errors': 0}
+        self.delay_seconds = 0.0
+        self.update(latency=latency, error_rate=error_rate, error_status=error_status,
+                    rate_429=rate_429, rpm_limit=rpm_limit, retry_after=retry_after)
+
+    def update(self, **settings):
+        """
+        Change settings (any of FAULT_SETTINGS).
+
+        Raises:
+            ValueError: On an unknown setting or invalid value
+        """
+        unknown = set(settings) - set(FAULT_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown fault setting(s): {', '.join(sorted(unknown))}")
+        for name in ('error_rate', 'rate_429'):
+            if name in settings and not 0.0 <= float(settings[name]) <= 1.0:
+                raise ValueError(f"{name} must be between 0 and 1")
+        with self._lock:
+            if 'latency' in settings:
+                self.latency = LatencyModel(settings['latency'], self.seed)
+            for name in ('error_rate', 'rate_429'):
+                if name in settings:
+                    setattr(self, name, float(settings[name]))
+            for name in ('error_status', 'rpm_limit', 'retry_after'):
+                if name in settings:
+                    setattr(self, name, int(settings[name]))
+
+    def settings(self) -> dict:
+        with self._lock:
+            return {
+                'latency': self.latency.spec,
+                'error_rate': self.error_rate,
+                'error_status': self.error_status,
+                'rate_429': self.rate_429,
+                'rpm_limit': self.rpm_limit,
+                'retry_after': self.retry_after,
+            }
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self.counts['requests']
+            return {
+                **self.counts,
+                'mean_delay_ms': round(self.delay_seconds / requests * 1000, 3) if requests else 0.0,
+            }
+
+    def _throttled(self, now: float) -> bool:
+        if self.rpm_limit:
+            while self._window and self._window[0] <= now - 60:
+                self._window.popleft()
+            if len(self._window) >= self.rpm_limit:
+                return True
+        if self._random.random() < self.rate_429:
+            return True
+        self._window.append(now)
+        return False
+
+    def inject(self) -> Optional[tuple]:
+        """
+        Apply the faults to the current request.
+
+        Returns:
+            A Flask (response, status, headers) tuple to send instead of
+            the real answer, or None to serve the request normally
+        """
+        with self._lock:
+            self.counts['requests'] += 1
+            if self._throttled(time.monotonic()):
+                self.counts['throttled'] += 1
+                retry_after = self.retry_after
+                throttled = True
+            else:
+                throttled = False
+                delay = self.latency.delay(0.0)
+                failed = self._random.random() < self.error_rate
+                error_status = self.error_status
+                self.delay_seconds += delay
+                if failed:
+                    self.counts['errors'] += 1
+
+        if throttled:
+            return (
+                jsonify({'error': {'code': 429, 'message': 'Rate limit exceeded (injected)'}}),
+                429,
+                {'Retry-After': str(retry_after)},
+            )
+        time.sleep(delay)
+        if failed:
+            return jsonify({'error': {'code': error_status, 'message': 'Upstream failure (injected)'}}), error_status, {}
+        return None
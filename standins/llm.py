@@ -0,0 +1,254 @@
+"""
+LLM Stand-in
+OpenAI- and Gemini-compatible completion endpoints answering with schema-conformant stub output.
+"""
+import json
+import time
+import uuid
+from datetime import date
+from typing import Optional
+
+from flask import Blueprint, Response, jsonify, request
+
+# Characters per streamed chunk
+STREAM_CHUNK_CHARS = 40
+
+# Final answer of a call that asks for no particular format
+PLAIN_ANSWER = 'The requested check was completed with the stand-in LLM; no issues were found.'
+
+
+def _resolve(schema: dict, defs: dict) -> dict:
+    ref = schema.get('$ref')
+    if ref:
+        return defs.get(ref.rsplit('/', 1)[-1], {})
+    return schema
+
+
+def schema_instance(schema: dict, defs: Optional[dict] = None, name: str = 'value'):
+    """
+    A minimal value conforming to a JSON schema.
+
+    Defaults, consts and the first enum value are taken as given; of a
+    union the first non-null branch is used. Booleans are true, numbers
+    their minimum, arrays empty unless a minimum length is set, strings a
+    placeholder derived from the property name (today's date for dates).
+    """
+    defs = defs if defs is not None else {**schema.get('$defs', {}), **schema.get('definitions', {})}
+    schema = _resolve(schema, defs)
+    if 'default' in schema and schema['default'] is not None:
+        return schema['default']
+    if 'const' in schema:
+        return schema['const']
+    if schema.get('enum'):
+        return schema['enum'][0]
+    for union in ('anyOf', 'oneOf', 'allOf'):
+        if schema.get(union):
+            branches = [_resolve(branch, defs) for branch in schema[union]]
+            branch = next((b for b in branches if str(b.get('type', '')).lower() != 'null'), branches[0])
+            return schema_instance(branch, defs, name)
+
+    kind = schema.get('type', 'object' if 'properties' in schema else 'string')
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != 'null'), 'null')
+    kind = kind.lower()
+    if kind == 'object':
+        return {
+            prop: schema_instance(prop_schema, defs, prop)
+            for prop, prop_schema in schema.get('properties', {}).items()
+        }
+    if kind == 'array':
+        return [schema_instance(schema.get('items', {}), defs, name) for _ in range(schema.get('minItems', 0))]
+    if kind == 'boolean':
+        return True
+    if kind == 'integer':
+        return int(schema.get('minimum', 0))
+    if kind == 'number':
+        return float(schema.get('minimum', 0))
+    if kind == 'null':
+        return None
+    if schema.get('format') == 'date':
+        return date.today().isoformat()
+    return f"stub {name.replace('_', ' ')}"
+
+
+def _unwrap_schema(candidate) -> Optional[dict]:
+    """The JSON schema held by an OpenAI response_format or a bare schema, if any."""
+    if not isinstance(candidate, dict):
+        return None
+    if isinstance(candidate.get('json_schema'), dict):
+        candidate = candidate['json_schema'].get('schema', {})
+    return candidate if 'properties' in candidate else None
+
+
+def schema_in_text(text: str) -> Optional[dict]:
+    """The last JSON schema embedded in a prompt (CrewAI appends the expected output schema)."""
+    decoder = json.JSONDecoder()
+    found, position = None, text.find('{')
+    while position != -1:
+        try:
+            value, end = decoder.raw_decode(text, position)
+        except ValueError:
+            position = text.find('{', position + 1)
+            continue
+        found = _unwrap_schema(value) or found
+        position = text.find('{', end)
+    return found
+
+
+def answer(prompt: str, schema: Optional[dict]) -> str:
+    """
+    Stub completion of a prompt.
+
+    With a structured-output schema the answer is a conforming JSON
+    document; otherwise a ReAct final answer, in JSON when the prompt
+    carries an expected output schema.
+    """
+    if schema is not None:
+        return json.dumps(schema_instance(schema))
+    embedded = schema_in_text(prompt)
+    final = json.dumps(schema_instance(embedded)) if embedded else PLAIN_ANSWER
+    return f"Thought: I now know the final answer\nFinal Answer: {final}"
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _chunks(text: str) -> list:
+    return [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)] or ['']
+
+
+def _sse(events) -> Response:
+    return Response((f"data: {event}\n\n" for event in events), mimetype='text/event-stream')
+
+
+def _openai_text(content) -> str:
+    if isinstance(content, list):
+        return '\n'.join(part.get('text', '') for part in content if isinstance(part, dict))
+    return content or ''
+
+
+def forced_openai_tool(body: dict) -> Optional[dict]:
+    """The function an OpenAI request forces through tool_choice, if any."""
+    choice = body.get('tool_choice')
+    functions = [tool.get('function', {}) for tool in body.get('tools') or [] if tool.get('type') == 'function']
+    if isinstance(choice, dict):
+        name = (choice.get('function') or {}).get('name')
+        return next((function for function in functions if function.get('name') == name), None)
+    if choice == 'required' and functions:
+        return functions[0]
+    return None
+
+
+def forced_gemini_function(body: dict) -> Optional[dict]:
+    """The function a Gemini request forces through function calling mode ANY, if any."""
+    config = (body.get('toolConfig') or {}).get('functionCallingConfig') or {}
+    if str(config.get('mode', '')).upper() != 'ANY':
+        return None
+    functions = [
+        declaration
+        for tool in body.get('tools') or []
+        for declaration in tool.get('functionDeclarations') or []
+    ]
+    allowed = config.get('allowedFunctionNames')
+    return next((function for function in functions if not allowed or function.get('name') in allowed), None)
+
+
+def llm_blueprint() -> Blueprint:
+    """OpenAI chat completions at /v1/chat/completions and Gemini generateContent at /v1beta/models/."""
+    blueprint = Blueprint('llm', __name__)
+
+    @blueprint.route('/v1/chat/completions', methods=['POST'])
+    def chat_completions():
+        body = request.get_json(silent=True) or {}
+        prompt = '\n'.join(_openai_text(message.get('content')) for message in body.get('messages', []))
+        function = forced_openai_tool(body)
+        if function is not None:
+            content = None
+            arguments = json.dumps(schema_instance(function.get('parameters') or {}))
+            tool_calls = [{
+                'id': f"call_{uuid.uuid4().hex[:24]}",
+                'type': 'function',
+                'function': {'name': function.get('name'), 'arguments': arguments},
+            }]
+        else:
+            content = answer(prompt, _unwrap_schema(body.get('response_format')))
+            tool_calls = None
+        output = content or tool_calls[0]['function']['arguments']
+        finish_reason = 'tool_calls' if tool_calls else 'stop'
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get('model', 'stand-in')
+        usage = {
+            'prompt_tokens': _tokens(prompt),
+            'completion_tokens': _tokens(output),
+            'total_tokens': _tokens(prompt) + _tokens(output),
+        }
+
+        if not body.get('stream'):
+            return jsonify({
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': created,
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content, **({'tool_calls': tool_calls} if tool_calls else {})},
+                    'finish_reason': finish_reason,
+                }],
+                'usage': usage,
+            })
+
+        def events():
+            base = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': model}
+            yield json.dumps({**base, 'choices': [{'index': 0, 'delta': {'role': 'assistant', 'content': ''}, 'finish_reason': None}]})
+            if tool_calls:
+                delta = {'tool_calls': [{'index': 0, **tool_calls[0]}]}
+                yield json.dumps({**base, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}]})
+            else:
+                for chunk in _chunks(content):
+                    yield json.dumps({**base, 'choices': [{'index': 0, 'delta': {'content': chunk}, 'finish_reason': None}]})
+            yield json.dumps({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': finish_reason}]})
+            if (body.get('stream_options') or {}).get('include_usage'):
+                yield json.dumps({**base, 'choices': [], 'usage': usage})
+            yield '[DONE]'
+
+        return _sse(events())
+
+    @blueprint.route('/<version>/models/<path:target>', methods=['POST'])
+    def generate_content(version, target):
+        model, _, method = target.rpartition(':')
+        if method not in ('generateContent', 'streamGenerateContent'):
+            return jsonify({'error': {'code': 404, 'message': f"Unknown method: {method}", 'status': 'NOT_FOUND'}}), 404
+        body = request.get_json(silent=True) or {}
+        texts = [part.get('text', '') for part in (body.get('systemInstruction') or {}).get('parts', [])]
+        for content in body.get('contents', []):
+            texts.extend(part.get('text', '') for part in content.get('parts', []))
+        prompt = '\n'.join(texts)
+        config = body.get('generationConfig') or {}
+        schema = config.get('responseJsonSchema') or config.get('responseSchema')
+        function = forced_gemini_function(body)
+        if function is not None:
+            args = schema_instance(function.get('parametersJsonSchema') or function.get('parameters') or {})
+            content = json.dumps(args)
+        else:
+            content = answer(prompt, schema if isinstance(schema, dict) else None)
+        usage = {
+            'promptTokenCount': _tokens(prompt),
+            'candidatesTokenCount': _tokens(content),
+            'totalTokenCount': _tokens(prompt) + _tokens(content),
+        }
+
+        def response(text: str, finished: bool) -> dict:
+            part = {'functionCall': {'name': function['name'], 'args': args}} if function is not None else {'text': text}
+            candidate = {'content': {'role': 'model', 'parts': [part]}, 'index': 0}
+            if finished:
+                candidate['finishReason'] = 'STOP'
+            return {'candidates': [candidate], 'usageMetadata': usage, 'modelVersion': model}
+
+        if method == 'generateContent':
+            return jsonify(response(content, True))
+        chunks = _chunks(content) if function is None else [content]
+        return _sse(json.dumps(response(chunk, i == len(chunks) - 1)) for i, chunk in enumerate(chunks))
+
+    return blueprint
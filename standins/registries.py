@@ -0,0 +1,203 @@
+"""
+Registry Stand-ins
+NPPES, NABP e-Profile and Propelus endpoints answering from a local dataset or synthetic records.
+"""
+import json
+import zlib
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+
+from flask import Blueprint, jsonify, request
+
+# First NPI of the synthetic dataset; NPI n is active unless n % 20 says otherwise
+FIRST_NPI = 1000000000
+
+# Most results one NPPES search returns
+NPPES_MAX_LIMIT = 200
+
+
+def synthetic_npi_record(number: int) -> dict:
+    """NPPES result of a synthetic provider."""
+    return {
+        'number': number,
+        'enumeration_type': 'NPI-1',
+        'basic': {
+            'first_name': f'PROVIDER{number % 1000}',
+            'last_name': f'TEST{number // 1000 % 1000}',
+            'status': 'A' if number % 20 != 1 else 'D',
+        },
+        'taxonomies': [{'code': '207Q00000X', 'desc': 'Family Medicine', 'primary': True, 'state': 'CA', 'license': f'A{number % 100000}'}],
+        'addresses': [{'address_purpose': 'LOCATION', 'address_1': f'{number % 9000} MAIN ST', 'city': 'LOS ANGELES', 'state': 'CA', 'postal_code': '900010000'}],
+    }
+
+
+def _stable_hash(*parts) -> int:
+    return zlib.crc32('|'.join(str(part or '').strip().upper() for part in parts).encode('utf-8'))
+
+
+def _name_matches(pattern: Optional[str], value: Optional[str]) -> bool:
+    """NPPES name match: case-insensitive, with a trailing '*' as prefix wildcard."""
+    if not pattern:
+        return True
+    pattern, value = pattern.strip().upper(), (value or '').upper()
+    if pattern.endswith('*'):
+        return value.startswith(pattern[:-1])
+    return value == pattern
+
+
+class NPPESDataset:
+    """
+    Provider records served by the NPPES stand-in.
+
+    Loaded from a JSON file holding a list of NPPES results, a saved NPPES
+    response ({"results": [...]}) or one result per line. Without a file,
+    every NPI resolves to synthetic_npi_record (n % 20 == 2 not found) and
+    a name search returns one active provider of that name and state.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self.records = []
+        if self.path:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            try:
+                loaded = json.loads(text)
+                self.records = loaded.get('results', []) if isinstance(loaded, dict) else loaded
+            except ValueError:
+                self.records = [json.loads(line) for line in text.splitlines() if line.strip()]
+        self._by_number = {str(record.get('number')): record for record in self.records}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def by_number(self, number: str) -> list:
+        if self.path:
+            record = self._by_number.get(number)
+            return [record] if record else []
+        if not number.isdigit() or int(number) % 20 == 2:
+            return []
+        return [synthetic_npi_record(int(number))]
+
+    def search(self, first_name: Optional[str], last_name: Optional[str], state: Optional[str]) -> list:
+        if self.path:
+            return [
+                record for record in self.records
+                if _name_matches(first_name, record.get('basic', {}).get('first_name'))
+                and _name_matches(last_name, record.get('basic', {}).get('last_name'))
+                and (not state or any(
+                    (address.get('state') or '').upper() == state.upper()
+                    for address in record.get('addresses', [])
+                ))
+            ]
+        number = FIRST_NPI + _stable_hash(first_name, last_name, state) % 10**8
+        record = synthetic_npi_record(number - number % 20)
+        record['basic'].update({
+            'first_name': (first_name or '').rstrip('*').upper(),
+            'last_name': (last_name or '').rstrip('*').upper(),
+        })
+        if state:
+            record['addresses'][0]['state'] = record['taxonomies'][0]['state'] = state.upper()
+        return [record]
+
+
+def nppes_blueprint(dataset: NPPESDataset) -> Blueprint:
+    """NPPES registry API, version 2.1, at /api/."""
+    blueprint = Blueprint('nppes', __name__)
+
+    @blueprint.route('/api/', methods=['GET'])
+    def nppes_api():
+        args = request.args
+        if args.get('version') != '2.1':
+            return jsonify({'Errors': [{'description': 'Unsupported API version', 'field': 'version', 'number': '04'}]})
+        try:
+            limit = min(int(args.get('limit', 10)), NPPES_MAX_LIMIT)
+            skip = int(args.get('skip', 0))
+        except ValueError:
+            return jsonify({'Errors': [{'description': 'Field limit/skip must be a number', 'field': 'limit', 'number': '07'}]})
+
+        if args.get('number'):
+            results = dataset.by_number(args['number'].strip())
+        elif args.get('first_name') or args.get('last_name'):
+            results = dataset.search(args.get('first_name'), args.get('last_name'), args.get('state'))
+        else:
+            return jsonify({'Errors': [{'description': 'No valid search criteria provided', 'field': 'generic', 'number': '01'}]})
+        results = results[skip:skip + limit]
+        return jsonify({'result_count': len(results), 'results': results})
+
+    return blueprint
+
+
+def _license_outcome(*identity) -> tuple:
+    """
+    Deterministic license outcome of an identity: (found, active, expiration date).
+
+    One in twenty identities is unknown and one in twenty expired; the
+    others expire between 10 days and two years from today.
+    """
+    h = _stable_hash(*identity)
+    if h % 20 == 2:
+        return False, False, None
+    if h % 20 == 1:
+        return True, False, date.today() - timedelta(days=h % 365 + 1)
+    return True, True, date.today() + timedelta(days=h % 720 + 10)
+
+
+def nabp_blueprint() -> Blueprint:
+    """NABP e-Profile validation at /v2/Individual/eprofile/validate."""
+    blueprint = Blueprint('nabp', __name__)
+
+    @blueprint.route('/v2/Individual/eprofile/validate', methods=['POST'])
+    def nabp_validate():
+        payload = request.get_json(silent=True) or {}
+        first_name, last_name = payload.get('firstName'), payload.get('lastName')
+        license_number, state = payload.get('licenseNumber'), payload.get('state')
+        if not any((first_name, last_name, license_number, state)):
+            return jsonify({'error': 'At least one identifying field is required.'}), 400
+
+        found, active, expiration = _license_outcome('nabp', license_number or f'{first_name} {last_name}', state)
+        if not found:
+            return jsonify({'valid': False, 'status': 'NOT_FOUND', 'message': 'No e-Profile matches the given pharmacist.'})
+        e_profile_id = str(_stable_hash('eprofile', license_number, first_name, last_name) % 10**7).zfill(7)
+        return jsonify({
+            'valid': active,
+            'status': 'VALIDATED' if active else 'EXPIRED',
+            'message': None if active else 'License expired.',
+            'license': {
+                'number': license_number,
+                'state': (state or '').upper() or None,
+                'status': 'Active' if active else 'Expired',
+                'expiration_date': expiration.isoformat(),
+            },
+            'profile': {'e_profile_id': e_profile_id, 'first_name': first_name, 'last_name': last_name},
+        })
+
+    return blueprint
+
+
+def propelus_blueprint() -> Blueprint:
+    """Propelus license verification at /v1/license/verify."""
+    blueprint = Blueprint('propelus', __name__)
+
+    @blueprint.route('/v1/license/verify', methods=['POST'])
+    def propelus_verify():
+        payload = request.get_json(silent=True) or {}
+        license_number, state = payload.get('license_number'), payload.get('state')
+        if not license_number or not state:
+            return jsonify({'error': 'license_number and state are required.'}), 400
+
+        found, active, expiration = _license_outcome('propelus', license_number, state)
+        if not found or not active:
+            reason = 'License not found' if not found else 'License expired'
+            return jsonify({'verified': False, 'reason': reason})
+        return jsonify({
+            'verified': True,
+            'status': 'Active',
+            'board': f"{state.upper()} Board of Medicine",
+            'issue_date': (expiration - timedelta(days=730)).isoformat(),
+            'expiration_date': expiration.isoformat(),
+            'disciplinary_actions': [],
+        })
+
+    return blueprint
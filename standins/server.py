@@ -0,0 +1,157 @@
+"""
+Stand-in Server
+Serves all upstream stand-ins from one local port, each with its own fault profile.
+
+    python -m standins.server [--port 8900] [--latency nppes=lognormal:0.3,0.5] [--rate-429 llm=0.1]
+"""
+import argparse
+import logging
+import threading
+from typing import Optional
+
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+
+from standins.faults import FAULT_SETTINGS, FaultProfile
+from standins.llm import llm_blueprint
+from standins.registries import NPPESDataset, nabp_blueprint, nppes_blueprint, propelus_blueprint
+
+# URL prefix of each stand-in service
+SERVICES = {
+    'nppes': '/nppes',
+    'nabp': '/nabp',
+    'propelus': '/propelus',
+    'llm': '/llm',
+}
+
+
+def env_urls(base_url: str) -> dict:
+    """Environment settings pointing the app at stand-ins served from base_url."""
+    base_url = base_url.rstrip('/')
+    return {
+        'NPI_BASE_URL': f"{base_url}/nppes/api/",
+        'NABP_BASE_URL': f"{base_url}/nabp/v2/Individual/eprofile/validate",
+        'PROPELUS_BASE_URL': f"{base_url}/propelus/v1/license/verify",
+        # Native Gemini client (GEMINI_MODEL=gemini/...)
+        'GOOGLE_GEMINI_BASE_URL': f"{base_url}/llm",
+        # OpenAI-compatible client (GEMINI_MODEL=openai/<any name>)
+        'OPENAI_BASE_URL': f"{base_url}/llm/v1",
+    }
+
+
+def create_app(faults: Optional[dict] = None, dataset: Optional[NPPESDataset] = None) -> Flask:
+    """
+    Args:
+        faults: FaultProfile per service name (missing services get none)
+        dataset: Records of the NPPES stand-in (defaults to synthetic ones)
+
+    Returns:
+        Flask app serving every stand-in under its SERVICES prefix, plus
+        GET /_standins (settings and counters) and PUT
+        /_standins/faults/<service> (change settings while running)
+    """
+    faults = {service: (faults or {}).get(service) or FaultProfile() for service in SERVICES}
+    blueprints = {
+        'nppes': nppes_blueprint(dataset or NPPESDataset()),
+        'nabp': nabp_blueprint(),
+        'propelus': propelus_blueprint(),
+        'llm': llm_blueprint(),
+    }
+    app = Flask(__name__)
+    app.config['STANDIN_FAULTS'] = faults
+    for service, blueprint in blueprints.items():
+        blueprint.before_request(faults[service].inject)
+        app.register_blueprint(blueprint, url_prefix=SERVICES[service])
+
+    @app.route('/_standins', methods=['GET'])
+    def standins_status():
+        return jsonify({
+            'services': {
+                service: {'settings': profile.settings(), 'stats': profile.stats()}
+                for service, profile in faults.items()
+            },
+            'env': env_urls(request.host_url),
+        })
+
+    @app.route('/_standins/faults/<service>', methods=['PUT'])
+    def update_faults(service):
+        if service not in faults:
+            return jsonify({'error': f"Unknown service: {service}"}), 404
+        try:
+            faults[service].update(**(request.get_json(silent=True) or {}))
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(faults[service].settings())
+
+    return app
+
+
+def serve_in_background(app: Flask, host: str = '127.0.0.1', port: int = 0):
+    """
+    Serve app from a daemon thread (port 0 picks a free port).
+
+    Returns:
+        (server, base_url); call server.shutdown() to stop it
+    """
+    server = make_server(host, port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='standins', daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def _service_values(values: list, option: str) -> dict:
+    """Parse repeated SERVICE=VALUE options; service "all" sets every service."""
+    parsed = {}
+    for value in values or []:
+        service, sep, setting = value.partition('=')
+        if not sep or (service not in SERVICES and service != 'all'):
+            raise argparse.ArgumentTypeError(f"--{option} expects SERVICE=VALUE with SERVICE one of all, {', '.join(SERVICES)}")
+        for target in (SERVICES if service == 'all' else [service]):
+            parsed[target] = setting
+    return parsed
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--nppes-dataset', help='JSON/JSONL file of NPPES results (defaults to synthetic records)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the latency and fault draws')
+    parser.add_argument('--quiet', action='store_true', help='Do not log every request')
+    for setting in FAULT_SETTINGS:
+        option = setting.replace('_', '-')
+        parser.add_argument(f'--{option}', action='append', metavar='SERVICE=VALUE',
+                            help=f"Fault setting {setting} of a service (repeatable)")
+    args = parser.parse_args(argv)
+    try:
+        args.faults = {
+            setting: _service_values(getattr(args, setting), setting.replace('_', '-'))
+            for setting in FAULT_SETTINGS
+        }
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    faults = {}
+    for service in SERVICES:
+        settings = {setting: values[service] for setting, values in args.faults.items() if service in values}
+        faults[service] = FaultProfile(seed=args.seed, **settings)
+    dataset = NPPESDataset(args.nppes_dataset)
+    if args.quiet:
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    app = create_app(faults, dataset)
+    base_url = f"http://{args.host}:{args.port}"
+    print(f"Stand-ins on {base_url} (NPPES: {f'{len(dataset)} records' if args.nppes_dataset else 'synthetic'})")
+    for service, profile in faults.items():
+        print(f"  {service:<9} {profile.settings()}")
+    print("Point the app at them with:")
+    for name, url in env_urls(base_url).items():
+        print(f"  export {name}={url}")
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
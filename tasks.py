@@ -2,87 +2,162 @@
 Task Definitions
 Defines all tasks for the healthcare provider validation workflow.
 """
+from typing import NamedTuple
 
 from crewai import Task
 from config import Config
-from agents import (
-    validation_agent,
-    enrichment_agent,
-    quality_assurance_agent,
-    report_maker_agent
-)
+from agents import ProviderAgents
 from utils import get_logger
+from validation_models import EnrichmentBatch, EnrichmentFindings, QABatch, QAFindings, ValidationFindings
 
 logger = get_logger(__name__)
 
 # Ensure reports directory exists
 Config.REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
-# Task 1: Provider Validation
-validation_task = Task(
-    description=(
-        "Validate healthcare provider: {provider_name} in state: {state}.\n\n"
-        "If the provider cannot be found in any verification system, respond only with:\n"
-        "'NO_USER_FOUND'\n\n"
-        "Otherwise perform verification steps:\n"
-        "1. Search NPI Registry\n"
-        "2. If pharmacist, validate NABP\n"
-        "3. Verify credentials through Propelus ONLY IF a valid license number exists and is at least 3 characters long.\n"
-        "   If license number is missing or shorter than 3 characters, skip Propelus verification and continue.\n"
-        "4. Cross-reference all sources\n"
-        "5. Document discrepancies and results\n\n"
-        "IMPORTANT: Never attempt to call Propelus with an empty or invalid license number. Instead state:\n"
-        "'Propelus verification skipped: No valid license number available.'"
-    ),
-    expected_output=(
-        "Structured validation report OR 'NO_USER_FOUND'"
-    ),
-    agent=validation_agent
-)
-
-# Task 2: Data Enrichment
-enrichment_task = Task(
-    description=(
-        "Review validation findings for provider: {provider_name}.\n"
-        "If result was NO_USER_FOUND, return NO_USER_FOUND.\n"
-        "Otherwise perform enrichment:\n"
-        "1. Assess completeness\n"
-        "2. Identify missing info\n"
-        "3. Flag inconsistencies\n"
-    ),
-    expected_output="Enrichment results OR NO_USER_FOUND",
-    agent=enrichment_agent,
-    context=[validation_task]
-)
-
-# Task 3: Quality Assurance Review
-qa_task = Task(
-    description=(
-        "Conduct quality assurance review.\n"
-        "If earlier result equals NO_USER_FOUND, return NO_USER_FOUND.\n"
-    ),
-    expected_output="QA report OR NO_USER_FOUND",
-    agent=quality_assurance_agent,
-    context=[validation_task, enrichment_task]
-)
-
-# Task 4: Report Generation
-report_task = Task(
-    description=(
-        "Generate final provider validation report.\n"
-        "If the input context contains NO_USER_FOUND, return NO_USER_FOUND and do not generate report.\n"
-        "If Propelus verification was skipped due to missing license number, mark it clearly in the report.\n"
-        "Include sections for:\n"
-        "1. Provider Information\n"
-        "2. Overall Validation Status\n"
-        "3. Detailed Validation Findings\n"
-        "4. Compliance Status\n"
-        "5. Recommendations & Required Actions\n"
-    ),
-    expected_output="Markdown report output OR NO_USER_FOUND",
-    agent=report_maker_agent,
-    context=[validation_task, enrichment_task, qa_task],
-    output_file=str(Config.REPORTS_DIR / "provider_validation_report.md")
-)
-
-logger.info("All tasks defined successfully")
+
+class ProviderTasks(NamedTuple):
+    """The tasks of one provider validation crew, in execution order."""
+    validation: Task
+    enrichment: Task
+    qa: Task
+
+
+class BatchTasks(NamedTuple):
+    """Enrichment and QA tasks covering several providers in one prompt."""
+    enrichment: Task
+    qa: Task
+
+
+def create_tasks(agents: ProviderAgents, qa_after_enrichment: bool = True) -> ProviderTasks:
+    """
+    Build a fresh set of tasks bound to the given agents.
+
+    Every task returns a structured (pydantic) result; the report itself is
+    rendered from those results by report_renderer, not by an agent.
+    
+    Args:
+        agents: Agents created by create_agents() for the same crew
+        qa_after_enrichment: Give QA the enrichment output as context; when
+            False QA depends on validation only and can run alongside enrichment
+        
+    Returns:
+        ProviderTasks for one crew
+    """
+    # Task 1: Provider Validation
+    validation_task = Task(
+        name="provider_validation",
+        description=(
+            "Validate healthcare provider: {provider_name} in state: {state}.\n\n"
+            "If the provider cannot be found in any verification system, set provider_found "
+            "to false and explain in the summary (this is the NO_USER_FOUND result).\n\n"
+            "Otherwise perform verification steps:\n"
+            "1. Search NPI Registry\n"
+            "2. If pharmacist, validate NABP\n"
+            "3. Verify credentials through Propelus ONLY IF a valid license number exists and is at least 3 characters long.\n"
+            "   If license number is missing or shorter than 3 characters, skip Propelus verification and continue.\n"
+            "4. Cross-reference all sources\n"
+            "5. Document discrepancies and results\n\n"
+            "IMPORTANT: Never attempt to call Propelus with an empty or invalid license number. Instead set propelus_status to:\n"
+            "'Propelus verification skipped: No valid license number available.'"
+        ),
+        expected_output=(
+            "Validation findings: provider_found, registry identifiers and statuses, "
+            "sources checked, discrepancies and a short summary"
+        ),
+        agent=agents.validation,
+        output_pydantic=ValidationFindings
+    )
+
+    # Task 2: Data Enrichment
+    enrichment_task = Task(
+        name="data_enrichment",
+        description=(
+            "Review validation findings for provider: {provider_name}.\n"
+            "Perform enrichment:\n"
+            "1. Assess completeness (score 0-100)\n"
+            "2. Identify missing info\n"
+            "3. Flag inconsistencies\n"
+            "4. Recommend additional verification where needed\n"
+        ),
+        expected_output="Enrichment findings: completeness score, missing fields, inconsistencies, recommendations",
+        agent=agents.enrichment,
+        context=[validation_task],
+        output_pydantic=EnrichmentFindings
+    )
+
+    # Task 3: Quality Assurance Review
+    qa_task = Task(
+        name="quality_assurance",
+        description=(
+            "Conduct quality assurance review of the validation findings for provider: {provider_name}.\n"
+            "Set compliance_status to COMPLIANT, NEEDS_REVIEW or NON_COMPLIANT.\n"
+            "Set is_sanctioned to true only if a sanction, exclusion or disciplinary action was found, "
+            "and list them under sanctions.\n"
+            "List any other issues and the actions required before approval.\n"
+        ),
+        expected_output="QA findings: compliance status, sanction flag, issues, required actions and a short summary",
+        agent=agents.quality_assurance,
+        context=[validation_task, enrichment_task] if qa_after_enrichment else [validation_task],
+        output_pydantic=QAFindings
+    )
+
+    return ProviderTasks(
+        validation=validation_task,
+        enrichment=enrichment_task,
+        qa=qa_task
+    )
+
+
+def create_batch_tasks(agents: ProviderAgents) -> BatchTasks:
+    """
+    Build enrichment and QA tasks that review several providers at once.
+
+    The providers' validation findings are passed in the {providers} input,
+    each under its own provider_key, so one LLM call (and one copy of the
+    agent's role, goal and backstory) covers the whole batch. Both tasks
+    depend on validation only and can run concurrently.
+
+    Args:
+        agents: Agents created by create_agents(); only enrichment and QA are used
+
+    Returns:
+        BatchTasks for one batch
+    """
+    enrichment_task = Task(
+        name="data_enrichment_batch",
+        description=(
+            "Review the validation findings of each provider below.\n"
+            "Perform enrichment for every provider separately:\n"
+            "1. Assess completeness (score 0-100)\n"
+            "2. Identify missing info\n"
+            "3. Flag inconsistencies\n"
+            "4. Recommend additional verification where needed\n\n"
+            "Return exactly one entry per provider, with its provider_key copied unchanged. "
+            "Never mix up findings between providers.\n\n"
+            "Providers:\n{providers}"
+        ),
+        expected_output="One enrichment entry per provider_key: completeness score, missing fields, inconsistencies, recommendations",
+        agent=agents.enrichment,
+        output_pydantic=EnrichmentBatch
+    )
+
+    qa_task = Task(
+        name="quality_assurance_batch",
+        description=(
+            "Conduct a quality assurance review of the validation findings of each provider below.\n"
+            "For every provider separately:\n"
+            "Set compliance_status to COMPLIANT, NEEDS_REVIEW or NON_COMPLIANT.\n"
+            "Set is_sanctioned to true only if a sanction, exclusion or disciplinary action was found "
+            "for that provider, and list them under sanctions.\n"
+            "List any other issues and the actions required before approval.\n\n"
+            "Return exactly one entry per provider, with its provider_key copied unchanged. "
+            "Never mix up findings between providers.\n\n"
+            "Providers:\n{providers}"
+        ),
+        expected_output="One QA entry per provider_key: compliance status, sanction flag, issues, required actions and a short summary",
+        agent=agents.quality_assurance,
+        output_pydantic=QABatch
+    )
+
+    return BatchTasks(enrichment=enrichment_task, qa=qa_task)
@@ -0,0 +1,22 @@
+"""
+Test Setup
+Environment for importing the application modules offline, without shared state files.
+"""
+import os
+import sys
+from pathlib import Path
+
+# Settings the modules read at import: no live LLM key, no warm-up threads
+# and no cross-process stores written to the working directory
+for _name, _value in {
+    'GEMINI_API_KEY': 'test',
+    'AI_WARMUP_ENABLED': 'false',
+    'RATE_LIMIT_DB': 'memory',
+    'RESULTS_DB': 'memory',
+    'AI_JOBS_DB': 'memory',
+    'PRECHECK_ENABLED': 'false',
+    'AI_CACHE_ENABLED': 'false',
+}.items():
+    os.environ.setdefault(_name, _value)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
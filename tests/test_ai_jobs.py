@@ -0,0 +1,130 @@
+"""
+AI Job Tests
+Deduplication, leases, cancellation and events, within one manager and across managers sharing a store.
+"""
+import threading
+import time
+
+import pytest
+
+import ai_jobs
+from ai_jobs import AIJobManager, current_cancel_event, report_progress
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(ai_jobs, 'POLL_SECONDS', 0.02)
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def until_cancelled(started: threading.Event):
+    started.set()
+    cancel = current_cancel_event()
+    report_progress('stage', message='working')
+    while not cancel.wait(0.01):
+        pass
+    return {'partial': True}
+
+
+@pytest.fixture
+def managers(tmp_path):
+    """Two managers on one store, standing in for two worker processes."""
+    path = str(tmp_path / 'ai_jobs.db')
+    first, second = AIJobManager(path, max_workers=1), AIJobManager(path, max_workers=1)
+    yield first, second
+    first.shutdown()
+    second.shutdown()
+
+
+def test_identical_requests_share_a_job_until_every_lease_is_released():
+    manager = AIJobManager(max_workers=1)
+    started = threading.Event()
+    first = manager.submit(until_cancelled, started, key=('validate', 'x'))
+    second = manager.submit(until_cancelled, started, key=('validate', 'x'))
+    assert first['id'] == second['id'] and first['lease'] != second['lease']
+    assert manager.requesters(first['id']) == 2
+
+    assert started.wait(5)
+    assert manager.release(first['id'], first['lease']) is False
+    assert manager.release(first['id'], second['lease']) is True
+    wait_for(lambda: manager.get(first['id'])['status'] == 'done')
+    assert manager.get(first['id'])['result'] == {'partial': True}
+    # A finished job is not handed to new requests
+    assert manager.submit(lambda: 1, key=('validate', 'x'))['id'] != first['id']
+    manager.shutdown()
+
+
+def test_events_end_with_the_result():
+    manager = AIJobManager(max_workers=1)
+    job = manager.submit(lambda: {'ok': True})
+    events = []
+    while not events or events[-1]['type'] != 'done':
+        events += manager.wait_events(job['id'], after=len(events), timeout=5)
+    assert [event['type'] for event in events] == ['running', 'done']
+    assert events[-1]['data'] == {'result': {'ok': True}}
+    assert manager.wait_events('missing') is None
+    manager.shutdown()
+
+
+def test_finished_jobs_are_evicted_beyond_max_jobs():
+    manager = AIJobManager(max_workers=1, max_jobs=2)
+    jobs = [manager.submit(lambda: 1) for _ in range(2)]
+    wait_for(lambda: all(manager.get(job['id'])['status'] == 'done' for job in jobs))
+    manager.submit(lambda: 1)
+    assert manager.get(jobs[0]['id']) is None
+    assert manager.get(jobs[1]['id']) is not None
+    manager.shutdown()
+
+
+def test_jobs_are_deduplicated_and_followed_across_managers(managers):
+    first, second = managers
+    started = threading.Event()
+    job = first.submit(until_cancelled, started, key=('search', 'x'))
+    assert started.wait(5)
+
+    duplicate = second.submit(until_cancelled, started, key=('search', 'x'))
+    assert duplicate['id'] == job['id']
+    assert second.requesters(job['id']) == 2
+    events = second.wait_events(job['id'], timeout=5)
+    assert [event['type'] for event in events][:2] == ['running', 'stage']
+
+
+def test_cancel_from_another_manager_reaches_the_running_job(managers):
+    first, second = managers
+    started = threading.Event()
+    job = first.submit(until_cancelled, started)
+    assert started.wait(5)
+
+    assert second.release(job['id'], job['lease']) is True
+    wait_for(lambda: second.get(job['id'])['status'] == 'done')
+    assert second.get(job['id'])['result'] == {'partial': True}
+
+
+def test_watchers_are_shared_across_managers(managers):
+    first, second = managers
+    started = threading.Event()
+    job = first.submit(until_cancelled, started)
+    first.watch(job['id'], job['lease'])
+    # The stream reconnects to the other worker before the grace period ends
+    second.watch(job['id'], job['lease'])
+    assert first.unwatch(job['id'], job['lease'], release_after=0.05) == 1
+    time.sleep(0.2)
+    assert second.get(job['id'])['status'] in ('queued', 'running')
+    assert second.unwatch(job['id'], job['lease'], release_after=0.05) == 0
+    wait_for(lambda: second.get(job['id'])['status'] == 'done')
+
+
+def test_jobs_of_an_exited_process_are_failed(managers, monkeypatch):
+    first, second = managers
+    job = first.submit(lambda: time.sleep(0.2))
+    monkeypatch.setattr(ai_jobs, '_process_alive', lambda pid: False)
+    with second._transaction() as conn:
+        conn.execute("UPDATE jobs SET owner_pid = -1 WHERE id = ?", (job['id'],))
+    snapshot = second.get(job['id'])
+    assert snapshot['status'] == 'error' and 'exited' in snapshot['error']
@@ -0,0 +1,100 @@
+"""
+Analysis Batcher Tests
+Batch formation, results per run, and runs giving up through their deadline or cancel flag.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import analysis_batcher
+from analysis_batcher import AnalysisBatcher
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(analysis_batcher, 'WAIT_POLL_SECONDS', 0.02)
+
+
+def test_full_batch_runs_once_and_returns_each_result():
+    batches = []
+
+    def run_batch(payloads, cancelled):
+        batches.append(dict(payloads))
+        return {key: payload * 10 for key, payload in payloads.items()}
+
+    batcher = AnalysisBatcher(run_batch, max_batch_size=3, max_wait_seconds=30)
+    with ThreadPoolExecutor(3) as pool:
+        results = list(pool.map(batcher.submit, [1, 2, 3]))
+    assert results == [10, 20, 30]
+    assert len(batches) == 1 and batcher.batches_run == 1
+
+
+def test_partial_batch_runs_after_max_wait():
+    batcher = AnalysisBatcher(lambda payloads, cancelled: {k: 'ok' for k in payloads}, max_batch_size=5, max_wait_seconds=0.05)
+    assert batcher.submit('x') == 'ok'
+
+
+def test_missing_or_failed_results_fall_back_to_none():
+    batcher = AnalysisBatcher(lambda payloads, cancelled: {}, max_batch_size=1)
+    assert batcher.submit('x') is None
+
+    def fail(payloads, cancelled):
+        raise RuntimeError("LLM down")
+
+    assert AnalysisBatcher(fail, max_batch_size=1).submit('x') is None
+
+
+def test_run_gives_up_at_its_deadline_while_waiting_for_a_batch():
+    batcher = AnalysisBatcher(lambda payloads, cancelled: {}, max_batch_size=5, max_wait_seconds=30)
+    started = time.monotonic()
+    assert batcher.submit('x', deadline=started + 0.1) is None
+    assert time.monotonic() - started < 2
+    # The abandoned run left the pending batch
+    assert batcher._pending == []
+
+
+def test_cancelled_run_stops_waiting_for_a_running_batch():
+    release = threading.Event()
+
+    def run_batch(payloads, cancelled):
+        release.wait(5)
+        return {key: 'late' for key in payloads}
+
+    batcher = AnalysisBatcher(run_batch, max_batch_size=2, max_wait_seconds=30)
+    cancel = threading.Event()
+    with ThreadPoolExecutor(2) as pool:
+        waiter = pool.submit(batcher.submit, 'a', None, cancel)
+        time.sleep(0.05)
+        # The second run fills the batch and runs it on its own thread
+        runner = pool.submit(batcher.submit, 'b')
+        time.sleep(0.1)
+        cancel.set()
+        # The cancelled run returns while the batch is still running for the other one
+        assert waiter.result(timeout=2) is None
+        release.set()
+        assert runner.result(timeout=5) == 'late'
+
+
+def test_batch_is_flagged_cancelled_only_once_every_run_gave_up():
+    flags = []
+    proceed = threading.Event()
+
+    def run_batch(payloads, cancelled):
+        flags.append(cancelled)
+        proceed.wait(5)
+        return {}
+
+    batcher = AnalysisBatcher(run_batch, max_batch_size=2, max_wait_seconds=30)
+    first, second = threading.Event(), threading.Event()
+    with ThreadPoolExecutor(2) as pool:
+        runs = [pool.submit(batcher.submit, 'a', None, first), pool.submit(batcher.submit, 'b', None, second)]
+        while not flags:
+            time.sleep(0.01)
+        first.set()
+        assert not flags[0].is_set()
+        second.set()
+        assert flags[0].is_set()
+        proceed.set()
+        assert [run.result(timeout=2) for run in runs] == [None, None]
@@ -0,0 +1,62 @@
+"""
+Web App Tests
+Batch request parsing and the results API.
+"""
+import io
+import sqlite3
+
+import pytest
+
+import finalapp
+from finalapp import parse_batch_npis
+
+
+@pytest.mark.parametrize('body, content_type', [
+    ('["1234567893", " 1234567894 "]', 'application/json'),
+    ('[{"npi": "1234567893"}, {"npi": 1234567894}]', 'application/json'),
+    ('{"npis": ["1234567893", "1234567894"]}', 'application/json'),
+    ('"1234567893"\n\n{"npi": "1234567894"}\n', 'application/x-ndjson'),
+    ('"1234567893"\n"1234567894"', 'application/jsonlines'),
+])
+def test_parse_batch_npis_formats(body, content_type):
+    assert parse_batch_npis(body.encode('utf-8'), content_type) == ['1234567893', '1234567894']
+
+
+def test_parse_batch_npis_empty_body():
+    assert parse_batch_npis(b'  \n', 'application/json') == []
+    assert parse_batch_npis(b'{"other": 1}', 'application/json') == []
+
+
+@pytest.mark.parametrize('body', [b'"1234567893"', b'not json'])
+def test_parse_batch_npis_rejects_other_bodies(body):
+    with pytest.raises(ValueError):
+        parse_batch_npis(body, 'application/json')
+
+
+def test_bulk_results_are_paged_by_offset(monkeypatch):
+    monkeypatch.setattr(finalapp, 'validate_npi_real', lambda npi, **kwargs: {'valid': False})
+    csv_text = 'NPI,Name\n' + ''.join(f'{1234500000 + i},Provider {i}\n' for i in range(25))
+    client = finalapp.app.test_client()
+    response = client.post('/validator', data={'csv_file': (io.BytesIO(csv_text.encode()), 'roster.csv')},
+                           content_type='multipart/form-data')
+    job_id = response.get_data(as_text=True).split('data-job-id="')[1].split('"')[0]
+
+    page = client.get(f'/api/results/{job_id}?limit=5&offset=20').get_json()
+    assert [row['npi'] for row in page['rows']] == [str(1234500020 + i) for i in range(5)]
+    assert page['total'] == 25 and page['next_cursor'] is None
+    assert client.get(f'/api/results/{job_id}?offset=-1').status_code == 400
+    assert client.get('/api/results/missing').status_code == 404
+
+
+def test_bulk_results_fall_back_to_a_download_without_the_store(monkeypatch):
+    def unavailable(rows):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(finalapp, 'validate_npi_real', lambda npi, **kwargs: {'valid': False})
+    monkeypatch.setattr(finalapp.result_store, 'create', unavailable)
+    response = finalapp.app.test_client().post(
+        '/validator', data={'csv_file': (io.BytesIO(b'NPI\n1234567893\n'), 'roster.csv')},
+        content_type='multipart/form-data'
+    )
+    assert response.headers['Content-Disposition'].startswith('attachment')
+    assert '1234567893' in response.get_data(as_text=True)
@@ -0,0 +1,41 @@
+"""
+License Cache Tests
+Expiration parsing and TTL clamping.
+"""
+from datetime import date, datetime
+
+import pytest
+
+from license_cache import license_ttl, parse_expiration
+
+NOW = datetime(2026, 3, 1, 12, 0).timestamp()
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2027-01-31', date(2027, 1, 31)),
+    ('2027-01-31T00:00:00Z', date(2027, 1, 31)),
+    ('01/31/2027', date(2027, 1, 31)),
+    ('20270131', date(2027, 1, 31)),
+    (' 2027-01-31 ', date(2027, 1, 31)),
+    ('', None),
+    (None, None),
+    ('soon', None),
+    (20270131, None),
+])
+def test_parse_expiration(value, expected):
+    assert parse_expiration(value) == expected
+
+
+def test_ttl_lasts_until_the_end_of_the_expiration_day():
+    expected = datetime(2026, 3, 3).timestamp() - NOW
+    assert license_ttl(date(2026, 3, 2), 60, 10 * 86400, now=NOW) == pytest.approx(expected)
+
+
+def test_ttl_is_clamped_to_the_ceiling():
+    assert license_ttl(date(2030, 1, 1), 60, 7 * 86400, now=NOW) == 7 * 86400
+
+
+@pytest.mark.parametrize('expiration', [None, date(2026, 3, 1), date(2025, 1, 1)])
+def test_unknown_or_expiring_licenses_get_the_floor(expiration):
+    # A license expiring today still has half a day left, which is below the floor
+    assert license_ttl(expiration, 86400, 7 * 86400, now=NOW) == 86400
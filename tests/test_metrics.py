@@ -0,0 +1,28 @@
+"""
+Metrics Tests
+Splitting a batched run's LLM usage across the runs it served.
+"""
+from metrics import MetricsRegistry, RunMetrics, _new_agent_stats
+
+
+def test_usage_share_splits_shared_usage_only():
+    batch = RunMetrics(MetricsRegistry())
+    batch._stats['enrichment'] = {
+        **_new_agent_stats(),
+        'llm_calls': 3, 'llm_seconds': 9.0, 'prompt_tokens': 1000,
+        'completion_tokens': 301, 'rpm_wait_seconds': 1.5,
+    }
+    share = batch.usage_share(3)
+    assert share == {'enrichment': {
+        'llm_seconds': 3.0, 'prompt_tokens': 333, 'completion_tokens': 100, 'rpm_wait_seconds': 0.5,
+    }}
+
+
+def test_add_usage_adds_to_the_run_without_counting_calls():
+    run = RunMetrics(MetricsRegistry())
+    usage = {'qa': {'llm_seconds': 2.0, 'prompt_tokens': 10, 'completion_tokens': 5, 'rpm_wait_seconds': 0.0}}
+    run.add_usage(usage)
+    run.add_usage(usage)
+    stats = run._stats['qa']
+    assert (stats['llm_seconds'], stats['prompt_tokens'], stats['completion_tokens']) == (4.0, 20, 10)
+    assert stats['llm_calls'] == 0
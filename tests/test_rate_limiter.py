@@ -0,0 +1,84 @@
+"""
+Rate Limiter Tests
+Token bucket acquire and charge over the in-memory and SQLite stores.
+"""
+import sqlite3
+
+import pytest
+
+import rate_limiter
+from rate_limiter import MemoryBucketStore, RateLimiter, SQLiteBucketStore
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryBucketStore()
+    return SQLiteBucketStore(str(tmp_path / 'rate_limits.db'))
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(rate_limiter.time, 'sleep', slept.append)
+    return slept
+
+
+def test_take_allows_a_burst_then_reports_the_wait(store):
+    for _ in range(3):
+        assert store.take('k', capacity=3, rate=1.0, cost=1, now=100.0) == 0
+    assert store.take('k', capacity=3, rate=1.0, cost=1, now=100.0) == pytest.approx(1.0)
+    # Two seconds later one token is back after paying off the reservation
+    assert store.take('k', capacity=3, rate=1.0, cost=1, now=102.0) == pytest.approx(0.0)
+
+
+def test_refill_is_capped_at_capacity(store):
+    store.take('k', capacity=2, rate=1.0, cost=2, now=0.0)
+    for _ in range(2):
+        assert store.take('k', capacity=2, rate=1.0, cost=1, now=1000.0) == 0
+    assert store.take('k', capacity=2, rate=1.0, cost=1, now=1000.0) == pytest.approx(1.0)
+
+
+def test_buckets_are_independent(store):
+    store.take('a', capacity=1, rate=1.0, cost=1, now=0.0)
+    assert store.take('b', capacity=1, rate=1.0, cost=1, now=0.0) == 0
+
+
+def test_sqlite_buckets_are_shared_by_stores_on_one_file(tmp_path):
+    path = str(tmp_path / 'rate_limits.db')
+    SQLiteBucketStore(path).take('k', capacity=1, rate=1.0, cost=1, now=0.0)
+    assert SQLiteBucketStore(path).take('k', capacity=1, rate=1.0, cost=1, now=0.0) == pytest.approx(1.0)
+
+
+def test_acquire_sleeps_once_the_limit_is_used(store, sleeps):
+    limiter = RateLimiter(store)
+    for _ in range(3):
+        limiter.acquire('k', limit=2, period=60.0)
+    assert sleeps == [pytest.approx(30.0, abs=0.5)]
+    assert limiter.stats()['k']['acquired'] == 3
+    assert limiter.stats()['k']['waits'] == 1
+
+
+def test_unlimited_acquire_never_touches_the_store(sleeps):
+    class FailingStore(MemoryBucketStore):
+        def take(self, *args):
+            raise AssertionError("store used")
+
+    assert RateLimiter(FailingStore()).acquire('k', limit=0) == 0
+    assert sleeps == []
+
+
+def test_charge_makes_later_zero_cost_acquires_wait(store, sleeps):
+    limiter = RateLimiter(store)
+    limiter.charge('tokens', limit=100, cost=150)
+    limiter.acquire('tokens', limit=100, cost=0)
+    assert sleeps == [pytest.approx(30.0, abs=0.5)]
+
+
+def test_unavailable_store_does_not_limit(sleeps):
+    class BrokenStore(MemoryBucketStore):
+        def take(self, *args):
+            raise sqlite3.OperationalError("database is locked")
+
+    assert RateLimiter(BrokenStore()).acquire('k', limit=1) == 0
+    assert sleeps == []
@@ -0,0 +1,107 @@
+"""
+Result Store Tests
+Cursor and offset paging, sorting, filtering, count caching and sharing between processes.
+"""
+import pytest
+
+from result_store import ResultStore, encode_cursor
+
+ROWS = [
+    {'npi': '1000000003', 'name': 'carol', 'valid': True, 'taxonomy': 'Dentist', 'location': 'Austin, TX'},
+    {'npi': '1000000001', 'name': 'Alice', 'valid': False, 'taxonomy': '', 'location': ''},
+    {'npi': '1000000002', 'name': 'bob', 'valid': True, 'taxonomy': 'Nurse', 'location': 'Boston, MA'},
+    {'npi': '1000000004', 'name': 'Bob', 'valid': False, 'taxonomy': 'Dentist', 'location': 'Dallas, TX'},
+    {'npi': '1000000005', 'name': 'alice', 'valid': True, 'taxonomy': 'Nurse', 'location': 'Austin, TX'},
+]
+
+
+@pytest.fixture(params=['memory', 'file'])
+def store(request, tmp_path):
+    path = 'memory' if request.param == 'memory' else str(tmp_path / 'results.db')
+    return ResultStore(path, max_jobs=2, max_cached_counts=3)
+
+
+def read_all(store, job_id, **kwargs):
+    npis, cursor = [], None
+    while True:
+        page = store.page(job_id, cursor=cursor, limit=2, **kwargs)
+        npis += [row['npi'] for row in page['rows']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            return npis
+
+
+def test_cursor_pages_cover_rows_in_upload_order(store):
+    job_id = store.create([dict(row) for row in ROWS])
+    assert read_all(store, job_id) == [row['npi'] for row in ROWS]
+    assert read_all(store, job_id, order='desc') == [row['npi'] for row in reversed(ROWS)]
+
+
+def test_sort_ignores_case_and_breaks_ties_by_upload_order(store):
+    job_id = store.create([dict(row) for row in ROWS])
+    assert read_all(store, job_id, sort='name') == ['1000000001', '1000000005', '1000000002', '1000000004', '1000000003']
+    assert read_all(store, job_id, sort='name', order='desc') == ['1000000003', '1000000004', '1000000002', '1000000005', '1000000001']
+    assert read_all(store, job_id, sort='valid') == ['1000000001', '1000000004', '1000000003', '1000000002', '1000000005']
+
+
+def test_status_and_query_filters(store):
+    job_id = store.create([dict(row) for row in ROWS])
+    assert read_all(store, job_id, status='valid', query='AUSTIN') == ['1000000003', '1000000005']
+    page = store.page(job_id, status='invalid', query='dentist')
+    assert [row['npi'] for row in page['rows']] == ['1000000004']
+    assert page['total'] == 1
+    assert (page['valid_count'], page['invalid_count']) == (3, 2)
+
+
+def test_offset_jumps_to_a_position(store):
+    job_id = store.create([dict(row) for row in ROWS])
+    page = store.page(job_id, offset=3, limit=1, sort='npi')
+    assert [row['npi'] for row in page['rows']] == ['1000000004']
+    assert page['offset'] == 3
+    assert store.page(job_id, offset=10)['rows'] == []
+    with pytest.raises(ValueError):
+        store.page(job_id, offset=-1)
+
+
+def test_invalid_arguments(store):
+    job_id = store.create([dict(row) for row in ROWS])
+    with pytest.raises(ValueError):
+        store.page(job_id, sort='unknown')
+    with pytest.raises(ValueError):
+        store.page(job_id, status='maybe')
+    with pytest.raises(ValueError):
+        store.page(job_id, cursor='not a cursor')
+    with pytest.raises(ValueError):
+        store.page(job_id, sort='valid', cursor=encode_cursor('alice', 1))
+    assert store.page('missing') is None
+
+
+def test_filtered_counts_keep_the_most_recent_filters(store):
+    job_id = store.create([dict(row) for row in ROWS])
+    for query in ('a', 'b', 'c', 'd'):
+        store.page(job_id, query=query)
+    # Reading 'b' again makes it the most recent, so 'c' is the next to go
+    store.page(job_id, query='b')
+    store.page(job_id, query='e')
+    with store._connection() as conn:
+        cached = {row[0] for row in conn.execute("SELECT query FROM counts WHERE job_id = ?", (job_id,))}
+    assert cached == {'b', 'd', 'e'}
+    assert store.page(job_id, query='b')['total'] == 2
+
+
+def test_oldest_jobs_are_evicted(store):
+    first = store.create([dict(ROWS[0])])
+    second = store.create([dict(ROWS[1])])
+    third = store.create([dict(ROWS[2])])
+    assert store.get(first) is None
+    assert store.get(second)['rows'][0]['npi'] == ROWS[1]['npi']
+    assert store.get(third)['total'] == 1
+
+
+def test_jobs_are_shared_by_stores_on_one_file(tmp_path):
+    path = str(tmp_path / 'results.db')
+    job_id = ResultStore(path).create([dict(row) for row in ROWS])
+    # A second store stands in for another worker process
+    page = ResultStore(path).page(job_id, limit=2)
+    assert page['total'] == len(ROWS)
+    assert [row['npi'] for row in page['rows']] == ['1000000003', '1000000001']
@@ -0,0 +1,96 @@
+"""
+Utility Tests
+Retry sessions with a per-attempt callback, and cross-process file locks.
+"""
+import multiprocessing
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from utils import create_retry_session, file_lock, try_process_lock
+
+
+@pytest.fixture
+def flaky_server():
+    """Local server answering 503 to the first ``failures`` requests, then 200."""
+    state = {'failures': 2, 'requests': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state['requests'] += 1
+            self.send_response(503 if state['requests'] <= state['failures'] else 200)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state['url'] = f"http://127.0.0.1:{server.server_address[1]}/"
+    yield state
+    server.shutdown()
+
+
+def test_before_retry_runs_before_each_retry_only(flaky_server):
+    calls = []
+    session = create_retry_session(retries=3, backoff_factor=0, before_retry=lambda: calls.append(1))
+    assert session.get(flaky_server['url']).status_code == 200
+    assert flaky_server['requests'] == 3
+    assert len(calls) == 2
+
+
+def test_exhausted_retries_return_the_last_response_without_raise_on_status(flaky_server):
+    flaky_server['failures'] = 10
+    calls = []
+    session = create_retry_session(retries=2, backoff_factor=0, raise_on_status=False,
+                                   before_retry=lambda: calls.append(1))
+    assert session.get(flaky_server['url']).status_code == 503
+    # No callback for the attempt that is never made
+    assert flaky_server['requests'] == 3
+    assert len(calls) == 2
+
+
+def test_exhausted_retries_raise_by_default(flaky_server):
+    flaky_server['failures'] = 10
+    with pytest.raises(requests.exceptions.RetryError):
+        create_retry_session(retries=1, backoff_factor=0).get(flaky_server['url'])
+
+
+def _try_lock(path, results):
+    results.put(try_process_lock(path))
+
+
+def test_process_lock_has_one_holder(tmp_path):
+    path = tmp_path / 'leader.lock'
+    assert try_process_lock(path)
+    assert try_process_lock(path)
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    other = context.Process(target=_try_lock, args=(path, results))
+    other.start()
+    other.join(timeout=30)
+    assert results.get(timeout=5) is False
+
+
+def test_file_lock_serializes_holders(tmp_path):
+    path = tmp_path / 'registry.lock'
+    inside, overlaps = [], []
+
+    def hold():
+        with file_lock(path):
+            if inside:
+                overlaps.append(1)
+            inside.append(1)
+            time.sleep(0.05)
+            inside.pop()
+
+    threads = [threading.Thread(target=hold) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlaps == []
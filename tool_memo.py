@@ -0,0 +1,78 @@
+"""
+Tool Call Memoization
+Per-run cache of tool results, so repeated identical tool calls skip the network.
+"""
+import json
+import re
+import threading
+from collections import Counter
+
+from crewai.agents.cache.cache_handler import CacheHandler
+from pydantic import PrivateAttr
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+# Tools report failures as text starting with this prefix (see format_api_error)
+ERROR_PREFIX = "ERROR:"
+
+
+def _normalize_value(value):
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, dict):
+        return {k: _normalize_value(v) for k, v in sorted(value.items()) if v not in (None, "")}
+    if isinstance(value, list):
+        return [_normalize_value(v) for v in value]
+    return value
+
+
+def normalize_tool_input(tool_input: str) -> str:
+    """
+    Canonical form of a tool call's arguments.
+
+    Argument order, empty arguments, letter case and extra whitespace do
+    not change a registry lookup, so they do not change the key either.
+    """
+    try:
+        return json.dumps(_normalize_value(json.loads(tool_input)), sort_keys=True)
+    except (TypeError, ValueError):
+        return re.sub(r"\s+", " ", str(tool_input)).strip().casefold()
+
+
+class ToolCallMemo(CacheHandler):
+    """
+    Tool result cache shared by every agent and stage of one validation run.
+
+    Plugs into CrewAI's tool cache (set as the agents' cache handler), so a
+    repeated call, including one made by an agent a task was delegated to,
+    returns the earlier result without running the tool. Error results are
+    not kept, so a failed lookup is retried. Hits are counted per tool.
+    """
+
+    _hits: Counter = PrivateAttr(default_factory=Counter)
+    _hits_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def add(self, tool: str, input: str, output) -> None:
+        if isinstance(output, str) and output.lstrip().startswith(ERROR_PREFIX):
+            return
+        super().add(tool, normalize_tool_input(input), output)
+
+    def read(self, tool: str, input: str):
+        output = super().read(tool, normalize_tool_input(input))
+        if output is not None:
+            with self._hits_lock:
+                self._hits[tool] += 1
+            logger.debug(f"Deduplicated call to {tool}")
+        return output
+
+    def deduplicated(self) -> dict:
+        """Number of calls answered from the memo, per tool."""
+        with self._hits_lock:
+            return dict(self._hits)
+
+    def attach(self, agents):
+        """Make the agents use this memo as their tool cache."""
+        for agent in agents:
+            agent.set_cache_handler(self)
@@ -3,12 +3,24 @@ Utility Functions
 Provides logging, retry logic, and validation helpers.
 """
 import logging
+import os
+import re
 import sys
-from typing import Optional
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, Optional
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    import fcntl
+except ImportError:  # Windows: process locks are not enforced
+    fcntl = None
+
 
 # Valid US state codes
 VALID_STATE_CODES = {
@@ -20,6 +32,10 @@ VALID_STATE_CODES = {
     'DC', 'PR', 'VI', 'GU', 'AS', 'MP'
 }
 
+# Lock files held by this process (see try_process_lock), kept open for its lifetime
+_process_locks = {}
+_process_locks_lock = threading.Lock()
+
 
 def get_logger(name: str) -> logging.Logger:
     """
@@ -47,10 +63,33 @@ def get_logger(name: str) -> logging.Logger:
     return logger
 
 
+class CallbackRetry(Retry):
+    """Retry that calls ``before_retry`` before every retry attempt (not the first try)."""
+
+    def __init__(self, *args, before_retry: Optional[Callable[[], None]] = None, **kwargs):
+        self.before_retry = before_retry
+        super().__init__(*args, **kwargs)
+
+    def new(self, **kw) -> "CallbackRetry":
+        retry = super().new(**kw)
+        retry.before_retry = self.before_retry
+        return retry
+
+    def increment(self, *args, **kwargs) -> "CallbackRetry":
+        # Raises MaxRetryError once the retries are used up, so no attempt follows
+        retry = super().increment(*args, **kwargs)
+        if self.before_retry:
+            self.before_retry()
+        return retry
+
+
 def create_retry_session(
     retries: int = 3,
     backoff_factor: float = 0.3,
-    status_forcelist: tuple = (500, 502, 503, 504)
+    status_forcelist: tuple = (500, 502, 503, 504),
+    pool_maxsize: int = 10,
+    raise_on_status: bool = True,
+    before_retry: Optional[Callable[[], None]] = None
 ) -> requests.Session:
     """
     Create a requests session with retry logic.
@@ -59,20 +98,26 @@ def create_retry_session(
         retries: Number of retry attempts
         backoff_factor: Backoff factor for retries
         status_forcelist: HTTP status codes to retry
+        pool_maxsize: Connections kept open per host
+        raise_on_status: Raise RetryError once the retries of a status are used up;
+            False returns the last response instead, for raise_for_status()
+        before_retry: Called before every retry attempt, e.g. to charge a rate limit
         
     Returns:
         Configured requests Session
     """
     session = requests.Session()
-    retry = Retry(
+    retry = CallbackRetry(
         total=retries,
         read=retries,
         connect=retries,
         backoff_factor=backoff_factor,
         status_forcelist=status_forcelist,
-        allowed_methods=["HEAD", "GET", "POST", "PUT", "DELETE", "OPTIONS", "TRACE"]
+        allowed_methods=["HEAD", "GET", "POST", "PUT", "DELETE", "OPTIONS", "TRACE"],
+        raise_on_status=raise_on_status,
+        before_retry=before_retry
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
@@ -140,3 +185,81 @@ def format_api_error(
     if status_code:
         return f"ERROR: {api_name} API returned HTTP {status_code}: {str(error)}"
     return f"ERROR: {api_name} API error: {str(error)}"
+
+
+def make_report_path(
+    reports_dir: Path,
+    provider_name: str,
+    state: str,
+    prefix: str = ""
+) -> Path:
+    """
+    Build a unique report path for one validation run.
+    
+    Args:
+        reports_dir: Directory the report is written to
+        provider_name: Provider name (sanitized for use in a filename)
+        state: Two-letter state code
+        prefix: Optional filename prefix (e.g. "MOCK_")
+        
+    Returns:
+        Path that no concurrent run will share
+    """
+    safe_name = re.sub(r'[^\w\-_]', '', provider_name.replace(' ', '_'))
+    safe_state = re.sub(r'[^\w]', '', state)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return Path(reports_dir) / f"{prefix}{safe_name}_{safe_state}_{timestamp}_{uuid.uuid4().hex[:8]}.md"
+
+
+def try_process_lock(lock_path: Path) -> bool:
+    """
+    Try to become the one process on the host holding ``lock_path``.
+
+    Used to elect a single process for work every process could do (e.g.
+    the roster scheduler). The lock is held until the process exits, so a
+    dead holder frees it and the next caller takes over.
+    
+    Args:
+        lock_path: Lock file (created if missing); it holds the holder's pid
+        
+    Returns:
+        True if this process holds the lock (always where locks are not
+        supported), False if another process does
+    """
+    lock_path = Path(lock_path).resolve()
+    with _process_locks_lock:
+        if lock_path in _process_locks or fcntl is None:
+            return True
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(lock_path, 'a+', encoding='utf-8')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        _process_locks[lock_path] = lock_file
+        return True
+
+
+@contextmanager
+def file_lock(lock_path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive lock on ``lock_path`` across processes for the with-block.
+
+    Serializes read-modify-write cycles of a file shared by worker
+    processes; a no-op where locks are not supported.
+    """
+    if fcntl is None:
+        yield
+        return
+    Path(lock_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a+', encoding='utf-8') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,144 @@
+"""
+Validation Result Models
+Structured outputs of the provider validation tasks.
+"""
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ValidationFindings(BaseModel):
+    """Output of the validation task."""
+    provider_found: bool = Field(..., description="False if the provider is in no verification system (NO_USER_FOUND).")
+    provider_name: str = Field("", description="Provider name as recorded by the registry.")
+    npi: Optional[str] = Field(None, description="10-digit NPI number, if found.")
+    specialty: Optional[str] = Field(None, description="Primary taxonomy / specialty.")
+    practice_address: Optional[str] = Field(None, description="Primary practice address.")
+    npi_status: str = Field("Unknown", description="NPI status: Active, Inactive, Not Found or Unknown.")
+    license_number: Optional[str] = Field(None, description="State license number, if known.")
+    license_status: str = Field("Unknown", description="License status: Active, Inactive, Expired, Not Verified or Unknown.")
+    nabp_status: str = Field("Not applicable", description="NABP result, or 'Not applicable' for non-pharmacists.")
+    propelus_status: str = Field(
+        "Propelus verification skipped: No valid license number available.",
+        description="Propelus result, or the reason it was skipped."
+    )
+    sources_checked: List[str] = Field(default_factory=list, description="Registries that were queried.")
+    discrepancies: List[str] = Field(default_factory=list, description="Discrepancies between sources.")
+    summary: str = Field("", description="One-paragraph summary of the verification.")
+
+
+class EnrichmentFindings(BaseModel):
+    """Output of the enrichment task."""
+    completeness_score: int = Field(0, ge=0, le=100, description="Profile completeness from 0 to 100.")
+    missing_fields: List[str] = Field(default_factory=list, description="Fields missing from the provider profile.")
+    inconsistencies: List[str] = Field(default_factory=list, description="Inconsistent values across sources.")
+    recommendations: List[str] = Field(default_factory=list, description="Suggested additional verification.")
+
+
+class QAFindings(BaseModel):
+    """Output of the quality assurance task."""
+    compliance_status: Literal["COMPLIANT", "NEEDS_REVIEW", "NON_COMPLIANT"] = Field(
+        "NEEDS_REVIEW", description="Overall credentialing compliance."
+    )
+    is_sanctioned: bool = Field(False, description="True if any sanction, exclusion or disciplinary action was found.")
+    sanctions: List[str] = Field(default_factory=list, description="Sanctions, exclusions or disciplinary actions.")
+    issues: List[str] = Field(default_factory=list, description="Quality or compliance issues.")
+    required_actions: List[str] = Field(default_factory=list, description="Actions required before approval.")
+    summary: str = Field("", description="One-paragraph QA summary.")
+
+
+class ProviderEnrichmentFindings(EnrichmentFindings):
+    """Enrichment findings of one provider in a batched enrichment task."""
+    provider_key: str = Field(..., description="The provider_key of the provider, copied unchanged.")
+
+
+class EnrichmentBatch(BaseModel):
+    """Output of the batched enrichment task."""
+    providers: List[ProviderEnrichmentFindings] = Field(default_factory=list, description="One entry per provider.")
+
+
+class ProviderQAFindings(QAFindings):
+    """QA findings of one provider in a batched QA task."""
+    provider_key: str = Field(..., description="The provider_key of the provider, copied unchanged.")
+
+
+class QABatch(BaseModel):
+    """Output of the batched QA task."""
+    providers: List[ProviderQAFindings] = Field(default_factory=list, description="One entry per provider.")
+
+
+class ProviderValidationResult(BaseModel):
+    """Combined result of one validation run, with the exact verdict fields."""
+    provider_name: str
+    state: str
+    validation: ValidationFindings
+    enrichment: Optional[EnrichmentFindings] = None
+    qa: Optional[QAFindings] = None
+    # Set when the run was stopped (deadline, cancellation, failure) before every stage finished
+    partial: bool = False
+    partial_reason: Optional[str] = None
+
+    @property
+    def provider_found(self) -> bool:
+        return self.validation.provider_found
+
+    @property
+    def is_sanctioned(self) -> bool:
+        return bool(self.qa and self.qa.is_sanctioned)
+
+    @property
+    def has_issues(self) -> bool:
+        return bool(
+            self.validation.discrepancies
+            or (self.enrichment and self.enrichment.inconsistencies)
+            or (self.qa and (self.qa.issues or self.qa.compliance_status != "COMPLIANT"))
+        )
+
+    @property
+    def valid(self) -> bool:
+        return (
+            self.provider_found
+            and not self.partial
+            and self.validation.npi_status.lower() == "active"
+            and not self.is_sanctioned
+            and not (self.qa and self.qa.compliance_status == "NON_COMPLIANT")
+        )
+
+
+def findings_from_output(task_output, model: type, **fallback):
+    """
+    Read a task's structured output, tolerating LLM responses that did not parse.
+
+    Args:
+        task_output: TaskOutput of a task with output_pydantic=model (may be None)
+        model: Expected pydantic model
+        **fallback: Field values used when the output could not be parsed
+
+    Returns:
+        An instance of model
+    """
+    if task_output is not None and isinstance(task_output.pydantic, model):
+        return task_output.pydantic
+    if task_output is not None and task_output.json_dict:
+        try:
+            return model(**task_output.json_dict)
+        except ValueError:
+            pass
+    return model(**fallback)
+
+
+def split_batch(batch: BaseModel, model: type) -> dict:
+    """
+    Split a batched task output into per-provider findings.
+
+    Args:
+        batch: EnrichmentBatch or QABatch
+        model: Per-provider model to return (EnrichmentFindings or QAFindings)
+
+    Returns:
+        Dictionary of provider_key to findings; the first entry wins on duplicate keys
+    """
+    findings = {}
+    for item in batch.providers:
+        findings.setdefault(item.provider_key.strip(), model(**item.model_dump(exclude={"provider_key"})))
+    return findings
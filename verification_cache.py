@@ -0,0 +1,74 @@
+"""
+Verification Cache
+Thread-safe store of NPI verification results and the time each was checked.
+"""
+import threading
+import time
+from typing import Optional
+
+from utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class VerificationCache:
+    """In-memory cache of NPI verification results keyed by NPI number."""
+
+    def __init__(self, ttl_seconds: int = 86400):
+        """
+        Args:
+            ttl_seconds: Default maximum age of a cached result
+        """
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, npi: str, max_age: Optional[float] = None) -> Optional[dict]:
+        """
+        Return the cached result for an NPI if it is fresh enough.
+
+        Args:
+            npi: 10-digit NPI number
+            max_age: Maximum acceptable age in seconds (defaults to the TTL)
+
+        Returns:
+            Cached result dictionary, or None on a miss or stale entry
+        """
+        max_age = self.ttl_seconds if max_age is None else max_age
+        with self._lock:
+            entry = self._entries.get(npi)
+        if entry is None:
+            return None
+        checked_at, result = entry
+        if time.time() - checked_at > max_age:
+            return None
+        return result
+
+    def put(self, npi: str, result: dict) -> None:
+        """
+        Store a verification result stamped with the current time.
+
+        Args:
+            npi: 10-digit NPI number
+            result: Result dictionary returned by the NPI lookup
+        """
+        with self._lock:
+            self._entries[npi] = (time.time(), result)
+
+    def age(self, npi: str) -> Optional[float]:
+        """
+        Seconds since the NPI was last verified.
+
+        Args:
+            npi: 10-digit NPI number
+
+        Returns:
+            Age in seconds, or None if the NPI has never been verified
+        """
+        with self._lock:
+            entry = self._entries.get(npi)
+        return None if entry is None else time.time() - entry[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)